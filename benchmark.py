@@ -0,0 +1,305 @@
+"""
+Benchmark the pipeline phases on fixed synthetic sizes and gate regressions against a baseline.
+
+The suite parses an ontology with N salads and runs assign, remove_totals, nutrients,
+classify, similar and serialize on it, each (and every span inside it) timed with
+common.timing. The N salads are copies of the real ones with their portions; sizes
+below the real salad count keep only the first N salads (sorted by name). Every size
+runs one warm-up and then --repeats timed runs; medians are kept. One extra run under
+tracemalloc gives the per-phase peak memory, so tracing never slows the timed runs.
+
+    python benchmark.py run      [--sizes 20 50] [--repeats 3] [--output result.json]
+    python benchmark.py baseline [--sizes 20 50] [--repeats 3] [--baseline output/benchmark_baseline.json]
+    python benchmark.py compare  [--baseline ...] [--threshold 0.25] [--repeats N]
+
+`compare` re-runs the baseline's sizes and exits with status 1 when any phase is slower
+than the baseline by more than --threshold (and more than --min-delta seconds), or its
+peak memory grew by more than --threshold (and more than --min-memory-delta KiB).
+
+The sizes are built from salad_ontology_before_inferred.rdf, a snapshot no pipeline step
+writes, so the baseline stays valid across pipeline runs. The baseline records the sha1
+of that file; compare refuses to run against a different one.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import rdflib
+from prettytable import PrettyTable
+from rdflib import Graph
+from rdflib.namespace import RDF
+
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT / "scripts"))
+sys.path.append(str(ROOT / "scripts" / "assign"))
+sys.path.append(str(ROOT / "scripts" / "for_inferred_property"))
+from common.ontology import SALAD, file_digest, local_name
+from common.timing import capture, span
+
+# === CONFIGURATION ===
+BASELINE_FILE = "output/benchmark_baseline.json"
+BASELINE_VERSION = 2
+SOURCE_FILE = "salad_ontology_before_inferred.rdf"  # never rewritten by the pipeline
+SIZES = [20, 50]
+REPEATS = 3
+WARMUP = 1
+THRESHOLD = 0.25   # allowed relative slow-down / memory growth
+MIN_DELTA_S = 0.01  # slow-downs smaller than this are noise, whatever the ratio
+MIN_DELTA_KB = 256  # likewise for peak memory growth
+
+
+def salad_count(text):
+    """argparse type for --sizes: a positive number of salads."""
+    size = int(text)
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive salad count, got '{text}'")
+    return size
+
+
+def scale_salads(g, size):
+    """
+    Make `g` hold exactly `size` salads: copy the existing ones (without their nutrition
+    totals) to grow, or drop the salads past the first `size` (with their totals) to shrink.
+    """
+    salads = sorted(set(g.subjects(RDF.type, SALAD.Salad)))
+    for salad in salads[size:]:
+        for total in list(g.objects(salad, SALAD.hasNutrient)):
+            g.remove((total, None, None))
+        g.remove((salad, None, None))
+        g.remove((None, None, salad))
+    for i in range(len(salads), size):
+        template = salads[i % len(salads)]
+        copy = SALAD[f"{local_name(template)}_{i}"]
+        g.addN((copy, p, o, g) for p, o in g.predicate_objects(template) if p != SALAD.hasNutrient)
+    return g
+
+
+def build_source(ontology, size, workdir):
+    """Write the ontology scaled to `size` salads as RDF/XML; return its path."""
+    g = Graph()
+    g.parse(ontology, format="xml")
+    path = Path(workdir) / f"benchmark_{size}.rdf"
+    scale_salads(g, size).serialize(destination=path, format="xml")
+    return path
+
+
+def run_suite(path):
+    """Run every phase once on a fresh parse of `path`; return the captured span records."""
+    import pipeline
+    from calculatedSaladNutrition import calculate_all_salads
+    from common.recommender import SaladRecommender
+    from common.salad_index import get_salad_index, similar_substance_pairs
+    from remove_inferred_property_total import remove_total_links_and_substances
+
+    with capture() as records, contextlib.redirect_stdout(io.StringIO()):
+        g = Graph()
+        with span("parse", graph=g):
+            g.parse(path, format="xml")
+        with span("assign", graph=g):
+            pipeline.run_pipeline(g)
+        with span("remove_totals", graph=g):
+            remove_total_links_and_substances(g)
+        with span("nutrients", graph=g):
+            calculate_all_salads(g)
+        with span("classify", graph=g):
+            SaladRecommender.from_graph(g)
+        with span("similar", graph=g):
+            for kind in ("ingredient", "dressing"):
+                for _ in similar_substance_pairs(get_salad_index(g), kind):
+                    pass
+        with span("serialize", graph=g):
+            g.serialize(destination=io.BytesIO(), format="xml")
+    return records
+
+
+def measure(ontology, sizes, repeats, warmup=WARMUP):
+    """{size: {span path: {"wall_s", "cpu_s", "wall_runs", "peak_kb", "triples"}}} in suite order."""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            path = build_source(ontology, size, workdir)
+            for _ in range(warmup):
+                run_suite(path)
+            runs = {}
+            for repeat in range(repeats):
+                start = time.perf_counter()
+                for record in run_suite(path):
+                    runs.setdefault(record["span"], []).append(record)
+                print(f"  size {size}: run {repeat + 1}/{repeats} in {time.perf_counter() - start:.2f}s",
+                      file=sys.stderr)
+
+            tracemalloc.start()
+            try:
+                peaks = {record["span"]: record["peak_kb"] for record in run_suite(path)}
+            finally:
+                tracemalloc.stop()
+
+            results[str(size)] = {
+                phase: {
+                    "wall_s": statistics.median(r["wall_s"] for r in records),
+                    "cpu_s": statistics.median(r["cpu_s"] for r in records),
+                    "wall_runs": [r["wall_s"] for r in records],
+                    "peak_kb": peaks.get(phase),
+                    "triples": records[-1].get("triples_after"),
+                }
+                for phase, records in runs.items()
+            }
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "rdflib": rdflib.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def compare(baseline, current, threshold=THRESHOLD, min_delta=MIN_DELTA_S, min_memory_delta=MIN_DELTA_KB):
+    """Rows [size, phase, base, new, change, base peak, new peak, change, status]; and the regression count."""
+    rows, regressions = [], 0
+    for size, phases in baseline["results"].items():
+        for phase, base in phases.items():
+            new = current.get(size, {}).get(phase)
+            if new is None:
+                rows.append([size, phase, f"{base['wall_s']:.4f}", "-", "-", base["peak_kb"], "-", "-", "missing"])
+                continue
+            wall_change = new["wall_s"] / base["wall_s"] - 1 if base["wall_s"] else 0.0
+            slower = wall_change > threshold and new["wall_s"] - base["wall_s"] > min_delta
+            mem_change = None
+            if base.get("peak_kb") and new.get("peak_kb") is not None:
+                mem_change = new["peak_kb"] / base["peak_kb"] - 1
+            bigger = (mem_change is not None and mem_change > threshold
+                      and new["peak_kb"] - base["peak_kb"] > min_memory_delta)
+            status = "REGRESSION" if slower or bigger else "ok"
+            regressions += status != "ok"
+            rows.append([
+                size, phase,
+                f"{base['wall_s']:.4f}", f"{new['wall_s']:.4f}", f"{wall_change:+.0%}",
+                base.get("peak_kb"), new.get("peak_kb"), "-" if mem_change is None else f"{mem_change:+.0%}",
+                status,
+            ])
+    return rows, regressions
+
+
+def print_results(results):
+    table = PrettyTable()
+    table.field_names = ["size", "phase", "wall s (median)", "cpu s", "peak KiB", "triples"]
+    table.align = "l"
+    for size, phases in results.items():
+        for phase, result in phases.items():
+            table.add_row([size, phase, f"{result['wall_s']:.4f}", f"{result['cpu_s']:.4f}",
+                           result["peak_kb"], result["triples"]])
+    print(table.get_string())
+
+
+def write_json(data, path):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf8") as f:
+        json.dump(data, f, indent=1)
+
+
+def source(ontology):
+    """The ontology the sizes are built from, with its sha1."""
+    return {"path": str(ontology), "sha1": file_digest(ontology)}
+
+
+def cmd_run(args):
+    results = measure(args.ontology, args.sizes, args.repeats, args.warmup)
+    print_results(results)
+    if args.output:
+        write_json({"environment": environment(), "source": source(args.ontology), "repeats": args.repeats,
+                    "results": results}, args.output)
+        print(f"✅ Results written to {args.output}")
+
+
+def cmd_baseline(args):
+    results = measure(args.ontology, args.sizes, args.repeats, args.warmup)
+    print_results(results)
+    write_json({
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "source": source(args.ontology),
+        "sizes": args.sizes,
+        "repeats": args.repeats,
+        "results": results,
+    }, args.baseline)
+    print(f"✅ Baseline written to {args.baseline}")
+
+
+def cmd_compare(args):
+    if not Path(args.baseline).exists():
+        raise SystemExit(f"Error: no baseline at {args.baseline}; run 'python benchmark.py baseline' first")
+    with open(args.baseline, encoding="utf8") as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise SystemExit(f"Error: {args.baseline} has an unsupported format; record a new baseline")
+    if baseline["source"]["sha1"] != file_digest(args.ontology):
+        raise SystemExit(f"Error: {args.ontology} differs from the ontology the baseline was built from "
+                         f"({baseline['source']['path']}); record a new baseline")
+    if baseline["environment"] != environment():
+        print(f"⚠️ Baseline was recorded on {baseline['environment']}; timings may not be comparable",
+              file=sys.stderr)
+
+    repeats = args.repeats or baseline["repeats"]
+    current = measure(args.ontology, baseline["sizes"], repeats, args.warmup)
+    rows, regressions = compare(baseline, current, args.threshold, args.min_delta, args.min_memory_delta)
+
+    table = PrettyTable()
+    table.field_names = ["size", "phase", "base s", "new s", "Δ time", "base KiB", "new KiB", "Δ mem", "status"]
+    table.align = "l"
+    table.add_rows(rows)
+    print(table.get_string())
+    if regressions:
+        print(f"\n❌ {regressions} phase(s) regressed by more than {args.threshold:.0%} against {args.baseline}")
+        raise SystemExit(1)
+    print(f"\n✅ No phase regressed by more than {args.threshold:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-phase pipeline benchmark with a regression gate.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--ontology", default=str(ROOT / SOURCE_FILE), help="Ontology the synthetic sizes are built from")
+        p.add_argument("--warmup", type=int, default=WARMUP, help="Untimed runs per size")
+
+    p = sub.add_parser("run", help="Run the suite and print the medians")
+    common(p)
+    p.add_argument("--sizes", nargs="+", type=salad_count, default=SIZES, help="Salad counts")
+    p.add_argument("--repeats", type=int, default=REPEATS)
+    p.add_argument("--output", help="Also write the results as JSON")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("baseline", help="Run the suite and store it as the baseline")
+    common(p)
+    p.add_argument("--sizes", nargs="+", type=salad_count, default=SIZES, help="Salad counts")
+    p.add_argument("--repeats", type=int, default=REPEATS)
+    p.add_argument("--baseline", default=BASELINE_FILE)
+    p.set_defaults(func=cmd_baseline)
+
+    p = sub.add_parser("compare", help="Re-run the baseline's sizes and fail on regressions")
+    common(p)
+    p.add_argument("--baseline", default=BASELINE_FILE)
+    p.add_argument("--repeats", type=int, help="Timed runs per size (default: the baseline's)")
+    p.add_argument("--threshold", type=float, default=THRESHOLD, help="Allowed relative slow-down, e.g. 0.25")
+    p.add_argument("--min-delta", type=float, default=MIN_DELTA_S, help="Ignore slow-downs below this many seconds")
+    p.add_argument("--min-memory-delta", type=float, default=MIN_DELTA_KB,
+                   help="Ignore peak memory growth below this many KiB")
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
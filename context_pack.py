@@ -0,0 +1,216 @@
+"""
+Token-budgeted LLM context packs built from precomputed ontology summary chunks.
+
+`build` walks the graph once (with the told_llm.py summary generator) and stores every
+section as a separate chunk: header, class hierarchy, object properties, data properties
+and one chunk per salad (seeded, cached snapshots from salad_snapshots.py). Chunks go
+into a single text file, and an index file records
+each chunk's offset, size and token estimate. `pack` reads only the index, picks chunks
+in priority order until the token budget is used up, and reads just those slices, so it
+never touches the graph.
+
+    python context_pack.py build [--ontology salad_ontology.rdf] [--dir output/context_pack] [--seed N]
+    python context_pack.py pack --budget 4000 [--salad GreekSalad ...] [--sections classes ...] [-o pack.txt]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from rdflib import Graph
+
+sys.path.append(str(Path(__file__).resolve().parent / "scripts"))
+from common.ontology import ONTOLOGY_FILE, SALAD, local_name
+from salad_snapshots import DEFAULT_SEED, SnapshotCache, snapshot_salads
+from told_llm import MAX_DEPTH, OntologySummary
+
+# === CONFIGURATION ===
+PACK_DIR = "output/context_pack"
+INDEX_FILE = "index.json"
+CHUNKS_FILE = "chunks.txt"
+SNAPSHOTS_FILE = "snapshots.json"
+CHARS_PER_TOKEN = 4  # rough estimate for English text and IRIs; no tokenizer needed
+
+# Sections in default priority order; salad chunks come last
+SECTIONS = ["header", "classes", "object-properties", "data-properties", "salads"]
+
+
+def estimate_tokens(text):
+    """Approximate token count of `text`."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def iter_chunks(g, seed=DEFAULT_SEED, max_depth=MAX_DEPTH, cache=None):
+    """Yield (chunk id, section, text) for every chunk of the summary of `g`."""
+    summary = OntologySummary(g)
+    yield "header", "header", "".join(summary.header())
+    yield "classes", "classes", "".join(summary.class_hierarchy())
+    yield "object-properties", "object-properties", "".join(summary.object_properties())
+    yield "data-properties", "data-properties", "".join(summary.data_properties())
+    for salad, text, _ in snapshot_salads(g, cache=cache, seed=seed, max_depth=max_depth, summary=summary):
+        yield f"salad:{local_name(salad)}", "salads", f"=== SALAD {summary.n3(salad)} ===\n\n{text}"
+
+
+def source_stamp(path):
+    """(size, mtime) of the ontology file, used to tell whether an index is stale."""
+    stat = os.stat(path)
+    return {"path": str(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def build_pack(ontology, pack_dir=PACK_DIR, seed=DEFAULT_SEED, max_depth=MAX_DEPTH):
+    """
+    Write chunks.txt and index.json for `ontology` into `pack_dir`; return the index.
+    Salad chunks come from the snapshot cache in `pack_dir`, so a rebuild re-renders only
+    the salads whose subgraph changed.
+    """
+    g = Graph()
+    g.parse(ontology, format="xml")
+    g.bind("s", SALAD)
+
+    pack_dir = Path(pack_dir)
+    pack_dir.mkdir(parents=True, exist_ok=True)
+    cache = SnapshotCache(pack_dir / SNAPSHOTS_FILE)
+    chunks = []
+    offset = 0
+    with open(pack_dir / CHUNKS_FILE, "wb") as f:
+        for chunk_id, section, text in iter_chunks(g, seed, max_depth, cache):
+            data = text.encode("utf8")
+            f.write(data)
+            chunks.append({
+                "id": chunk_id,
+                "section": section,
+                "offset": offset,
+                "bytes": len(data),
+                "tokens": estimate_tokens(text),
+            })
+            offset += len(data)
+    cache.save()
+
+    index = {
+        "source": source_stamp(ontology),
+        "triples": len(g),
+        "chars_per_token": CHARS_PER_TOKEN,
+        "chunks": chunks,
+    }
+    with open(pack_dir / INDEX_FILE, "w", encoding="utf8") as f:
+        json.dump(index, f, indent=1)
+    return index
+
+
+def load_index(pack_dir=PACK_DIR):
+    with open(Path(pack_dir) / INDEX_FILE, encoding="utf8") as f:
+        return json.load(f)
+
+
+def select_chunks(index, budget, sections=None, salads=None):
+    """
+    Choose chunks under `budget` tokens: the named salads first, then the requested
+    sections in SECTIONS order. Chunks that do not fit are skipped, so a smaller later
+    chunk can still use the remaining budget; a named salad that does not fit raises
+    ValueError. The chosen chunks come back in SECTIONS order with the named salads
+    ahead of the other salads. Returns (chunks, tokens used).
+    """
+    sections = set(sections or SECTIONS)
+    wanted = [f"salad:{name}" for name in salads or []]
+    by_id = {chunk["id"]: chunk for chunk in index["chunks"]}
+    missing = [chunk_id for chunk_id in wanted if chunk_id not in by_id]
+    if missing:
+        raise KeyError(f"No chunk for: {', '.join(missing)}")
+
+    # Reading order; named salads are also picked first, before any optional section
+    ordered = []
+    for section in SECTIONS:
+        if section == "salads":
+            ordered.extend(by_id[chunk_id] for chunk_id in wanted)
+            if section in sections:
+                ordered.extend(c for c in index["chunks"] if c["section"] == section and c["id"] not in wanted)
+        elif section in sections:
+            ordered.extend(c for c in index["chunks"] if c["section"] == section)
+    priority = [by_id[chunk_id] for chunk_id in wanted] + [c for c in ordered if c["id"] not in wanted]
+
+    chosen, used = set(), 0
+    for chunk in priority:
+        if used + chunk["tokens"] <= budget:
+            chosen.add(chunk["id"])
+            used += chunk["tokens"]
+        elif chunk["id"] in wanted:
+            raise ValueError(f"{chunk['id']} needs ~{chunk['tokens']} tokens, "
+                             f"only ~{budget - used} of the {budget} token budget left")
+    return [c for c in ordered if c["id"] in chosen], used
+
+
+def read_chunks(chunks, pack_dir=PACK_DIR):
+    """Text of `chunks`, read as slices of chunks.txt in the given order."""
+    parts = []
+    with open(Path(pack_dir) / CHUNKS_FILE, "rb") as f:
+        for chunk in chunks:
+            f.seek(chunk["offset"])
+            parts.append(f.read(chunk["bytes"]).decode("utf8"))
+    return "\n".join(parts)
+
+
+def assemble(budget, pack_dir=PACK_DIR, sections=None, salads=None):
+    """Assemble a context pack under `budget` tokens; return (text, chunks, tokens used)."""
+    index = load_index(pack_dir)
+    chunks, used = select_chunks(index, budget, sections, salads)
+    return read_chunks(chunks, pack_dir), chunks, used
+
+
+def cmd_build(args):
+    start = time.perf_counter()
+    index = build_pack(args.ontology, args.dir, args.seed, args.max_depth)
+    total = sum(c["tokens"] for c in index["chunks"])
+    print(f"✅ {len(index['chunks'])} chunks (~{total} tokens) from {index['triples']} triples "
+          f"written to {args.dir} in {time.perf_counter() - start:.2f}s")
+
+
+def cmd_pack(args):
+    start = time.perf_counter()
+    index = load_index(args.dir)
+    source = index["source"]
+    if os.path.exists(source["path"]) and source_stamp(source["path"]) != source:
+        print(f"⚠️ {source['path']} changed since the pack was built; run 'build' again", file=sys.stderr)
+    try:
+        chunks, used = select_chunks(index, args.budget, args.sections, args.salad)
+    except (KeyError, ValueError) as e:
+        raise SystemExit(f"Error: {e.args[0]}")
+    text = read_chunks(chunks, args.dir)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    skipped = len(index["chunks"]) - len(chunks)
+    print(f"🎯 {len(chunks)} chunks, ~{used}/{args.budget} tokens ({skipped} left out) in {elapsed:.1f} ms",
+          file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked, token-budgeted ontology context for LLM prompts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="Precompute the chunks and their index")
+    p.add_argument("--ontology", default=ONTOLOGY_FILE)
+    p.add_argument("--dir", default=PACK_DIR)
+    p.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed for the substance portion sampling")
+    p.add_argument("--max-depth", type=int, default=MAX_DEPTH)
+    p.set_defaults(func=cmd_build)
+
+    p = sub.add_parser("pack", help="Assemble a pack under a token budget")
+    p.add_argument("--budget", type=int, required=True, help="Maximum estimated tokens")
+    p.add_argument("--dir", default=PACK_DIR)
+    p.add_argument("--sections", nargs="+", choices=SECTIONS, help="Sections to include (default: all)")
+    p.add_argument("--salad", nargs="+", metavar="NAME", help="Salads to include first (local names)")
+    p.add_argument("-o", "--output", help="Write the pack here instead of stdout")
+    p.set_defaults(func=cmd_pack)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Generate a synthetic salad bar ontology of any size for load testing.
+
+The real ontology supplies the T-box, the SWRL rules, every Ingredient/Dressing with its
+substance portions, the allergens and the purposes. Its Salad, Person and nutrition total
+individuals are left out and replaced by generated ones drawn from the real distributions:
+
+- salads: the number of ingredient and dressing portions is sampled from the real salads.
+  Components are picked in proportion to how often real salads use them (+1, so unused
+  components appear too). Portion sizes come from that component's real portions;
+  --jitter of them are scaled by a log-normal factor, rounded to 5 g/ml and kept within
+  the real sizes of that kind, and get the kind's most common unit (so the generated
+  portions pass the portion-amount-range and *-portion-unit shapes).
+- --new-ingredients: variants of random real ingredients, same class and allergens,
+  with every substance amount scaled by a log-normal factor. Salads use them too.
+- --people: allergy and purpose counts are sampled from the real people; an allergy is
+  an Allergen or a component, in the real proportion.
+
+Triples are written through common.rdf_stream as they are generated, so memory stays flat
+whatever --salads is. The same arguments and --seed give the same individuals (only the
+blank node labels of the copied T-box differ between runs). The nutrition totals are left
+to the pipeline (infer.py, calculatedSaladNutrition.py).
+
+    python generate_salad_bar.py --salads 100000 [--people 1000] [--new-ingredients 50] [--jitter 0.5]
+        [--seed 0] [--ontology salad_ontology.rdf] [--output output/synthetic_salad_bar.rdf | .nt]
+"""
+import argparse
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from itertools import accumulate
+from pathlib import Path
+
+from rdflib import Graph, Literal
+from rdflib.namespace import OWL, RDF, XSD
+
+sys.path.append(str(Path(__file__).resolve().parent / "scripts"))
+from common.ontology import ONTOLOGY_FILE, SALAD, local_name
+from common.rdf_stream import open_writer
+from common.salad_index import get_salad_index
+from common.timing import span
+
+# === CONFIGURATION ===
+OUTPUT_FILE = "output/synthetic_salad_bar.rdf"
+DEFAULT_SEED = 0
+JITTER = 0.5          # share of portions whose size is resampled instead of copied
+PORTION_SIGMA = 0.3   # log-normal spread of resampled portion sizes
+PORTION_STEP = 5      # resampled portion sizes are rounded to this many g/ml
+NUTRIENT_SIGMA = 0.25  # log-normal spread of synthetic ingredients' substance amounts
+
+# Individuals of these classes are replaced by generated ones
+REPLACED_CLASSES = (SALAD.Salad, SALAD.Person, SALAD.SaladNutrientTotal, SALAD.SaladSubstance)
+
+PORTIONS = {
+    "ingredient": (SALAD.IngredientPortion, SALAD.hasIngredientPortion, SALAD.hasIngredient),
+    "dressing": (SALAD.DressingPortion, SALAD.hasDressingPortion, SALAD.hasDressing),
+}
+UNIT_SUFFIXES = {"grams": "g", "millilitres": "ml"}
+
+
+class SaladBarProfile:
+    """The distributions the generator samples from, measured on a real ontology."""
+
+    def __init__(self, g):
+        index = get_salad_index(g)
+        self.replaced = {s for cls in REPLACED_CLASSES for s in g.subjects(RDF.type, cls)}
+
+        # Portions per salad and component popularity, per kind
+        self.portion_counts = {kind: [] for kind in PORTIONS}
+        usage = Counter()
+        for salad in index.salads:
+            kinds = Counter(kind for _, kind in index.salad_portions.get(salad, []))
+            for kind in PORTIONS:
+                self.portion_counts[kind].append(kinds[kind])
+            usage.update(index.salad_components(salad))
+        self.components = {kind: [] for kind in PORTIONS}
+        self.weights = {kind: [] for kind in PORTIONS}
+        for component, kind in sorted(index.component_kinds.items()):
+            if index.component_substances.get(component):
+                self.components[kind].append(component)
+                self.weights[kind].append(usage[component] + 1)
+
+        # component -> [(portion IRI, amount, unit literal)]; the kind's sizes (no IRI) for components without portions
+        self.portions = defaultdict(list)
+        self.kind_portions = {kind: [] for kind in PORTIONS}
+        for kind, (_, _, component_link) in PORTIONS.items():
+            for portion, component in sorted(g.subject_objects(component_link)):
+                for amount in g.objects(portion, SALAD.hasAmount):
+                    for unit in g.objects(portion, SALAD.hasUnit):
+                        self.portions[component].append((portion, float(amount), unit))
+                        self.kind_portions[kind].append((None, float(amount), unit))
+        self.portion_names = {local_name(p) for samples in self.portions.values() for p, _, _ in samples}
+        # Resampled portions stay within the kind's real sizes and use its most common unit
+        self.amount_ranges = {kind: (min(a for _, a, _ in samples), max(a for _, a, _ in samples))
+                              for kind, samples in self.kind_portions.items()}
+        self.units = {kind: Counter(u for _, _, u in samples).most_common(1)[0][0]
+                      for kind, samples in self.kind_portions.items()}
+
+        # Templates for synthetic ingredients
+        self.classes = {c: sorted(t for t in g.objects(c, RDF.type) if t != OWL.NamedIndividual)
+                        for c in self.components["ingredient"]}
+        self.substances = {
+            c: sorted((s, float(a), u)
+                      for sp in g.objects(c, SALAD.hasSubstancePortion)
+                      for s in g.objects(sp, SALAD.hasSubstance)
+                      for a in g.objects(sp, SALAD.hasAmount)
+                      for u in g.objects(sp, SALAD.hasUnit))
+            for c in self.components["ingredient"]
+        }
+        self.allergens_of = {c: sorted(a) for c, a in index.component_allergens.items()}
+
+        # People
+        people = sorted(g.subjects(RDF.type, SALAD.Person))
+        self.allergens = sorted(g.subjects(RDF.type, SALAD.Allergen))
+        self.purposes = sorted(g.subjects(RDF.type, SALAD.SpecificPurpose))
+        self.allergy_counts = [len(list(g.objects(p, SALAD.hasAllergicTo))) for p in people] or [1]
+        self.purpose_counts = [len(list(g.objects(p, SALAD.hasSpecificPurpose))) for p in people] or [1]
+        allergies = [a for p in people for a in g.objects(p, SALAD.hasAllergicTo)]
+        self.allergen_share = sum(a in self.allergens for a in allergies) / len(allergies) if allergies else 0.5
+
+
+class SaladBarGenerator:
+    """Yields (subject, [(predicate, object)]) descriptions of synthetic individuals."""
+
+    def __init__(self, profile, seed=DEFAULT_SEED, jitter=JITTER):
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.jitter = jitter
+        self.written_portions = set(profile.portion_names)
+        self.counts = Counter()
+
+    def ingredients(self, count):
+        """Variants of random real ingredients; they join the ingredient pool for later salads."""
+        p = self.profile
+        templates = list(p.components["ingredient"])
+        for i in range(count):
+            template = self.rng.choice(templates)
+            ingredient = SALAD[f"{local_name(template)}Variant{i}"]
+            pairs = [(RDF.type, OWL.NamedIndividual)]
+            pairs += [(RDF.type, cls) for cls in p.classes[template]]
+            pairs += [(SALAD.containAllergen, allergen) for allergen in p.allergens_of.get(template, ())]
+            substance_portions = []
+            for substance, amount, unit in p.substances[template]:
+                substance_portion = SALAD[f"{local_name(ingredient)}{local_name(substance)}"]
+                amount *= self.rng.lognormvariate(0, NUTRIENT_SIGMA)
+                substance_portions.append((substance_portion, [
+                    (RDF.type, OWL.NamedIndividual),
+                    (RDF.type, SALAD.SubstancePortion),
+                    (SALAD.hasSubstance, substance),
+                    (SALAD.hasAmount, Literal(f"{amount:.3f}", datatype=XSD.decimal)),
+                    (SALAD.hasUnit, unit),
+                ]))
+                pairs.append((SALAD.hasSubstancePortion, substance_portion))
+            yield ingredient, pairs
+            yield from substance_portions
+
+            p.components["ingredient"].append(ingredient)
+            p.weights["ingredient"].append(1)
+            p.portions[ingredient] = [(None, amount, unit) for _, amount, unit in p.portions.get(template, ())]
+            self.counts["ingredients"] += 1
+
+    def _portion(self, kind, component):
+        """Pick a portion of `component`; returns (portion IRI, its description or None if it already exists)."""
+        samples = self.profile.portions.get(component) or self.profile.kind_portions[kind]
+        portion, amount, _ = self.rng.choice(samples)
+        if portion is not None and self.rng.random() >= self.jitter:
+            return portion, None
+        low, high = self.profile.amount_ranges[kind]
+        amount = max(PORTION_STEP, round(amount * self.rng.lognormvariate(0, PORTION_SIGMA) / PORTION_STEP) * PORTION_STEP)
+        amount = min(max(amount, low), high)
+        unit = self.profile.units[kind]
+        name = f"{local_name(component)}{amount:g}{UNIT_SUFFIXES.get(str(unit), 'g')}"
+        portion = SALAD[name]
+        if name in self.written_portions:
+            return portion, None
+        self.written_portions.add(name)
+        self.counts["portions"] += 1
+        portion_class, _, component_link = PORTIONS[kind]
+        return portion, [
+            (RDF.type, OWL.NamedIndividual),
+            (RDF.type, portion_class),
+            (component_link, component),
+            (SALAD.hasAmount, Literal(f"{amount:.1f}", datatype=XSD.decimal)),
+            (SALAD.hasUnit, unit),
+        ]
+
+    def salads(self, count):
+        p = self.profile
+        cum_weights = {kind: list(accumulate(p.weights[kind])) for kind in PORTIONS}
+        for i in range(count):
+            salad = SALAD[f"SyntheticSalad{i}"]
+            pairs = [(RDF.type, OWL.NamedIndividual), (RDF.type, SALAD.Salad)]
+            new_portions = []
+            for kind, (_, salad_link, _) in PORTIONS.items():
+                size = min(self.rng.choice(p.portion_counts[kind]), len(p.components[kind]))
+                chosen = set()
+                while len(chosen) < size:
+                    chosen.update(self.rng.choices(p.components[kind], cum_weights=cum_weights[kind], k=size - len(chosen)))
+                for component in sorted(chosen):
+                    portion, description = self._portion(kind, component)
+                    pairs.append((salad_link, portion))
+                    if description:
+                        new_portions.append((portion, description))
+            yield from new_portions
+            yield salad, pairs
+            self.counts["salads"] += 1
+
+    def people(self, count):
+        p = self.profile
+        components = p.components["ingredient"] + p.components["dressing"]
+        for i in range(count):
+            allergies = set()
+            for _ in range(self.rng.choice(p.allergy_counts)):
+                if p.allergens and self.rng.random() < p.allergen_share:
+                    allergies.add(self.rng.choice(p.allergens))
+                else:
+                    allergies.add(self.rng.choice(components))
+            purposes = self.rng.sample(p.purposes, min(self.rng.choice(p.purpose_counts), len(p.purposes)))
+            yield SALAD[f"SyntheticPerson{i}"], [
+                (RDF.type, OWL.NamedIndividual),
+                (RDF.type, SALAD.Person),
+                *((SALAD.hasAllergicTo, allergy) for allergy in sorted(allergies)),
+                *((SALAD.hasSpecificPurpose, purpose) for purpose in sorted(purposes)),
+            ]
+            self.counts["people"] += 1
+
+
+def generate(source, output, salads, people=0, new_ingredients=0, seed=DEFAULT_SEED, jitter=JITTER):
+    """Write the synthetic ontology to `output`; return (triples written, generator counts)."""
+    g = Graph()
+    with span("parse", graph=g):
+        g.parse(source, format="xml")
+    with span("profile"):
+        profile = SaladBarProfile(g)
+    generator = SaladBarGenerator(profile, seed, jitter)
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with span("write") as write_span, open_writer(output) as writer:
+        writer.write_graph(g, skip=profile.replaced)
+        for subject, pairs in generator.ingredients(new_ingredients):
+            writer.describe(subject, pairs)
+        for subject, pairs in generator.salads(salads):
+            writer.describe(subject, pairs)
+        for subject, pairs in generator.people(people):
+            writer.describe(subject, pairs)
+        write_span.set(triples=writer.triples)
+    return writer.triples, generator.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic salad bar ontology for load testing.")
+    parser.add_argument("--salads", type=int, required=True, help="Number of salads to generate")
+    parser.add_argument("--people", type=int, default=0, help="Number of people with allergies and purposes")
+    parser.add_argument("--new-ingredients", type=int, default=0, help="Synthetic ingredient variants to add")
+    parser.add_argument("--jitter", type=float, default=JITTER, help="Share of portions with resampled sizes (0-1)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE, help="Real ontology the distributions come from")
+    parser.add_argument("--output", default=OUTPUT_FILE, help=".rdf (RDF/XML) or .nt (N-Triples)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    triples, counts = generate(args.ontology, args.output, args.salads, args.people,
+                               args.new_ingredients, args.seed, args.jitter)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Wrote {triples} triples to {args.output} in {elapsed:.2f}s ({triples / elapsed:,.0f} triples/s)")
+    print(f"   {counts['salads']} salads, {counts['portions']} new portions, "
+          f"{counts['ingredients']} new ingredients, {counts['people']} people")
+
+
+if __name__ == "__main__":
+    main()
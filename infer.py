@@ -0,0 +1,393 @@
+"""
+Run the ontology pipeline as a dependency graph of steps (replaces infer.sh).
+
+    [ingest -> assign ->] normalize_units -> remove_totals -> nutrients -> save
+    save -> classify, similar_dressing, similar_ingredient, export_xlsx, llm_summary
+
+ingest and assign rebuild portions from data/ and are opt-in: they only run when named
+in --steps (`--steps ingest assign save`). The default run starts from the ontology as is.
+
+Each step declares the data and code files it reads. Its key is a hash of those files,
+the keys of its dependencies and the ontology the run started from. A step is skipped
+when its key matches the last successful run (output/.infer_state.json) and its outputs
+exist. The ontology is parsed at most once. Graph steps share that in-memory graph, and
+`save` serializes it once. Steps that change the graph are only recorded as done once
+`save` succeeds, and `save` refuses to write when a step gave a portion a second
+hasAmount. Steps whose dependencies are finished run concurrently (--jobs).
+
+    python infer.py [--ontology salad_ontology.rdf] [--steps nutrients ...] [--force] [--jobs 4]
+                    [--plan] [--timing FILE] [--profile [cpu,memory]]
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from rdflib import Graph
+
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT / "scripts"))
+sys.path.append(str(ROOT / "scripts" / "assign"))
+sys.path.append(str(ROOT / "scripts" / "for_inferred_property"))
+from common.ontology import ONTOLOGY_FILE, SALAD, file_digest, local_name
+from common.profiling import add_profile_arguments, profile_from_args
+from common.timing import configure, span
+
+# === CONFIGURATION ===
+STATE_FILE = "output/.infer_state.json"
+SUBSTANCE_FILE = "data/substance_portion.txt"
+RECIPE_FILE = "data/salad_recipes.csv"
+CLASSIFICATION_FILE = "output/salad_classification.csv"
+XLSX_FILE = "data/salad_ontology.xlsx"
+SUMMARY_FILE = "ontology_summary_focused.txt"
+SUMMARY_SEED = 0
+DEFAULT_JOBS = 4
+
+
+def multiple_amounts(g):
+    """Subjects with more than one hasAmount (the salad totals would sum every one)."""
+    counts = Counter(g.subjects(SALAD.hasAmount, None))
+    return {subject for subject, count in counts.items() if count > 1}
+
+
+class Context:
+    """What the steps share: the ontology path and one lazily parsed graph."""
+
+    def __init__(self, ontology):
+        self.ontology = ontology
+        self.loaded = None
+        self.loaded_multiple_amounts = set()  # already duplicated in the file; reported, not fatal
+        self._lock = threading.Lock()
+
+    @property
+    def graph(self):
+        with self._lock:
+            if self.loaded is None:
+                g = Graph()
+                with span("parse", graph=g):
+                    g.parse(self.ontology, format="xml")
+                self.loaded_multiple_amounts = multiple_amounts(g)
+                self.loaded = g
+        return self.loaded
+
+
+class Step:
+    """One node of the DAG. `func(ctx)` returns a one-line summary."""
+
+    def __init__(self, name, func, deps=(), inputs=(), code=(), outputs=(), mutates=False, graph=True,
+                 optional=False):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.inputs = list(inputs)    # data files, relative to the working directory
+        self.code = list(code)        # source files, relative to the repository
+        self.outputs = list(outputs)  # files the step writes; "{ontology}" is the ontology path
+        self.mutates = mutates        # changes the shared graph (state kept only once saved)
+        self.graph = graph            # needs the parsed graph
+        self.optional = optional      # only runs when named in --steps, never pulled in as a dependency
+
+    def output_paths(self, ctx):
+        return [Path(output.format(ontology=ctx.ontology)) for output in self.outputs]
+
+    def key(self, dep_keys, base):
+        parts = [self.name, base]
+        # Optional deps left out of this run have no key
+        parts += [f"{dep} {dep_keys[dep]}" for dep in self.deps if dep in dep_keys]
+        parts += [f"{path} {file_digest(path)}" for path in self.inputs]
+        parts += [f"{path} {file_digest(ROOT / path)}" for path in self.code]
+        return hashlib.sha1("\n".join(parts).encode("utf8")).hexdigest()
+
+
+# === STEPS ===
+def ingest(ctx):
+    from common.sheet_stream import add_batched
+    from common.substance_stream import (describe_conflict, iter_substance_blocks, replace_existing_values,
+                                         substance_portion_triples)
+
+    stats, conflicts = {}, []
+    before = len(ctx.graph)
+    triples = substance_portion_triples(iter_substance_blocks(SUBSTANCE_FILE), stats)
+    add_batched(ctx.graph, replace_existing_values(ctx.graph, triples, conflicts))
+    for conflict in conflicts:
+        print(f"⚠️ {describe_conflict(conflict)}")
+    replaced = sum(c[4] == "replaced" for c in conflicts)
+    return f"{stats['portions']} substance portions (+{len(ctx.graph) - before} triples, {replaced} values replaced)"
+
+
+def assign(ctx):
+    import pipeline
+
+    results = pipeline.run_pipeline(ctx.graph)
+    return ", ".join(f"{name} +{added}" for name, _, added in results)
+
+
+def normalize_units(ctx):
+    import convert_unit
+
+    return f"{convert_unit.convert_units(ctx.graph)} VitaminA portions converted to mg/100g"
+
+
+def remove_totals(ctx):
+    from remove_inferred_property_total import remove_total_links_and_substances
+
+    counts = remove_total_links_and_substances(ctx.graph)
+    return f"removed {counts['links']} links and {counts['instances']} instances"
+
+
+def nutrients(ctx):
+    import calculatedSaladNutrition
+
+    return f"{len(calculatedSaladNutrition.calculate_all_salads(ctx.graph))} salads totalled"
+
+
+def save(ctx):
+    duplicated = multiple_amounts(ctx.graph)
+    added = sorted(local_name(s) for s in duplicated - ctx.loaded_multiple_amounts)
+    if added:
+        raise ValueError(f"{len(added)} subjects got a second hasAmount, not saving: {', '.join(added[:10])}")
+    for subject in sorted(duplicated):
+        print(f"⚠️ {local_name(subject)} already had several hasAmount values in {ctx.ontology}")
+    ctx.graph.serialize(destination=ctx.ontology, format="xml")
+    return f"{len(ctx.graph)} triples written to {ctx.ontology}"
+
+
+def classify(ctx):
+    from common.recommender import PURPOSES, SaladRecommender
+    from common.table_writer import StreamingTableWriter
+
+    recommender = SaladRecommender.from_graph(ctx.graph)
+    rows = ([name, "; ".join(p for p, member in zip(PURPOSES, members) if member)]
+            for name, members in zip(recommender.salad_names, recommender.purpose_members))
+    with StreamingTableWriter(CLASSIFICATION_FILE, ["salad", "purposes"], "csv") as writer:
+        writer.write_rows(rows)
+    return f"{writer.written} salads classified by purpose rules"
+
+
+def similar_substance(kind):
+    def step(ctx):
+        from common.salad_index import get_salad_index, similar_substance_pairs
+        from common.table_writer import StreamingTableWriter
+
+        outfile = f"output/similar_substance_{kind}.html"
+        fields = [f"{kind}X", "substancesX", f"{kind}Y", "substancesY"]
+        pairs = similar_substance_pairs(get_salad_index(ctx.graph), kind)
+        with StreamingTableWriter(outfile, fields, "html") as writer:
+            writer.write_rows([local_name(value) for value in row] for row in pairs)
+        return f"{writer.written} {kind} pairs"
+    return step
+
+
+def export_xlsx(ctx):
+    from to_exel import export_ontology_to_xlsx_with_swrl
+
+    export_ontology_to_xlsx_with_swrl(ctx.ontology, XLSX_FILE)
+    return XLSX_FILE
+
+
+def llm_summary(ctx):
+    from told_llm import OntologySummary
+
+    ctx.graph.bind("s", SALAD)
+    with open(SUMMARY_FILE, "w", encoding="utf8") as f:
+        f.writelines(OntologySummary(ctx.graph, random.Random(SUMMARY_SEED)).lines())
+    return SUMMARY_FILE
+
+
+ASSIGN_CODE = [
+    "scripts/assign/pipeline.py", "scripts/assign/assign_ingredient_property.py",
+    "scripts/assign/assign_substance.py", "scripts/assign/assign_substance_portion.py",
+    "scripts/assign/assign_ingredient.py", "scripts/common/name_index.py",
+    "scripts/common/recipes.py", "scripts/common/search_index.py",
+]
+
+STEPS = [
+    Step("ingest", ingest, inputs=[SUBSTANCE_FILE], mutates=True, optional=True,
+         code=["scripts/common/substance_stream.py", "scripts/common/sheet_stream.py"]),
+    Step("assign", assign, deps=["ingest"], inputs=[RECIPE_FILE, SUBSTANCE_FILE], code=ASSIGN_CODE, mutates=True,
+         optional=True),
+    Step("normalize_units", normalize_units, deps=["assign"], code=["scripts/assign/convert_unit.py"], mutates=True),
+    Step("remove_totals", remove_totals, deps=["normalize_units"], code=["remove_inferred_property_total.py"],
+         mutates=True),
+    Step("nutrients", nutrients, deps=["remove_totals"], mutates=True,
+         code=["scripts/for_inferred_property/calculatedSaladNutrition.py", "scripts/common/salad_index.py"]),
+    Step("save", save, deps=["nutrients"], outputs=["{ontology}"]),
+    Step("classify", classify, deps=["save"], outputs=[CLASSIFICATION_FILE],
+         code=["scripts/common/recommender.py", "scripts/common/salad_index.py"]),
+    Step("similar_dressing", similar_substance("dressing"), deps=["save"],
+         outputs=["output/similar_substance_dressing.html"],
+         code=["scripts/common/salad_index.py", "scripts/common/table_writer.py"]),
+    Step("similar_ingredient", similar_substance("ingredient"), deps=["save"],
+         outputs=["output/similar_substance_ingredient.html"],
+         code=["scripts/common/salad_index.py", "scripts/common/table_writer.py"]),
+    Step("export_xlsx", export_xlsx, deps=["save"], outputs=[XLSX_FILE], graph=False,
+         code=["scripts/assign/to_exel.py", "scripts/common/swrl.py"]),
+    Step("llm_summary", llm_summary, deps=["save"], outputs=[SUMMARY_FILE], code=["told_llm.py"]),
+]
+STEP_NAMES = [step.name for step in STEPS]
+
+
+# === SCHEDULING ===
+def select_steps(steps, targets=None):
+    """
+    `targets` (default: every non-optional step) and everything they depend on, in STEPS
+    order. Optional steps are only included when they are targets themselves.
+    """
+    by_name = {step.name: step for step in steps}
+    targets = list(targets) if targets else [step.name for step in steps if not step.optional]
+    wanted = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in wanted and (name in targets or not by_name[name].optional):
+            wanted.add(name)
+            todo.extend(by_name[name].deps)
+    return [step for step in steps if step.name in wanted]
+
+
+def load_state(path=STATE_FILE):
+    path = Path(path)
+    if not path.exists():
+        return {"steps": {}}
+    with open(path, encoding="utf8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_FILE):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf8") as f:
+        json.dump(state, f, indent=1)
+
+
+def run_base(ctx, state):
+    """
+    Identity of the ontology this run starts from. If the file is still what the last
+    `save` wrote, that run's base is reused so its graph steps count as up to date.
+    """
+    digest = file_digest(ctx.ontology)
+    return state["base"] if digest == state.get("saved") else digest
+
+
+def run_dag(steps, ctx, state, force=False, jobs=DEFAULT_JOBS, plan=False, state_path=STATE_FILE):
+    """
+    Run `steps` (dependencies first, independent ones concurrently); returns {name: status}
+    with status "ran", "up to date", "would run", "failed" or "blocked".
+    """
+    base = run_base(ctx, state)
+    recorded = state["steps"]
+    keys, status, unsaved = {}, {}, {}
+    pending = list(steps)
+    selected = {step.name for step in steps}  # deps outside it are optional steps left out of this run
+    running = {}
+
+    def finish(step, ok, summary):
+        if not ok:
+            status[step.name] = "failed"
+            print(f"❌ {step.name}: {summary}")
+            return
+        status[step.name] = "ran"
+        print(f"✅ {step.name}: {summary}")
+        if step.mutates:
+            unsaved[step.name] = keys[step.name]
+        else:
+            recorded[step.name] = keys[step.name]
+        if step.name == "save":
+            # The graph steps' changes are on disk now
+            recorded.update(unsaved)
+            unsaved.clear()
+            state.update(base=base, saved=file_digest(ctx.ontology))
+        save_state(state, state_path)
+
+    def execute(step):
+        g = ctx.graph if step.graph else None
+        with span(step.name, graph=g):
+            return step.func(ctx)
+
+    pool = ThreadPoolExecutor(jobs) if jobs > 1 and not plan else None
+    try:
+        while pending or running:
+            progressed = False
+            for step in list(pending):
+                dep_status = [status.get(dep) for dep in step.deps if dep in selected]
+                if any(s in ("failed", "blocked") for s in dep_status):
+                    status[step.name] = "blocked"
+                elif all(s in ("ran", "up to date", "would run") for s in dep_status):
+                    keys[step.name] = step.key(keys, base)
+                    fresh = recorded.get(step.name) == keys[step.name] and all(
+                        path.exists() for path in step.output_paths(ctx))
+                    if fresh and not force and "would run" not in dep_status:
+                        status[step.name] = "up to date"
+                    elif plan:
+                        status[step.name] = "would run"
+                    elif pool is None:
+                        print(f"\n▶️ {step.name}")
+                        try:
+                            finish(step, True, execute(step))
+                        except Exception as e:
+                            finish(step, False, f"{type(e).__name__}: {e}")
+                    else:
+                        print(f"\n▶️ {step.name}")
+                        running[pool.submit(execute, step)] = step
+                        status[step.name] = "running"
+                else:
+                    continue
+                pending.remove(step)
+                progressed = True
+            if not running and not progressed:
+                break  # nothing left that can start
+            if running and not progressed:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    error = future.exception()
+                    finish(step, error is None,
+                           future.result() if error is None else f"{type(error).__name__}: {error}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return status
+
+
+def print_summary(status, elapsed):
+    print("\n=== INFER SUMMARY ===")
+    for label in ("ran", "up to date", "would run", "failed", "blocked"):
+        names = [name for name, s in status.items() if s == label]
+        if names:
+            print(f"- {label} ({len(names)}): {', '.join(names)}")
+    print(f"Total steps: {len(status)} in {elapsed:.2f}s")
+    print("=====================")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the ontology pipeline as a DAG, skipping up-to-date steps.")
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE)
+    parser.add_argument("--steps", nargs="+", choices=STEP_NAMES,
+                        help="Run these steps and what they depend on (default: all but the optional ingest, assign)")
+    parser.add_argument("--force", action="store_true", help="Run the selected steps even if they are up to date")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Steps run at the same time")
+    parser.add_argument("--plan", action="store_true", help="Only show which steps would run")
+    parser.add_argument("--state", default=STATE_FILE, help="Where step keys of the last run are kept")
+    parser.add_argument("--timing", metavar="FILE", help="Append one JSON line per step/phase to FILE, '-' for stderr")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    configure(args.timing)
+    if args.profile:
+        args.jobs = 1  # cProfile / tracemalloc snapshots only follow the main thread
+
+    start = time.perf_counter()
+    ctx = Context(args.ontology)
+    state = load_state(args.state)
+    with profile_from_args(args, "infer"):
+        status = run_dag(select_steps(STEPS, args.steps), ctx, state, args.force, args.jobs, args.plan, args.state)
+    print_summary(status, time.perf_counter() - start)
+    if any(s in ("failed", "blocked") for s in status.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
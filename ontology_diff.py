@@ -0,0 +1,87 @@
+"""
+Diff, hash, apply and roll back ontology versions through canonical N-Triples.
+
+    python ontology_diff.py hash salad_ontology.rdf
+    python ontology_diff.py diff salad_ontology_before_inferred.rdf salad_ontology.rdf -o inferred.nt
+    python ontology_diff.py apply inferred.nt --reverse        # roll back just the inferred triples
+
+A diff is a sorted "+ / -" N-Triples file (see scripts/common/changeset.py) and applying
+or reversing it costs time proportional to its size, not to the ontology's.
+"""
+import argparse
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent / "scripts"))
+from common.changeset import Changeset
+from common.graph_diff import apply_changeset, canonical_lines, diff_lines, graph_hash
+from common.ontology import ONTOLOGY_FILE, load_graph, local_name
+
+
+def summarize(changeset):
+    """Print added / removed counts per predicate."""
+    for sign, triples in (("+", changeset.added), ("-", changeset.removed)):
+        by_predicate = Counter(local_name(p) for _, p, _ in triples)
+        print(f"{sign} {len(triples)} triples")
+        for predicate, count in by_predicate.most_common():
+            print(f"    {predicate}: {count}")
+
+
+def cmd_hash(args):
+    for path in args.files:
+        print(f"{graph_hash(load_graph(path))}  {path}")
+
+
+def cmd_diff(args):
+    old_lines = canonical_lines(load_graph(args.old))
+    new_lines = canonical_lines(load_graph(args.new))
+    changeset = diff_lines(old_lines, new_lines)
+    print(f"{args.old} -> {args.new}")
+    summarize(changeset)
+    if args.output:
+        changeset.write(args.output)
+        print(f"\n✅ Diff written to {args.output}")
+
+
+def cmd_apply(args):
+    changeset = Changeset.read(args.changeset)
+    if args.reverse:
+        changeset = changeset.inverse()
+    g = load_graph(args.ontology)
+    before = len(g)
+    apply_changeset(g, changeset)
+    output = args.output or args.ontology
+    g.serialize(destination=output, format="xml")
+    action = "Reversed" if args.reverse else "Applied"
+    print(f"✅ {action} {args.changeset}: +{len(changeset.added)} / -{len(changeset.removed)} "
+          f"triples ({before} -> {len(g)}), saved to {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Canonical diffs between ontology versions.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("hash", help="Print the canonical sha256 of each ontology file")
+    p.add_argument("files", nargs="+")
+    p.set_defaults(func=cmd_hash)
+
+    p = sub.add_parser("diff", help="Diff two ontology files in one merge pass")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("-o", "--output", help="Write the changeset to this file")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("apply", help="Apply (or with --reverse, undo) a changeset")
+    p.add_argument("changeset")
+    p.add_argument("--ontology", default=ONTOLOGY_FILE)
+    p.add_argument("--output", help="Where to save (default: overwrite --ontology)")
+    p.add_argument("--reverse", action="store_true", help="Apply the inverse changeset (rollback)")
+    p.set_defaults(func=cmd_apply)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
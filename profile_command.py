@@ -0,0 +1,39 @@
+"""
+Run any pipeline script under per-phase cProfile / tracemalloc profiling.
+
+The script runs in this process as __main__, so every timing span it opens (parse,
+query_salads, update, serialize, ...) gets its own .prof and allocation file; see
+scripts/common/profiling.py. Scripts with their own argparse CLI (scripts/assign/pipeline.py)
+take --profile directly instead.
+
+    python profile_command.py [--profile cpu,memory] [--profile-dir output/profile] [--profile-top 25] \
+        scripts/for_inferred_property/calculatedSaladNutrition.py [script arguments ...]
+"""
+import argparse
+import runpy
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent / "scripts"))
+from common.profiling import PROFILE_MODES, add_profile_arguments, profile_from_args
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile every timed phase of a pipeline script.")
+    add_profile_arguments(parser)
+    parser.set_defaults(profile=PROFILE_MODES)
+    parser.add_argument("script", help="Python script to run")
+    parser.add_argument("arguments", nargs=argparse.REMAINDER, help="Arguments passed to the script")
+    args = parser.parse_args()
+
+    sys.argv = [args.script, *args.arguments]
+    with profile_from_args(args, Path(args.script).stem):
+        try:
+            runpy.run_path(args.script, run_name="__main__")
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                raise
+
+
+if __name__ == "__main__":
+    main()
@@ -1,95 +1,79 @@
-import rdflib
+import argparse
 from rdflib import Graph, URIRef, Namespace
 from rdflib.namespace import RDF
-import shutil
 
 # Define namespaces
 S = Namespace("http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#")
 
-# List of hasTotal* properties to remove
-PROPERTIES_TO_REMOVE = [
-    S.hasTotalCalcium,
-    S.hasTotalCarbohydrate,
-    S.hasTotalCholesterol,
-    S.hasTotalFat,
-    S.hasTotalFoodEnergy,
-    S.hasTotalIron,
-    S.hasTotalLutein,
-    S.hasTotalOmega_3,
-    S.hasTotalPotassium,
-    S.hasTotalProtein,
-    S.hasTotalSodium,
-    S.hasTotalVitaminA,
-    S.hasTotalVitaminB9,
-    S.hasTotalVitaminC,
-    S.hasTotalZeaxanthin,
-    S.hasTotalZinc,
-    S.hasTotalVitaminE
-]
-
-def remove_total_links_and_substances():
+ONTOLOGY_FILE = "salad_ontology.rdf"
+
+# Every hasTotal* link (hasTotalOmega-3 and hasTotalOmega_3 both occur) plus hasNutrient
+TOTAL_PROPERTY_PREFIX = str(S) + "hasTotal"
+LINK_PROPERTIES = {S.hasNutrient}
+
+# Classes whose instances are created by the for_inferred_property scripts
+INFERRED_CLASSES = [S.SaladSubstance, S.SaladNutrientTotal]
+
+def is_inferred_link(prop):
+    return prop in LINK_PROPERTIES or str(prop).startswith(TOTAL_PROPERTY_PREFIX)
+
+def remove_total_links_and_substances(g, verbose=False):
     """
-    Remove all hasTotal* property links, SaladSubstance instances, and their hasAmount and hasUnit triples from the ontology.
+    Remove hasTotal* and hasNutrient links, and every SaladSubstance / SaladNutrientTotal
+    instance with all of its triples. Returns a dict of removal counts.
     """
+    counts = {"links": 0, "instances": 0, "instance triples": 0}
+
+    # Step 1: Remove hasTotal* / hasNutrient links (predicate-indexed, one lookup per property)
+    for prop in {p for p in g.predicates() if is_inferred_link(p)}:
+        triples = list(g.triples((None, prop, None)))
+        for triple in triples:
+            g.remove(triple)
+            if verbose:
+                s, p, o = triple
+                print(f"Removed link: {s.split('#')[-1]} {p.split('#')[-1]} {o.split('#')[-1]}")
+        counts["links"] += len(triples)
+
+    # Step 2: Remove the SaladSubstance / SaladNutrientTotal instances themselves
+    for cls in INFERRED_CLASSES:
+        for instance in list(g.subjects(RDF.type, cls)):
+            triples = list(g.triples((instance, None, None)))
+            for triple in triples:
+                g.remove(triple)
+            counts["instances"] += 1
+            counts["instance triples"] += len(triples)
+            if verbose:
+                print(f"Removed {cls.split('#')[-1]} instance: {instance.split('#')[-1]} ({len(triples)} triples)")
+
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strip inferred salad totals from the ontology.")
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE)
+    parser.add_argument("--verbose", action="store_true", help="Print every removed link and instance")
+    args = parser.parse_args()
+
     g = Graph()
     try:
-        g.parse("salad_ontology.rdf", format="xml")
+        g.parse(args.ontology, format="xml")
     except FileNotFoundError:
-        print("Error: salad_ontology.rdf not found. Exiting.")
-        return
-    
+        print(f"Error: {args.ontology} not found. Exiting.")
+        raise SystemExit(1)
+
     # Count total triples before removal
     initial_triple_count = len(g)
     print(f"Total triples before removal: {initial_triple_count}")
-    
-    # Step 1: Remove all hasTotal* property links
-    removed_link_count = 0
-    for prop in PROPERTIES_TO_REMOVE:
-        prop_name = prop.split("#")[-1]
-        triples = list(g.triples((None, prop, None)))
-        for s, p, o in triples:
-            g.remove((s, p, o))
-            removed_link_count += 1
-            print(f"Removed link: {s.split('#')[-1]} {prop_name} {o.split('#')[-1]}")
-    
-    print(f"\nRemoved {removed_link_count} hasTotal* links.")
-    
-    # Step 2: Remove all SaladSubstance instances and their hasAmount, hasUnit triples
-    removed_substance_count = 0
-    removed_amount_unit_count = 0
-    substances = list(g.subjects(RDF.type, S.SaladSubstance))
-    for substance in substances:
-        substance_name = substance.split("#")[-1]
-        
-        # Remove hasAmount triples
-        for s, p, o in g.triples((substance, S.hasAmount, None)):
-            g.remove((s, p, o))
-            removed_amount_unit_count += 1
-            print(f"Removed hasAmount for {substance_name}")
-        
-        # Remove hasUnit triples
-        for s, p, o in g.triples((substance, S.hasUnit, None)):
-            g.remove((s, p, o))
-            removed_amount_unit_count += 1
-            print(f"Removed hasUnit for {substance_name}")
-        
-        # Remove the SaladSubstance instance (RDF.type triple and any remaining triples)
-        g.remove((substance, None, None))
-        removed_substance_count += 1
-        print(f"Removed SaladSubstance instance: {substance_name}")
-    
-    print(f"\nRemoved {removed_substance_count} SaladSubstance instances.")
-    print(f"Removed {removed_amount_unit_count} hasAmount/hasUnit triples.")
-    
+
+    counts = remove_total_links_and_substances(g, args.verbose)
+
+    print(f"\nRemoved {counts['links']} hasTotal*/hasNutrient links.")
+    print(f"Removed {counts['instances']} SaladSubstance/SaladNutrientTotal instances "
+          f"({counts['instance triples']} triples).")
+
     # Count total triples after removal
     final_triple_count = len(g)
     print(f"Total triples after removal: {final_triple_count}")
     print(f"Total triples removed: {initial_triple_count - final_triple_count}")
-    
-    # Save to a temporary file first, then copy to ensure proper update
-    temp_file = "salad_ontology.rdf"
-    g.serialize(destination=temp_file, format="xml")
-    print("Updated ontology saved as 'salad_ontology.rdf'.")
 
-if __name__ == "__main__":
-    remove_total_links_and_substances()
\ No newline at end of file
+    g.serialize(destination=args.ontology, format="xml")
+    print(f"Updated ontology saved as '{args.ontology}'.")
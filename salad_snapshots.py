@@ -0,0 +1,168 @@
+"""
+Seeded, cached exploration snapshots for every salad.
+
+A snapshot is the told_llm.py exploration text of one salad. Its substance portion sample
+comes from a random generator seeded with (seed, salad IRI), so it is the same on every
+run and independent of which other salads are rendered. Snapshots are cached by salad
+IRI, seed and depth. Each entry records the nodes the exploration read and a digest of
+their triples (plus the class hierarchy). An entry is reused until that subgraph
+changes. All salads are rendered in one batch that shares the n3, label and type caches
+and the per-node digests.
+
+    python salad_snapshots.py [--ontology salad_ontology.rdf] [--cache output/salad_snapshots.json]
+                              [--seed 0] [--max-depth 10] [--salad GreekSalad ...] [--output snapshots.txt]
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDF
+from rdflib.term import BNode
+
+sys.path.append(str(Path(__file__).resolve().parent / "scripts"))
+from common.ontology import ONTOLOGY_FILE, SALAD, local_name
+from told_llm import MAX_DEPTH, OntologySummary
+
+# === CONFIGURATION ===
+SNAPSHOT_FILE = "output/salad_snapshots.json"
+CACHE_VERSION = 1
+DEFAULT_SEED = 0
+
+
+def salad_rng(seed, salad):
+    """Random generator for one salad's sampling, independent of batch order."""
+    return random.Random(f"{seed}:{salad}")
+
+
+def _term_key(term):
+    # Blank node labels change on every parse; only their presence is hashed
+    return "[]" if isinstance(term, BNode) else term.n3()
+
+
+def node_digest(g, node):
+    """sha1 of the outgoing triples of `node`."""
+    lines = sorted(f"{p.n3()} {_term_key(o)}" for p, o in g.predicate_objects(node))
+    return hashlib.sha1("\n".join(lines).encode("utf8")).hexdigest()
+
+
+def hierarchy_digest(summary):
+    """sha1 of the named class hierarchy, which decides which nodes are Ingredient/Dressing."""
+    pairs = sorted(f"{sub.n3()} {sup.n3()}" for sub, sups in summary.superclass_map.items() for sup in sups)
+    return hashlib.sha1("\n".join(pairs).encode("utf8")).hexdigest()
+
+
+class SnapshotCache:
+    """JSON file of snapshot entries keyed by "<salad IRI> <seed> <max depth>"."""
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = Path(path)
+        self.entries = {}
+        self.dirty = False
+        if self.path.exists():
+            with open(self.path, encoding="utf8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data["entries"]
+
+    @staticmethod
+    def key(salad, seed, max_depth):
+        return f"{salad} {seed} {max_depth}"
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+        self.dirty = False
+
+
+def snapshot_salads(g, salads=None, cache=None, seed=DEFAULT_SEED, max_depth=MAX_DEPTH, summary=None):
+    """
+    Yield (salad, text, reused) for `salads` (default: every Salad, sorted), rendering
+    only those whose cached snapshot is missing or whose subgraph has changed.
+    """
+    summary = summary or OntologySummary(g)
+    digests = {}
+    hierarchy = hierarchy_digest(summary)
+
+    def subgraph_digest(nodes):
+        parts = [hierarchy]
+        for node in sorted(nodes, key=str):
+            if node not in digests:
+                digests[node] = node_digest(g, node)
+            parts.append(f"{node} {digests[node]}")
+        return hashlib.sha1("\n".join(parts).encode("utf8")).hexdigest()
+
+    if salads is None:
+        salads = sorted(set(g.subjects(RDF.type, SALAD.Salad)))
+    for salad in salads:
+        key = SnapshotCache.key(salad, seed, max_depth)
+        entry = cache.entries.get(key) if cache is not None else None
+        if entry is not None and entry["digest"] is not None:
+            if subgraph_digest(URIRef(node) for node in entry["nodes"]) == entry["digest"]:
+                yield salad, entry["text"], True
+                continue
+
+        summary.rng = salad_rng(seed, salad)
+        summary.touched = set()
+        text = "".join(summary.explore_instance(salad, max_depth=max_depth))
+        nodes, summary.touched = summary.touched, None
+
+        if cache is not None:
+            # A walk through blank nodes cannot be matched against another parse; never reuse it
+            cacheable = not any(isinstance(node, BNode) for node in nodes)
+            cache.put(key, {
+                "digest": subgraph_digest(nodes) if cacheable else None,
+                "nodes": sorted(map(str, nodes)),
+                "text": text,
+            })
+        yield salad, text, False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render (or reuse) seeded exploration snapshots of every salad.")
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE)
+    parser.add_argument("--cache", default=SNAPSHOT_FILE)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--max-depth", type=int, default=MAX_DEPTH)
+    parser.add_argument("--salad", nargs="+", metavar="NAME", help="Only these salads (local names)")
+    parser.add_argument("--output", help="Also write all snapshots to this text file")
+    args = parser.parse_args()
+
+    g = Graph()
+    g.parse(args.ontology, format="xml")
+    g.bind("s", SALAD)
+    salads = [SALAD[name] for name in args.salad] if args.salad else None
+
+    start = time.perf_counter()
+    cache = SnapshotCache(args.cache)
+    reused = rendered = 0
+    output_file = open(args.output, "w", encoding="utf8") if args.output else None
+    try:
+        for salad, text, was_cached in snapshot_salads(g, salads, cache, args.seed, args.max_depth):
+            if was_cached:
+                reused += 1
+            else:
+                rendered += 1
+            if output_file:
+                output_file.write(f"=== SALAD {local_name(salad)} ===\n\n{text}\n")
+    finally:
+        if output_file:
+            output_file.close()
+    cache.save()
+    print(f"✅ {reused + rendered} salads: {reused} reused, {rendered} rendered "
+          f"in {time.perf_counter() - start:.2f}s (cache: {args.cache})")
+
+
+if __name__ == "__main__":
+    main()
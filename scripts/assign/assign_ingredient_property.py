@@ -1,13 +1,17 @@
 from rdflib import Graph, Namespace, URIRef, Literal, RDF
-import re
-from termcolor import colored
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.name_index import get_name_index, split_portion_name
+from common.ontology import local_name
+from common.search_index import get_search_index, subclass_closure
+from common.substance_stream import amount_literal
+from common.timing import span, timed
 
 # Configuration
 DRY_RUN = False # Set to True to simulate only (no real write)
-
-# Load your RDF graph
-g = Graph()
-g.parse("salad_ontology.rdf", format="xml")
+ONTOLOGY_FILE = "salad_ontology.rdf"
 
 # Define Namespace
 SALAD = Namespace("http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#")
@@ -26,15 +30,7 @@ def get_local_name(uri):
     return normalize_name(uri.split("#")[-1])
 
 def extract_base_and_info(portion_name):
-    portion_name = portion_name.replace('\u200b', '').replace('\xa0', '').replace(' ', '').strip()
-    match = re.search(r'(\d+(\.\d+)?)([a-zA-Z]*)$', portion_name)
-    if match:
-        amount = match.group(1)
-        unit = match.group(3)
-        base = portion_name[:match.start()]
-        return base, amount, unit
-    else:
-        return portion_name, None, None
+    return split_portion_name(normalize_name(portion_name))
 
 def normalize_unit(unit):
     unit = unit.lower()
@@ -44,82 +40,111 @@ def normalize_unit(unit):
         return "millilitres"
     return unit
 
-# Step 1: Identify IngredientPortion and DressingPortion
-ingredient_portions = []
-dressing_portions = []
-all_existing_individuals = set()
-
-for s, p, o in g.triples((None, RDF.type, None)):
-    local_class = get_local_name(o)
-    subject_name = get_local_name(s)
-    all_existing_individuals.add(subject_name)
-
-    if local_class == "IngredientPortion":
-        ingredient_portions.append(s)
-    elif local_class == "DressingPortion":
-        dressing_portions.append(s)
-
-# Counters
-ingredient_assigned = 0
-dressing_assigned = 0
-missing_ingredient = []
-missing_dressing = []
-
-# Step 2: Auto-match and add hasIngredient / hasDressing / hasAmount / hasUnit
-for portion_uri in ingredient_portions:
-    portion_name = get_local_name(portion_uri)
-    base, amount, unit = extract_base_and_info(portion_name)
-
-    if base in all_existing_individuals:
-        if not DRY_RUN:
-            g.add((portion_uri, HAS_INGREDIENT, SALAD[base]))
-        ingredient_assigned += 1
-    else:
-        missing_ingredient.append(portion_name)
-
-    if amount:
-        if not DRY_RUN:
-            g.add((portion_uri, HAS_AMOUNT, Literal(float(amount))))
-    if unit:
-        normalized_unit = normalize_unit(unit)
-        if not DRY_RUN:
-            g.add((portion_uri, HAS_UNIT, Literal(normalized_unit)))
-
-for portion_uri in dressing_portions:
-    portion_name = get_local_name(portion_uri)
-    base, amount, unit = extract_base_and_info(portion_name)
-
-    if base in all_existing_individuals:
-        if not DRY_RUN:
-            g.add((portion_uri, HAS_DRESSING, SALAD[base]))
-        dressing_assigned += 1
-    else:
-        missing_dressing.append(portion_name)
-
-    if amount:
-        if not DRY_RUN:
-            g.add((portion_uri, HAS_AMOUNT, Literal(int(amount))))
-    if unit:
-        normalized_unit = normalize_unit(unit)
-        if not DRY_RUN:
-            g.add((portion_uri, HAS_UNIT, Literal(normalized_unit)))
-
-# Step 3: Save back to original RDF file
-if not DRY_RUN:
-    g.serialize(destination="salad_ontology.rdf", format="xml")
-
-# Final report
-print("\n✅ Assignment Summary:")
-print(f"- hasIngredient assigned: {ingredient_assigned}")
-print(f"- hasDressing assigned: {dressing_assigned}")
-
-if missing_ingredient:
-    print(f"\n⚠️ Missing Ingredient matches ({len(missing_ingredient)}):")
-    for i in missing_ingredient:
-        print(f"  - {i}")
-if missing_dressing:
-    print(f"\n⚠️ Missing Dressing matches ({len(missing_dressing)}):")
-    for i in missing_dressing:
-        print(f"  - {i}")
-
-print(colored(f"\n🎯 Finished! (Dry Run Mode: {DRY_RUN})", "cyan"))
+@timed("assign_ingredient_property")
+def run(g, dry_run=DRY_RUN):
+    """
+    Add hasIngredient / hasDressing / hasAmount / hasUnit to every Ingredient and Dressing portion,
+    parsed from the portion name (e.g. Tomato150g). Returns a summary dict.
+    """
+    # Step 1: Identify IngredientPortion and DressingPortion (name index built once per graph)
+    index = get_name_index(g)
+    # Misspelled bases ("Tomatoe150g") are resolved among the Ingredient / Dressing individuals
+    search = get_search_index(g)
+    ingredients = subclass_closure(g, [SALAD.Ingredient])
+    dressings = subclass_closure(g, [SALAD.Dressing])
+
+    # Counters
+    ingredient_assigned = 0
+    dressing_assigned = 0
+    missing_ingredient = []
+    missing_dressing = []
+    resolved = {}
+
+    # Step 2: Auto-match and add hasIngredient / hasDressing / hasAmount / hasUnit
+    for portion_uri in index.ingredient_portions:
+        base, amount, unit = index.portion_info[portion_uri]
+
+        target = SALAD[base] if base in index.individuals else search.resolve(base, types=ingredients)
+        if target is not None:
+            if not dry_run:
+                g.add((portion_uri, HAS_INGREDIENT, target))
+            ingredient_assigned += 1
+            if base not in index.individuals:
+                resolved[get_local_name(portion_uri)] = local_name(target)
+        else:
+            missing_ingredient.append(get_local_name(portion_uri))
+
+        # Portions that already have an amount / unit keep it (re-runs must not add a second one)
+        if amount and (portion_uri, HAS_AMOUNT, None) not in g:
+            if not dry_run:
+                g.add((portion_uri, HAS_AMOUNT, amount_literal(amount)))
+        if unit and (portion_uri, HAS_UNIT, None) not in g:
+            normalized_unit = normalize_unit(unit)
+            if not dry_run:
+                g.add((portion_uri, HAS_UNIT, Literal(normalized_unit)))
+
+    for portion_uri in index.dressing_portions:
+        base, amount, unit = index.portion_info[portion_uri]
+
+        target = SALAD[base] if base in index.individuals else search.resolve(base, types=dressings)
+        if target is not None:
+            if not dry_run:
+                g.add((portion_uri, HAS_DRESSING, target))
+            dressing_assigned += 1
+            if base not in index.individuals:
+                resolved[get_local_name(portion_uri)] = local_name(target)
+        else:
+            missing_dressing.append(get_local_name(portion_uri))
+
+        # Portions that already have an amount / unit keep it (re-runs must not add a second one)
+        if amount and (portion_uri, HAS_AMOUNT, None) not in g:
+            if not dry_run:
+                g.add((portion_uri, HAS_AMOUNT, amount_literal(amount)))
+        if unit and (portion_uri, HAS_UNIT, None) not in g:
+            normalized_unit = normalize_unit(unit)
+            if not dry_run:
+                g.add((portion_uri, HAS_UNIT, Literal(normalized_unit)))
+
+    return {
+        "counts": {
+            "hasIngredient assigned": ingredient_assigned,
+            "hasDressing assigned": dressing_assigned,
+            "Resolved by fuzzy match": len(resolved),
+        },
+        "missing": {
+            "Ingredient": missing_ingredient,
+            "Dressing": missing_dressing,
+        },
+        "resolved": resolved,
+    }
+
+if __name__ == "__main__":
+    from termcolor import colored
+
+    # Load your RDF graph
+    g = Graph()
+    with span("parse", graph=g):
+        g.parse(ONTOLOGY_FILE, format="xml")
+
+    summary = run(g, DRY_RUN)
+
+    # Step 3: Save back to original RDF file
+    if not DRY_RUN:
+        with span("serialize", graph=g):
+            g.serialize(destination=ONTOLOGY_FILE, format="xml")
+
+    # Final report
+    print("\n✅ Assignment Summary:")
+    for label, count in summary["counts"].items():
+        print(f"- {label}: {count}")
+
+    for portion, target in summary["resolved"].items():
+        print(f"[FUZZY] {portion} -> {target}")
+
+    for kind, missing in summary["missing"].items():
+        if missing:
+            print(f"\n⚠️ Missing {kind} matches ({len(missing)}):")
+            for i in missing:
+                print(f"  - {i}")
+
+    print(colored(f"\n🎯 Finished! (Dry Run Mode: {DRY_RUN})", "cyan"))
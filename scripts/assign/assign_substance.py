@@ -1,13 +1,22 @@
 from rdflib import Graph, Namespace, URIRef, Literal, RDF
-import pandas as pd
-import re
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.name_index import get_name_index, split_portion_name
+from common.sheet_stream import add_batched, iter_sheet_records
+from common.substance_stream import (amount_literal, describe_conflict, iter_substance_blocks, normalize_amount,
+                                     replace_existing_values)
+from common.timing import span, timed
 
 # Configuration
 DRY_RUN = False # Set to True for dry run mode (no write)
+ONTOLOGY_FILE = "salad_ontology.rdf"
 
-# Load RDF graph
-g = Graph()
-g.parse("salad_ontology.rdf", format="xml")
+# Substance data: the Individual/Amount/Unit text dump is parsed line by line; a workbook
+# ("Salad Instance.xlsx", second sheet) or .csv export is streamed instead. Added in addN batches
+SUBSTANCE_FILE = "data/substance_portion.txt"
+SUBSTANCE_SHEET = 1  # second sheet, or ignored for .csv / .txt
 
 # Define Namespace
 SALAD = Namespace("http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#")
@@ -27,74 +36,7 @@ def get_local_name(uri):
     return normalize_name(uri.split("#")[-1])
 
 def extract_base_and_info(portion_name):
-    portion_name = normalize_name(portion_name)
-    match = re.search(r'([0-9]+(?:\.[0-9]+)?)([a-zA-Z]*)$', portion_name)
-    if match:
-        amount = match.group(1)
-        unit = match.group(2)
-        base = portion_name[:match.start()]
-        return base.strip(), amount, unit
-    else:
-        return portion_name, None, None
-
-def normalize_unit(unit):
-    unit = unit.lower()
-    if unit == "g":
-        return "grams"
-    elif unit == "ml":
-        return "millilitres"
-    elif unit == "μg/100g":
-        return "mg/100g"
-    return unit
-
-# Step 1: Identify all Portions and Individuals
-ingredient_portions = []
-dressing_portions = []
-substance_portions = []
-all_existing_individuals = set()
-
-for s, p, o in g.triples((None, RDF.type, None)):
-    local_class = get_local_name(o)
-    local_name = get_local_name(s)
-    all_existing_individuals.add(local_name)
-    if local_class == "IngredientPortion":
-        ingredient_portions.append(s)
-    elif local_class == "DressingPortion":
-        dressing_portions.append(s)
-    elif local_class == "SubstancePortion":
-        substance_portions.append(s)
-
-# Counters
-ingredient_assigned = 0
-dressing_assigned = 0
-substance_assigned = 0
-missing_ingredient = []
-missing_dressing = []
-missing_substance = []
-
-# Step 2: Auto-match hasIngredient and hasDressing
-for portion_uri in ingredient_portions:
-    portion_name = get_local_name(portion_uri)
-    base, amount, unit = extract_base_and_info(portion_name)
-    if base in all_existing_individuals:
-        if not DRY_RUN:
-            g.add((portion_uri, HAS_INGREDIENT, SALAD[base]))
-        ingredient_assigned += 1
-    else:
-        missing_ingredient.append(portion_name)
-
-for portion_uri in dressing_portions:
-    portion_name = get_local_name(portion_uri)
-    base, amount, unit = extract_base_and_info(portion_name)
-    if base in all_existing_individuals:
-        if not DRY_RUN:
-            g.add((portion_uri, HAS_DRESSING, SALAD[base]))
-        dressing_assigned += 1
-    else:
-        missing_dressing.append(portion_name)
-
-# Step 3: Assign hasSubstance for SubstancePortions
-df = pd.read_excel("Salad Instance.xlsx", sheet_name=1)
+    return split_portion_name(normalize_name(portion_name))
 
 approved_substances = {
     "Calcium", "Carbohydrate", "Cholesterol", "Fat", "FoodEnergy",
@@ -102,62 +44,124 @@ approved_substances = {
     "VitaminE", "Lutein", "Zeaxanthin", "Zinc", "Omega-3", "VitaminB9"
 }
 
-for idx, row in df.iterrows():
-    individual_name = normalize_name(str(row['Individual']))
-    amount = row['Amount']
-    unit = normalize_unit(str(row['Unit']))
-
-    if not individual_name or pd.isna(amount) or not unit:
-        continue  # Skip incomplete data
-
-    if individual_name not in all_existing_individuals:
-        missing_substance.append(individual_name)
-        continue
-
-    portion_uri = SALAD[individual_name]
-
-    # Match Substance
-    matched = False
-    for substance in approved_substances:
-        if individual_name.endswith(substance):
-            substance_uri = SALAD[substance]
-            if not DRY_RUN:
-                g.add((portion_uri, HAS_SUBSTANCE, substance_uri))
-            matched = True
-            break
-    if not matched:
-        missing_substance.append(individual_name)
-        continue
-
-    final_amount = float(amount)
-
-    # Fix units
-    if unit == "μg/100g":
-        final_amount = final_amount / 1000  # μg ➔ mg
-        unit = "mg/100g"
-    elif unit == "g/100g":
-        final_amount = final_amount * 1000  # g ➔ mg
-        unit = "mg/100g"
-
+def substance_triples(records, index, missing_substance, stats):
+    for row in records:
+        individual_name = normalize_name(str(row.get('Individual') or ''))
+        amount = row.get('Amount')
+        unit = row.get('Unit')
+
+        if not individual_name or amount in (None, '') or not unit:
+            continue  # Skip incomplete data
+
+        if individual_name not in index.individuals:
+            missing_substance.append(individual_name)
+            continue
+
+        portion_uri = SALAD[individual_name]
+
+        # Match Substance: one suffix-trie lookup instead of an endswith per substance
+        substance = index.substance_for(individual_name)
+        if substance not in approved_substances:
+            missing_substance.append(individual_name)
+            continue
+        yield (portion_uri, HAS_SUBSTANCE, SALAD[substance])
+
+        # Fix units: g, μg ➔ mg and VitaminA IU ➔ mg, per 100g
+        final_amount, unit = normalize_amount(amount, str(unit), substance)
+
+        yield (portion_uri, HAS_AMOUNT, amount_literal(final_amount))
+        yield (portion_uri, HAS_UNIT, Literal(unit))
+
+        stats["assigned"] += 1
+
+@timed("assign_substance")
+def run(g, dry_run=DRY_RUN, substance_file=SUBSTANCE_FILE, substance_sheet=SUBSTANCE_SHEET):
+    """
+    Link Ingredient/Dressing portions to their component and assign hasSubstance, hasAmount
+    and hasUnit to SubstancePortions from the substance sheet. Returns a summary dict.
+    """
+    # Step 1: Identify all Portions and Individuals (name index built once per graph)
+    index = get_name_index(g)
+
+    # Counters
+    ingredient_assigned = 0
+    dressing_assigned = 0
+    missing_ingredient = []
+    missing_dressing = []
+    missing_substance = []
+
+    # Step 2: Auto-match hasIngredient and hasDressing
+    for portion_uri in index.ingredient_portions:
+        base, amount, unit = index.portion_info[portion_uri]
+        if base in index.individuals:
+            if not dry_run:
+                g.add((portion_uri, HAS_INGREDIENT, SALAD[base]))
+            ingredient_assigned += 1
+        else:
+            missing_ingredient.append(get_local_name(portion_uri))
+
+    for portion_uri in index.dressing_portions:
+        base, amount, unit = index.portion_info[portion_uri]
+        if base in index.individuals:
+            if not dry_run:
+                g.add((portion_uri, HAS_DRESSING, SALAD[base]))
+            dressing_assigned += 1
+        else:
+            missing_dressing.append(get_local_name(portion_uri))
+
+    # Step 3: Assign hasSubstance for SubstancePortions
+    stats = {"assigned": 0}
+    if str(substance_file).lower().endswith(".txt"):
+        records = (
+            {"Individual": individual, "Amount": amount, "Unit": unit}
+            for individual, amount, unit in iter_substance_blocks(substance_file)
+        )
+    else:
+        records = iter_sheet_records(substance_file, substance_sheet)
+    triples = substance_triples(records, index, missing_substance, stats)
+    conflicts = []
+    if not dry_run:
+        # Values the portions already have are skipped, so re-runs are no-ops; changed ones replace them
+        add_batched(g, replace_existing_values(g, triples, conflicts))
+    else:
+        for _ in triples:
+            pass
+
+    return {
+        "counts": {
+            "hasIngredient assigned": ingredient_assigned,
+            "hasDressing assigned": dressing_assigned,
+            "hasSubstance assigned": stats["assigned"],
+            "values replaced": sum(c[4] == "replaced" for c in conflicts),
+        },
+        "missing": {
+            "Ingredient": missing_ingredient,
+            "Dressing": missing_dressing,
+            "SubstancePortions": missing_substance,
+        },
+        "conflicts": [describe_conflict(c) for c in conflicts],
+    }
+
+if __name__ == "__main__":
+    # Load RDF graph
+    g = Graph()
+    with span("parse", graph=g):
+        g.parse(ONTOLOGY_FILE, format="xml")
+
+    summary = run(g, DRY_RUN)
+
+    # Step 4: Save if not dry run
     if not DRY_RUN:
-        g.add((portion_uri, HAS_AMOUNT, Literal(final_amount)))
-        g.add((portion_uri, HAS_UNIT, Literal(unit)))
-
-    substance_assigned += 1
-
-# Step 4: Save if not dry run
-if not DRY_RUN:
-    g.serialize(destination="salad_ontology.rdf", format="xml")
-
-# Final report
-print("\n✅ Assignment Summary:")
-print(f"- hasIngredient assigned: {ingredient_assigned}")
-print(f"- hasDressing assigned: {dressing_assigned}")
-print(f"- hasSubstance assigned: {substance_assigned}")
-if missing_ingredient:
-    print(f"\n⚠️ Missing Ingredient matches ({len(missing_ingredient)}): {missing_ingredient}")
-if missing_dressing:
-    print(f"\n⚠️ Missing Dressing matches ({len(missing_dressing)}): {missing_dressing}")
-if missing_substance:
-    print(f"\n⚠️ Missing SubstancePortions matches ({len(missing_substance)}): {missing_substance}")
-print("\n🎯 Finished assigning! (Dry Run Mode: {})".format(DRY_RUN))
+        with span("serialize", graph=g):
+            g.serialize(destination=ONTOLOGY_FILE, format="xml")
+
+    # Final report
+    print("\n✅ Assignment Summary:")
+    for label, count in summary["counts"].items():
+        print(f"- {label}: {count}")
+    for kind, missing in summary["missing"].items():
+        if missing:
+            print(f"\n⚠️ Missing {kind} matches ({len(missing)}): {missing}")
+    for conflict in summary["conflicts"]:
+        print(f"⚠️ {conflict}")
+    print("\n🎯 Finished assigning! (Dry Run Mode: {})".format(DRY_RUN))
@@ -0,0 +1,68 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.composer import SaladComposer
+from common.ontology import ONTOLOGY_FILE, load_graph
+from common.recommender import NUTRIENTS
+
+
+def parse_target(text):
+    """Parse 'Nutrient=value' into (nutrient, float value)."""
+    nutrient, _, value = text.partition("=")
+    if nutrient not in NUTRIENTS or not value:
+        raise argparse.ArgumentTypeError(f"expected Nutrient=value with Nutrient in {NUTRIENTS}, got '{text}'")
+    return nutrient, float(value)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Compose a salad from existing ingredient/dressing portions that hits nutrient targets."
+    )
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE)
+    parser.add_argument("--name", default="CustomSalad", help="Salad name used in the printed recipe entry")
+    parser.add_argument("--min", action="append", type=parse_target, default=[], metavar="NUTRIENT=VALUE",
+                        help="Lower target in mg (cal for FoodEnergy), repeatable")
+    parser.add_argument("--max", action="append", type=parse_target, default=[], metavar="NUTRIENT=VALUE",
+                        help="Upper target in mg (cal for FoodEnergy), repeatable")
+    parser.add_argument("--exclude", action="append", default=[], help="Allergen or component to leave out (repeatable)")
+    parser.add_argument("--max-items", type=int, default=6)
+    parser.add_argument("--max-dressings", type=int, default=1)
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+
+    targets = {}
+    for nutrient, value in args.min:
+        targets[nutrient] = (value, targets.get(nutrient, (None, None))[1])
+    for nutrient, value in args.max:
+        targets[nutrient] = (targets.get(nutrient, (None, None))[0], value)
+    if not any(low is not None for low, _ in targets.values()):
+        print("[WARNING] No lower target given; an empty salad already satisfies upper bounds only.")
+
+    composer = SaladComposer.from_graph(load_graph(args.ontology))
+
+    start = time.perf_counter()
+    result = composer.compose(
+        targets,
+        exclude=args.exclude,
+        max_items=args.max_items,
+        max_dressings=args.max_dressings,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    # Rows in the recipe file format (salad,portion); every portion is an existing individual,
+    # so they are ready to append to data/salad_recipes.csv
+    print()
+    for portion in result["portions"]:
+        print(f"{args.name},{portion}")
+    print("\n=== Totals ===")
+    for nutrient in sorted(targets):
+        low, high = targets[nutrient]
+        print(f"- {nutrient}: {result['totals'][nutrient]:.2f} (target {low} .. {high})")
+    status = "✅ All targets met" if result["satisfied"] else "⚠️ Targets not fully met"
+    print(f"\n{status} in {elapsed_ms:.1f} ms over {len(composer.names)} components.")
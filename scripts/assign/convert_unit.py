@@ -1,10 +1,12 @@
 import rdflib
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.timing import span
 
-# Initialize RDF graph
-g = rdflib.Graph()
 # Load ontology (adjust path to your ontology file)
 ontology_file = "salad_ontology.rdf"  # Update with your file path
-g.parse(ontology_file, format="xml")
 
 # Define namespace
 S = rdflib.Namespace("http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#")
@@ -24,13 +26,27 @@ WHERE {
 }
 """
 
-# Execute the SPARQL UPDATE
-g.update(update_query)
+def convert_units(g):
+    """Run the VitaminA iu/100g -> mg/100g conversion on `g`; returns the number of portions converted."""
+    before = len(set(g.subjects(S.hasUnit, rdflib.Literal("iu/100g"))))
+    with span("update", graph=g):
+        g.update(update_query)
+    return before - len(set(g.subjects(S.hasUnit, rdflib.Literal("iu/100g"))))
+
+if __name__ == "__main__":
+    # Initialize RDF graph
+    g = rdflib.Graph()
+    with span("parse", graph=g):
+        g.parse(ontology_file, format="xml")
+
+    # Execute the SPARQL UPDATE
+    converted = convert_units(g)
 
-# Save the modified ontology
-output_file = "salad_ontology.rdf"  # Output file path
-g.serialize(output_file, format="xml")
+    # Save the modified ontology
+    output_file = "salad_ontology.rdf"  # Output file path
+    with span("serialize", graph=g):
+        g.serialize(output_file, format="xml")
 
-print(f"Unit conversion completed. Modified ontology saved to {output_file}")
-print("Converted 8 VitaminA instances from 'iu/100g' to 'mg/100g' using conversion factor 1 IU = 0.0003 mg.")
-print("Please verify the updated ontology and re-run the consistency check script.")
\ No newline at end of file
+    print(f"Unit conversion completed. Modified ontology saved to {output_file}")
+    print(f"Converted {converted} VitaminA instances from 'iu/100g' to 'mg/100g' using conversion factor 1 IU = 0.0003 mg.")
+    print("Please verify the updated ontology and re-run the consistency check script.")
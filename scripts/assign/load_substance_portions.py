@@ -0,0 +1,72 @@
+"""
+Load data/substance_portion.txt straight into the ontology as SubstancePortion individuals.
+
+Replaces the generate_excel.py -> spreadsheet -> assign_substance.py round trip: blocks are
+parsed line by line, units normalized to mg/100g on the fly and the triples added in addN
+batches. --csv also writes the normalized rows, like generate_excel.py's CSV.
+
+Usage:
+    python scripts/assign/load_substance_portions.py [--input data/substance_portion.txt] [--csv out.csv] [--dry-run]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from rdflib import Graph
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.ontology import ONTOLOGY_FILE
+from common.sheet_stream import BATCH_SIZE, add_batched
+from common.substance_stream import (SUBSTANCE_FILE, describe_conflict, iter_substance_blocks, open_csv_writer,
+                                     replace_existing_values, substance_portion_triples)
+from common.timing import span
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream substance_portion.txt into SubstancePortion triples.")
+    parser.add_argument("--input", default=SUBSTANCE_FILE, help="Individual/Amount/Unit block file")
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE, help="RDF/XML file to read and update")
+    parser.add_argument("--csv", help="Also write the normalized rows to this CSV file")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Parse and count without modifying or saving the graph")
+    args = parser.parse_args()
+
+    g = Graph()
+    with span("parse", graph=g):
+        g.parse(args.ontology, format="xml")
+    before = len(g)
+
+    stats, conflicts = {}, []
+    csv_file, csv_writer = open_csv_writer(args.csv) if args.csv else (None, None)
+    try:
+        with span("load", graph=g) as phase:
+            triples = substance_portion_triples(iter_substance_blocks(args.input), stats, csv_writer)
+            if args.dry_run:
+                emitted = sum(1 for _ in triples)
+            else:
+                emitted = add_batched(g, replace_existing_values(g, triples, conflicts), args.batch_size)
+            phase.set(portions=stats.get("portions"), emitted=emitted)
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+
+    if not args.dry_run:
+        with span("serialize", graph=g):
+            g.serialize(destination=args.ontology, format="xml")
+
+    print("\n✅ Substance Portion Summary:")
+    print(f"- SubstancePortions parsed: {stats['portions']}")
+    print(f"- Triples emitted: {emitted} (new in graph: {len(g) - before})")
+    if args.csv:
+        print(f"- CSV written to {args.csv}")
+    if conflicts:
+        print(f"\n⚠️ Values that differ from the graph or within the file ({len(conflicts)}):")
+        for conflict in conflicts:
+            print(f"  - {describe_conflict(conflict)}")
+    if stats["skipped"]:
+        print(f"\n⚠️ Skipped (no known substance or bad amount) ({len(stats['skipped'])}): {stats['skipped']}")
+    print(f"\n🎯 Finished! (Dry Run Mode: {args.dry_run})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Run the A-box assign scripts as ordered stages over one in-memory graph.
+
+The ontology is parsed once, every stage mutates the same Graph, and the result is
+serialized once at the end, followed by a combined summary report. --dry-run runs the
+stages on a copy-on-write overlay and can save the exact changeset, which --apply later
+commits without redoing the matching.
+
+Usage:
+    python scripts/assign/pipeline.py [--ontology salad_ontology.rdf] [--stages NAME ...]
+                                      [--recipes data/salad_recipes.csv ...]
+                                      [--dry-run [--changeset changes.nt]] [--apply changes.nt]
+                                      [--timing timing.jsonl] [--profile [cpu,memory]]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from rdflib import Graph
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.changeset import Changeset, overlay, overlay_changeset
+from common.profiling import add_profile_arguments, profile_from_args
+from common.timing import configure, span
+
+sys.path.append(str(Path(__file__).resolve().parent))
+import assign_ingredient
+import assign_ingredient_property
+import assign_substance
+import assign_substance_portion
+
+# === CONFIGURATION ===
+ONTOLOGY_FILE = "salad_ontology.rdf"
+
+# Ordered stages: each takes (graph, dry_run) and returns {"counts": {...}, "missing": {...}}
+STAGES = [
+    ("assign_ingredient_property", assign_ingredient_property.run),
+    ("assign_substance", assign_substance.run),
+    ("assign_substance_portion", assign_substance_portion.run),
+    ("assign_ingredient", assign_ingredient.run),
+]
+STAGE_NAMES = [name for name, _ in STAGES]
+
+
+def run_pipeline(g, stages=None, dry_run=False, options=None):
+    """
+    Run the selected stages (all by default, always in STAGES order); return [(name, summary, added)].
+
+    options: {stage name: extra keyword arguments for that stage's run()}.
+    """
+    options = options or {}
+    selected = set(STAGE_NAMES if stages is None else stages)
+    unknown = selected - set(STAGE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown stage(s) {sorted(unknown)}, expected some of {STAGE_NAMES}")
+
+    results = []
+    for name, stage in STAGES:
+        if name not in selected:
+            continue
+        print(f"\n▶️ Running {name} ...")
+        before = len(g)
+        summary = stage(g, dry_run=dry_run, **options.get(name, {}))
+        results.append((name, summary, len(g) - before))
+    return results
+
+
+def print_report(results, before, after, dry_run):
+    print("\n=== PIPELINE SUMMARY ===")
+    for name, summary, added in results:
+        print(f"\n[{name}] +{added} triples")
+        for label, count in summary["counts"].items():
+            print(f"- {label}: {count}")
+        for kind, missing in summary["missing"].items():
+            if missing:
+                print(f"⚠️ Missing {kind} ({len(missing)}): {missing}")
+        for written, target in summary.get("resolved", {}).items():
+            print(f"[FUZZY] {written} -> {target}")
+        for conflict in summary.get("conflicts", []):
+            print(f"⚠️ {conflict}")
+    print(f"\nTriples: {before} -> {after} (+{after - before})")
+    print(f"🎯 Finished! (Dry Run Mode: {dry_run})")
+    print("========================")
+
+
+def execute(args):
+    """Run (or apply) the pipeline as configured by the command line."""
+    base = Graph()
+    with span("parse", graph=base):
+        base.parse(args.ontology, format="xml")
+    before = len(base)
+
+    if args.apply:
+        with span("apply", graph=base):
+            changeset = Changeset.read(args.apply)
+            changeset.apply(base)
+        with span("serialize", graph=base):
+            base.serialize(destination=args.ontology, format="xml")
+        print(f"✅ Applied {args.apply} to {args.ontology}: "
+              f"+{len(changeset.added)} / -{len(changeset.removed)} triples ({before} -> {len(base)})")
+        return
+
+    # Dry runs do the real work against an overlay, so they can report the exact changes
+    g = overlay(base) if args.dry_run else base
+    options = {"assign_ingredient": {"recipe_files": args.recipes}}
+    results = run_pipeline(g, args.stages, options=options)
+
+    if args.dry_run:
+        with span("changeset"):
+            changeset = overlay_changeset(g)
+        print(f"\n📝 Changeset: +{len(changeset.added)} / -{len(changeset.removed)} triples")
+        if args.changeset:
+            changeset.write(args.changeset)
+            print(f"✅ Wrote {args.changeset} (apply with --apply {args.changeset})")
+    else:
+        with span("serialize", graph=g):
+            g.serialize(destination=args.ontology, format="xml")
+        print(f"\n✅ Saved {args.ontology}")
+
+    print_report(results, before, len(g), args.dry_run)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the assign scripts as one pipeline.")
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE, help="RDF/XML file to read and update")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Run every stage on a copy-on-write overlay; nothing is saved")
+    parser.add_argument("--changeset", help="With --dry-run, write the would-be changes to this N-Triples diff")
+    parser.add_argument("--apply", metavar="CHANGESET",
+                        help="Apply a changeset written by --dry-run --changeset instead of running the stages")
+    parser.add_argument("--stages", nargs="+", choices=STAGE_NAMES, help="Run only these stages (default: all)")
+    parser.add_argument("--recipes", nargs="+", help="Recipe files for assign_ingredient (default: its RECIPE_FILES)")
+    parser.add_argument("--timing", metavar="FILE",
+                        help="Append one JSON line per phase (parse, stages, serialize) to FILE, '-' for stderr")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    configure(args.timing)
+    with profile_from_args(args, "pipeline"):
+        execute(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,153 @@
-from rdflib import Graph, Namespace, RDF
+"""
+Purge individuals (the A-box) from the ontology in one pass.
 
-# Load your ontology
-g = Graph()
-g.parse("salad_ontology.rdf", format="xml")
+The removal set is computed once, then the graph is rebuilt by keeping every triple
+that does not mention a removed individual, instead of one full object-position scan
+per individual. T-box constructs (classes, properties, restrictions, SWRL rules, the
+ontology header) are never removed, and SWRL atoms keep their individual arguments
+(e.g. the Purpose constants). owl:AllDifferent axioms are rebuilt without the removed
+members.
 
-# Define your namespace
-SALAD = Namespace("http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#")
+Usage:
+    python scripts/assign/remove_instance.py [--classes Salad Person ...] [--no-subclasses] [--dry-run]
+"""
+import argparse
+import sys
+from pathlib import Path
 
-# Collect all individuals (instances)
-instances_to_remove = []
+from rdflib import BNode, Graph, Namespace, RDF
+from rdflib.collection import Collection
+from rdflib.namespace import OWL, RDFS, XSD
 
-for s, p, o in g.triples((None, RDF.type, None)):
-    # Remove only individuals (i.e., not Classes or Properties)
-    if not (str(o).startswith("http://www.w3.org/2002/07/owl#Class") or
-            str(o).startswith("http://www.w3.org/2002/07/owl#ObjectProperty") or
-            str(o).startswith("http://www.w3.org/2002/07/owl#DatatypeProperty")):
-        instances_to_remove.append(s)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.ontology import ONTOLOGY_FILE, SALAD, local_name
+from common.timing import span
 
-# Remove triples related to instances
-for instance in instances_to_remove:
-    g.remove((instance, None, None))
-    g.remove((None, None, instance))
+SWRL = Namespace("http://www.w3.org/2003/11/swrl#")
 
-# Save cleaned ontology
-g.serialize(destination="salad_ontology.rdf", format="xml")
+# rdf:type objects from these vocabularies mark T-box / rule nodes, not individuals
+META_NAMESPACES = tuple(str(ns) for ns in (OWL, RDF, RDFS, XSD, SWRL))
 
-print("\n✅ All individuals deleted successfully!")
+
+def class_closure(g, classes):
+    """`classes` plus all their (transitive) subclasses."""
+    closure = set()
+    pending = list(classes)
+    while pending:
+        cls = pending.pop()
+        if cls in closure:
+            continue
+        closure.add(cls)
+        pending.extend(g.subjects(RDFS.subClassOf, cls))
+    return closure
+
+
+def collect_individuals(g, classes=None, include_subclasses=True):
+    """
+    Return the set of individuals to remove.
+
+    Without `classes`, every owl:NamedIndividual and every subject typed by a domain class.
+    With `classes` (URIs), only instances of those classes (and their subclasses).
+    """
+    if classes is not None:
+        targets = class_closure(g, classes) if include_subclasses else set(classes)
+        return {s for s, o in g.subject_objects(RDF.type) if o in targets}
+
+    individuals = set()
+    for s, o in g.subject_objects(RDF.type):
+        if o == OWL.NamedIndividual or not str(o).startswith(META_NAMESPACES):
+            individuals.add(s)
+    return individuals
+
+
+def purge_individuals(g, individuals):
+    """
+    Build a new graph without any triple whose subject or object is in `individuals`
+    (object references from SWRL atoms excepted).
+
+    Returns (new graph, number of triples dropped).
+    """
+    # owl:AllDifferent member lists: drop the old list cells, re-add a list of the survivors
+    drop = set(individuals)
+    rebuilt = []
+    for axiom in g.subjects(RDF.type, OWL.AllDifferent):
+        for list_property in (OWL.distinctMembers, OWL.members):
+            for head in g.objects(axiom, list_property):
+                members = list(Collection(g, head))
+                keep = [m for m in members if m not in individuals]
+                if len(keep) == len(members):
+                    continue
+                drop.update(_list_cells(g, head))
+                if len(keep) >= 2:
+                    rebuilt.append((axiom, list_property, keep))
+                else:
+                    drop.add(axiom)
+
+    cleaned = Graph()
+    for prefix, namespace in g.namespaces():
+        cleaned.bind(prefix, namespace, override=True)
+    # SWRL atoms may name individuals as constants; the rules keep those references
+    rule_nodes = {s for s, o in g.subject_objects(RDF.type) if str(o).startswith(str(SWRL))}
+    kept = [
+        (s, p, o, cleaned) for s, p, o in g
+        if s not in drop and (o not in drop or s in rule_nodes)
+    ]
+    cleaned.addN(kept)
+
+    for axiom, list_property, keep in rebuilt:
+        if axiom in drop:
+            continue
+        head = BNode()
+        Collection(cleaned, head, keep)
+        cleaned.add((axiom, list_property, head))
+
+    return cleaned, len(g) - len(kept)
+
+
+def _list_cells(g, head):
+    cells = []
+    while head is not None and head != RDF.nil:
+        cells.append(head)
+        head = g.value(head, RDF.rest)
+    return cells
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove individuals from the ontology in a single pass.")
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE, help="RDF/XML file to read")
+    parser.add_argument("--output", help="Where to write the result (default: overwrite --ontology)")
+    parser.add_argument("--classes", nargs="+", metavar="CLASS",
+                        help="Only remove instances of these classes (local names), e.g. Salad SaladNutrientTotal")
+    parser.add_argument("--no-subclasses", action="store_true", help="With --classes, ignore subclasses")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without saving")
+    args = parser.parse_args()
+
+    # Load your ontology
+    g = Graph()
+    with span("parse", graph=g):
+        g.parse(args.ontology, format="xml")
+
+    classes = [SALAD[name] for name in args.classes] if args.classes else None
+    with span("purge", graph=g) as phase:
+        individuals = collect_individuals(g, classes, include_subclasses=not args.no_subclasses)
+        cleaned, removed = purge_individuals(g, individuals)
+        phase.set(individuals=len(individuals), triples_removed=removed)
+
+    print(f"Individuals to remove: {len(individuals)}")
+    print(f"Triples: {len(g)} -> {len(cleaned)} ({removed} removed)")
+    if args.classes:
+        print(f"Restricted to: {', '.join(sorted(local_name(c) for c in classes))}")
+
+    if args.dry_run:
+        print("\n✅ Dry run complete. No changes were saved.")
+        return
+
+    # Save cleaned ontology
+    output = args.output or args.ontology
+    with span("serialize", graph=cleaned):
+        cleaned.serialize(destination=output, format="xml")
+    print(f"\n✅ Individuals deleted successfully! Saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,72 @@
-import owlready2
-from owlready2 import get_ontology
 from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
+from itertools import chain, islice
 import os
+import sys
+from pathlib import Path
 import rdflib
 from rdflib import RDF, RDFS, OWL
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.swrl import iter_rules
+
+MAX_COLUMN_WIDTH = 50
+WIDTH_SAMPLE_ROWS = 200
+
 def extract_local_name(uri):
     """Extract local name from URI."""
     return str(uri).split('#')[-1] if '#' in str(uri) else str(uri).split('/')[-1]
 
+def write_sheet(wb, title, header, rows):
+    """
+    Append `header` and `rows` to a new write-only sheet.
+
+    Write-only sheets emit their <cols> before the first row, so column widths come from
+    the first WIDTH_SAMPLE_ROWS rows only; the rest of `rows` is streamed to the sheet
+    without being kept in memory.
+    """
+    rows = iter(rows)
+    sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
+    widths = [len(str(name)) for name in header]
+    for row in sample:
+        for i, value in enumerate(row):
+            if value:
+                widths[i] = max(widths[i], len(str(value)))
+
+    ws = wb.create_sheet(title)
+    for i, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(i)].width = min(width + 2, MAX_COLUMN_WIDTH)
+    ws.append(header)
+    for row in chain(sample, rows):
+        ws.append(row)
+    return ws
+
 def export_ontology_to_xlsx_with_swrl(owl_file, output_xlsx):
-    # Initialize RDF graph for non-SWRL components (using rdflib)
+    # Load the ontology once with rdflib; SWRL rules are read from the same graph
     g = rdflib.Graph()
     g.parse(owl_file, format='xml')  # Adjust format if needed
 
-    # Load ontology with Owlready2 for SWRL rules
-    owlready2.onto_path.append(os.path.dirname(owl_file))  # Add ontology path
-    onto = get_ontology(f"file://{owl_file}").load()
-
-    # Initialize Excel workbook
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
+    # Initialize a write-only (streaming) Excel workbook
+    wb = Workbook(write_only=True)
 
     # Sheet 1: Classes and Subclasses (using rdflib)
-    ws_classes = wb.create_sheet("Classes")
-    ws_classes.append(["Class", "SubClassOf"])
     classes = set()
     for s in g.subjects(RDF.type, OWL.Class):
         if isinstance(s, rdflib.URIRef):
             class_name = extract_local_name(s)
             super_classes = [extract_local_name(o) for o in g.objects(s, RDFS.subClassOf) if isinstance(o, rdflib.URIRef)]
             classes.add((class_name, ", ".join(super_classes)))
-    for class_name, super_classes in sorted(classes):
-        ws_classes.append([class_name, super_classes])
+    write_sheet(wb, "Classes", ["Class", "SubClassOf"], sorted(classes))
 
     # Sheet 2: Individuals (using rdflib)
-    ws_individuals = wb.create_sheet("Individuals")
-    ws_individuals.append(["Individual", "Type"])
     individuals = set()
     for s in g.subjects(RDF.type):
         if s != OWL.NamedIndividual and isinstance(s, rdflib.URIRef):
             types = [extract_local_name(o) for o in g.objects(s, RDF.type) if o != OWL.NamedIndividual]
             individuals.add((extract_local_name(s), ", ".join(types)))
-    for ind_name, types in sorted(individuals):
-        ws_individuals.append([ind_name, types])
+    write_sheet(wb, "Individuals", ["Individual", "Type"], sorted(individuals))
 
     # Sheet 3: Properties (using rdflib)
-    ws_properties = wb.create_sheet("Properties")
-    ws_properties.append(["Property", "Type", "SubPropertyOf", "Domain", "Range"])
     properties = set()
     for s in g.subjects(RDF.type, OWL.ObjectProperty):
         prop_name = extract_local_name(s)
@@ -62,12 +80,9 @@ def export_ontology_to_xlsx_with_swrl(owl_file, output_xlsx):
         ranges = [extract_local_name(o) for o in g.objects(s, RDFS.range)]
         super_props = [extract_local_name(o) for o in g.objects(s, RDFS.subPropertyOf)]
         properties.add((prop_name, "DatatypeProperty", ", ".join(super_props), ", ".join(domains), ", ".join(ranges)))
-    for prop in sorted(properties):
-        ws_properties.append(list(prop))
+    write_sheet(wb, "Properties", ["Property", "Type", "SubPropertyOf", "Domain", "Range"], sorted(properties))
 
     # Sheet 4: Restrictions (using rdflib)
-    ws_restrictions = wb.create_sheet("Restrictions")
-    ws_restrictions.append(["Class", "Restriction Type", "Property", "Value"])
     restrictions = set()
     for s in g.subjects(RDF.type, OWL.Restriction):
         on_property = extract_local_name(g.value(s, OWL.onProperty))
@@ -77,37 +92,21 @@ def export_ontology_to_xlsx_with_swrl(owl_file, output_xlsx):
                 value = g.value(s, pred)
                 if value:
                     restrictions.add((class_name, pred.split('#')[-1], on_property, extract_local_name(value) if isinstance(value, rdflib.URIRef) else str(value)))
-    for restr in sorted(restrictions):
-        ws_restrictions.append(list(restr))
+    write_sheet(wb, "Restrictions", ["Class", "Restriction Type", "Property", "Value"], sorted(restrictions))
 
-    # Sheet 5: SWRL Rules (using Owlready2)
-    ws_rules = wb.create_sheet("Rules")
-    ws_rules.append(["Rule Name", "Antecedent", "Consequent"])
+    # Sheet 5: SWRL Rules (read from the rdflib graph, owlready2-style atoms)
+    prefix = Path(owl_file).stem  # owlready2 names individuals "<ontology>.<Individual>"
     rules = set()
-    for rule in onto.rules():
-        rule_name = extract_local_name(rule.iri) if hasattr(rule, 'iri') else f"Rule_{id(rule)}"
-        # Extract antecedent (body) and consequent (head)
-        antecedent = []
-        consequent = []
-        for atom in rule.body:
-            antecedent.append(str(atom))
-        for atom in rule.head:
-            consequent.append(str(atom))
-        rules.add((rule_name, "; ".join(antecedent), "; ".join(consequent)))
-    for rule_name, ant, cons in sorted(rules):
-        ws_rules.append([rule_name, ant, cons])
+    for _, rule_name, antecedent, consequent in iter_rules(g, prefix):
+        rules.add((rule_name or "", "; ".join(antecedent), "; ".join(consequent)))
+    write_sheet(wb, "Rules", ["Rule Name", "Antecedent", "Consequent"],
+                ((rule_name or None, ant, cons) for rule_name, ant, cons in sorted(rules)))
 
     # Sheet 6: All Triples (using rdflib, catch-all)
-    ws_triples = wb.create_sheet("All_Triples")
-    ws_triples.append(["Subject", "Predicate", "Object"])
-    for s, p, o in sorted(g):
-        ws_triples.append([extract_local_name(s), extract_local_name(p), extract_local_name(o) if isinstance(o, rdflib.URIRef) else str(o)])
-
-    # Adjust column widths
-    for ws in wb:
-        for col in ws.columns:
-            max_length = max(len(str(cell.value)) for cell in col if cell.value)
-            ws.column_dimensions[get_column_letter(col[0].column)].width = min(max_length + 2, 50)
+    write_sheet(wb, "All_Triples", ["Subject", "Predicate", "Object"], (
+        [extract_local_name(s), extract_local_name(p), extract_local_name(o) if isinstance(o, rdflib.URIRef) else str(o)]
+        for s, p, o in sorted(g)
+    ))
 
     # Save the workbook
     wb.save(output_xlsx)
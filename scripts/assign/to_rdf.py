@@ -1,23 +1,43 @@
 import openpyxl
 from rdflib import Graph, Namespace, RDF, RDFS, OWL, Literal, URIRef
-import owlready2
-from owlready2 import get_ontology, sync_reasoner
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.sheet_stream import add_batched
+from common.swrl import SWRL, SWRLB, add_rule
 
 def create_uri(namespace, local_name):
     """Create a URI from a namespace and local name."""
     return URIRef(f"{namespace}{local_name}")
 
+def all_triples_rows(ws, ns):
+    """Yield one triple per All_Triples row, streaming the sheet."""
+    for row in ws.iter_rows(min_row=2, values_only=True):
+        try:
+            subj, pred, obj = row[:3]
+            subj_uri = create_uri(ns, subj)
+            pred_uri = create_uri(ns, pred)
+            # Try to treat object as URI; if it fails, treat as literal
+            try:
+                yield (subj_uri, pred_uri, create_uri(ns, obj))
+            except Exception:
+                yield (subj_uri, pred_uri, Literal(obj))
+        except Exception:
+            pass  # Skip invalid triples
+
 def xlsx_to_rdf(xlsx_file, output_owl, namespace="http://example.org/ontology#"):
     # Initialize RDF graph
     g = Graph()
     ns = Namespace(namespace)
     g.bind("owl", OWL)
     g.bind("rdfs", RDFS)
-    g.bind("swrl", "http://www.w3.org/2003/11/swrl#")
+    g.bind("swrl", SWRL)
+    g.bind("swrlb", SWRLB)
 
-    # Load Excel file
-    wb = openpyxl.load_workbook(xlsx_file)
+    # Load Excel file in read-only mode so rows are streamed instead of held as cell objects
+    wb = openpyxl.load_workbook(xlsx_file, read_only=True, data_only=True)
 
     # Process Classes sheet
     if "Classes" in wb.sheetnames:
@@ -88,73 +108,25 @@ def xlsx_to_rdf(xlsx_file, output_owl, namespace="http://example.org/ontology#")
                     g.add((restr_uri, restr_pred, Literal(value)))
             g.add((class_uri, RDFS.subClassOf, restr_uri))
 
-    # Process All_Triples sheet (for additional triples)
+    # Process All_Triples sheet (for additional triples), added to the graph in addN batches
     if "All_Triples" in wb.sheetnames:
-        ws = wb["All_Triples"]
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            subj, pred, obj = row
-            try:
-                subj_uri = create_uri(ns, subj)
-                pred_uri = create_uri(ns, pred)
-                # Try to treat object as URI; if it fails, treat as literal
-                try:
-                    obj_uri = create_uri(ns, obj)
-                    g.add((subj_uri, pred_uri, obj_uri))
-                except:
-                    g.add((subj_uri, pred_uri, Literal(obj)))
-            except:
-                pass  # Skip invalid triples
-
-    # Save RDF graph temporarily (without SWRL rules)
-    temp_owl = "temp_ontology.owl"
-    g.serialize(temp_owl, format="xml")
+        add_batched(g, all_triples_rows(wb["All_Triples"], ns))
 
-    # Process SWRL Rules using Owlready2
-    owlready2.onto_path.append(os.getcwd())
-    onto = get_ontology(f"file://{temp_owl}").load()
-    
+    # Process Rules sheet: swrl:Imp triples are built straight into the graph
     if "Rules" in wb.sheetnames:
         ws = wb["Rules"]
         for row in ws.iter_rows(min_row=2, values_only=True):
-            rule_name, antecedent, consequent = row
-            # Create a new SWRL rule
-            with onto:
-                rule = owlready2.Imp()
-                rule.set_name(rule_name)
-                # Parse antecedent and consequent (simplified; assumes atoms are class/property assertions)
-                ante_atoms = []
-                cons_atoms = []
-                for atom in antecedent.split("; "):
-                    try:
-                        # Example: ClassName(?x) or property(?x, ?y)
-                        if "(?" in atom:
-                            pred_name = atom[:atom.index("(")]
-                            pred = onto.search_one(iri=f"{ns}{pred_name}")
-                            if pred:
-                                ante_atoms.append(pred)
-                    except:
-                        pass
-                for atom in consequent.split("; "):
-                    try:
-                        if "(?" in atom:
-                            pred_name = atom[:atom.index("(")]
-                            pred = onto.search_one(iri=f"{ns}{pred_name}")
-                            if pred:
-                                cons_atoms.append(pred)
-                    except:
-                        pass
-                # Assign simplified atoms (this is a basic implementation)
-                if ante_atoms and cons_atoms:
-                    rule.set_as_rule(f"{antecedent} -> {consequent}")
+            rule_name, antecedent, consequent = row[:3]
+            try:
+                add_rule(g, ns, antecedent, consequent, label=rule_name)
+            except ValueError as e:
+                print(f"⚠️ Skipping rule '{rule_name}': {e}")
+    wb.close()
 
-    # Save the final ontology with SWRL rules
-    onto.save(file=output_owl, format="rdfxml")
+    # Save the final ontology with SWRL rules in one pass
+    g.serialize(output_owl, format="xml")
     print(f"Ontology reconstructed and saved to {output_owl}")
 
-    # Clean up temporary file
-    if os.path.exists(temp_owl):
-        os.remove(temp_owl)
-
 if __name__ == "__main__":
     # Example usage
     xlsx_file = "ontology_output_with_swrl.xlsx"  # Input XLSX file
@@ -0,0 +1,85 @@
+"""
+Validate the ontology against the declarative shapes in scripts/common/validation.py.
+
+All shapes are compiled once and checked in a single pass over the graph. The report is
+printed as text, or written as JSON for other tools.
+
+With --changeset and --previous, only the subjects the changeset touches are re-checked
+and the results are merged into the previous JSON report. --ontology is taken to already
+contain the change; add --pending to apply the changeset in memory first (e.g. a
+pipeline --dry-run changeset that has not been applied yet).
+
+Usage:
+    python scripts/assign/validate.py [--ontology salad_ontology.rdf] [--shapes ID ...]
+                                      [--shapes-file shapes.json] [--json report.json] [--limit N]
+    python scripts/assign/validate.py --changeset changes.nt --previous report.json [--pending] [--json new.json]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.changeset import Changeset, overlay
+from common.ontology import ONTOLOGY_FILE, load_graph
+from common.validation import SHAPES, compile_shapes, load_shapes, print_report, revalidate, validate
+
+
+def run(g, ids=None, shapes=SHAPES, changeset=None, previous=None):
+    """
+    Compile `shapes` (or just `ids`) and validate `g`; return the report dict.
+
+    With a `changeset` and the `previous` report, only the touched subjects are re-checked.
+    """
+    checks = compile_shapes(shapes, ids)
+    if changeset is not None and previous is not None:
+        return revalidate(g, changeset, previous, checks)
+    return validate(g, checks)
+
+
+def main(argv=None, default_ids=None):
+    parser = argparse.ArgumentParser(description="Validate the salad ontology against shape rules.")
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE)
+    parser.add_argument("--shapes", nargs="+", metavar="ID", default=default_ids,
+                        help="Only run these shape ids (default: all)")
+    parser.add_argument("--shapes-file", help="JSON list of shape dicts to use instead of the built-in shapes")
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON ('-' for stdout)")
+    parser.add_argument("--limit", type=int, default=20, help="Violations printed per shape (text report)")
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 if any shape fails")
+    parser.add_argument("--changeset", help="Re-check only the subjects touched by this changeset")
+    parser.add_argument("--previous", help="JSON report of the ontology before the changeset")
+    parser.add_argument("--pending", action="store_true",
+                        help="The changeset is not in --ontology yet; apply it in memory first")
+    args = parser.parse_args(argv)
+    if bool(args.changeset) != bool(args.previous):
+        parser.error("--changeset and --previous must be given together")
+
+    shapes = load_shapes(args.shapes_file) if args.shapes_file else SHAPES
+    g = load_graph(args.ontology)
+    changeset = previous = None
+    if args.changeset:
+        changeset = Changeset.read(args.changeset)
+        with open(args.previous, encoding="utf8") as f:
+            previous = json.load(f)
+        if args.pending:
+            g = changeset.apply(overlay(g))
+    report = run(g, args.shapes, shapes, changeset, previous)
+    report["ontology"] = args.ontology
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print_report(report, args.limit)
+        if args.json:
+            with open(args.json, "w", encoding="utf8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"✅ Report written to {args.json}")
+
+    if args.strict and report["summary"]["violations"]:
+        raise SystemExit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
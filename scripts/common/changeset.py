@@ -0,0 +1,158 @@
+"""Copy-on-write overlay graphs and serializable changesets.
+
+An overlay graph reads through to a base Graph but keeps every addition and removal in
+its own sets, so the base is never touched. Running a stage on an overlay is a dry run
+that still reports exactly what it would change. overlay_changeset() returns the result
+as a Changeset, which can be written as a sorted N-Triples diff and applied later
+without redoing the matching:
+
+    + <http://...#EggSalad_I> <http://...#hasIngredientPortion> <http://...#Celery30g> .
+    - <http://...#X> <http://...#hasUnit> "iu/100g" .
+
+Blank node labels are kept as written, so a diff whose blank nodes carry canonical
+labels (see graph_diff.py) can be mapped back onto another parse of the same graph.
+"""
+from rdflib import BNode, Graph
+from rdflib.store import Store
+
+DIFF_ADD = "+"
+DIFF_REMOVE = "-"
+
+
+def triple_line(triple):
+    """One N-Triples line ("<s> <p> <o> .") for `triple`."""
+    s, p, o = triple
+    return f"{s.n3()} {p.n3()} {o.n3()} ."
+
+
+class OverlayStore(Store):
+    """rdflib Store that layers in-memory additions and removals over a read-only base graph."""
+
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+        self.added = Graph()
+        self.removed = set()
+        self._bindings = {}
+
+    def add(self, triple, context, quoted=False):
+        if triple in self.removed:
+            self.removed.discard(triple)
+        elif triple not in self.base:
+            self.added.add(triple)
+        super().add(triple, context, quoted)
+
+    def remove(self, triple_pattern, context=None):
+        for triple, _ in list(self.triples(triple_pattern)):
+            if triple in self.added:
+                self.added.remove(triple)
+            else:
+                self.removed.add(triple)
+        super().remove(triple_pattern, context)
+
+    def triples(self, triple_pattern, context=None):
+        removed = self.removed
+        for triple in self.base.triples(triple_pattern):
+            if triple not in removed:
+                yield triple, iter(())
+        for triple in self.added.triples(triple_pattern):
+            yield triple, iter(())
+
+    def __len__(self, context=None):
+        return len(self.base) - len(self.removed) + len(self.added)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    # Prefix bindings stay local too; lookups fall back to the base graph's
+    def bind(self, prefix, namespace, override=True):
+        self._bindings[prefix] = namespace
+
+    def namespace(self, prefix):
+        return self._bindings.get(prefix) or self.base.store.namespace(prefix)
+
+    def prefix(self, namespace):
+        for prefix, bound in self._bindings.items():
+            if bound == namespace:
+                return prefix
+        return self.base.store.prefix(namespace)
+
+    def namespaces(self):
+        yield from self._bindings.items()
+        for prefix, namespace in self.base.store.namespaces():
+            if prefix not in self._bindings:
+                yield prefix, namespace
+
+
+def overlay(base):
+    """Return a Graph that reads through to `base` and records its own changes."""
+    return Graph(store=OverlayStore(base))
+
+
+def overlay_changeset(g):
+    """The Changeset recorded by an overlay graph."""
+    return Changeset(set(g.store.added), set(g.store.removed))
+
+
+class Changeset:
+    """Triples to add and to remove, serializable as a sorted N-Triples diff."""
+
+    def __init__(self, added=(), removed=()):
+        self.added = set(added)
+        self.removed = set(removed)
+
+    def __len__(self):
+        return len(self.added) + len(self.removed)
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+    def inverse(self):
+        """The changeset that undoes this one."""
+        return Changeset(self.removed, self.added)
+
+    def apply(self, g):
+        """Apply removals then additions to `g` in place; return `g`."""
+        for triple in self.removed:
+            g.remove(triple)
+        g.addN((s, p, o, g) for s, p, o in self.added)
+        return g
+
+    def lines(self):
+        """Diff lines, removals first, each group sorted so equal changesets serialize identically."""
+        for line in sorted(map(triple_line, self.removed)):
+            yield f"{DIFF_REMOVE} {line}\n"
+        for line in sorted(map(triple_line, self.added)):
+            yield f"{DIFF_ADD} {line}\n"
+
+    def write(self, path):
+        with open(path, "w", encoding="utf8") as f:
+            f.writelines(self.lines())
+
+    @classmethod
+    def read(cls, path):
+        """Load a diff written by write()."""
+        added, removed = [], []
+        with open(path, encoding="utf8") as f:
+            for number, line in enumerate(f, 1):
+                line = line.rstrip("\n")
+                if not line.strip():
+                    continue
+                sign, _, triple = line.partition(" ")
+                if sign == DIFF_ADD:
+                    added.append(triple)
+                elif sign == DIFF_REMOVE:
+                    removed.append(triple)
+                else:
+                    raise ValueError(f"{path}:{number}: expected a line starting with '+ ' or '- '")
+        return cls(_parse_ntriples(added), _parse_ntriples(removed))
+
+
+def _parse_ntriples(lines):
+    g = Graph()
+    bnode_context = {}
+    if lines:
+        g.parse(data="\n".join(lines) + "\n", format="nt", bnode_context=bnode_context)
+    # The parser gives every _:label a fresh blank node; put the written labels back
+    labels = {node: BNode(label) for label, node in bnode_context.items()}
+    return {(labels.get(s, s), p, labels.get(o, o)) for s, p, o in g}
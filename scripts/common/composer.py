@@ -0,0 +1,186 @@
+"""Compose a custom salad from existing Ingredient and Dressing portions to hit nutrient targets.
+
+The ingredient nutrient matrix (per 100 g, or per 100 ml for dressings) is built once per graph.
+compose() then runs a greedy search with NumPy: every step scores moving every allowed
+component to its next larger existing portion (Tomato100g -> Tomato150g) at once and keeps
+the move that removes the most target violation per gram. The greedy never shrinks, drops
+or swaps a pick, so a local search follows: every step scores adding any portion,
+removing a pick and replacing a pick with any other portion (including a smaller one of
+the same component), and takes the move that lowers the violation most, until none
+does or all targets are met. Only IngredientPortion and
+DressingPortion individuals already in the ontology are picked, so the result can go
+straight into data/salad_recipes.csv.
+Targets use the same units as the salad totals: mg, and cal for FoodEnergy.
+"""
+import numpy as np
+
+from common.name_index import get_name_index, normalize_name
+from common.ontology import local_name
+from common.recommender import NUTRIENT_COLUMNS, NUTRIENTS
+from common.salad_index import get_salad_index
+
+
+def existing_portions(name_index, component, kind):
+    """[(amount, portion name)] of the `kind` portions of `component` in the graph, smallest first."""
+    by_amount = {}
+    for portion in name_index.portions_by_base.get(normalize_name(local_name(component)), ()):
+        _, amount, _ = name_index.portion_info[portion]
+        if amount is not None and float(amount) > 0 and name_index.portion_kinds[portion] == kind:
+            by_amount.setdefault(float(amount), local_name(portion))
+    return sorted(by_amount.items())
+
+
+class SaladComposer:
+    """Greedy portion-size optimizer with local search over the ingredient nutrient matrix."""
+
+    def __init__(self, names, kinds, matrix, allergens, portions):
+        self.names = list(names)
+        self.kinds = np.array(kinds)
+        self.matrix = matrix          # (components, NUTRIENTS) amount per 100 g/ml
+        self.allergens = allergens    # per component: set of allergen and component names
+        self.portions = portions      # per component: [(amount, portion name)], smallest first
+
+        # (components, most portions) amounts padded with inf, so a missing next portion never fits
+        self.amounts = np.full((len(self.names), max((len(p) for p in portions), default=0) + 1), np.inf)
+        for i, options in enumerate(portions):
+            self.amounts[i, :len(options)] = [amount for amount, _ in options]
+
+        # Every portion as one option: its component, its index among the component's portions
+        counts = np.array([len(p) for p in portions], dtype=int)
+        self.option_components = np.repeat(np.arange(len(self.names)), counts)
+        self.option_levels = np.concatenate([np.arange(c) for c in counts]) if len(counts) else np.zeros(0, dtype=int)
+        self.option_offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(int)
+
+    @classmethod
+    def from_graph(cls, g):
+        """Collect every Ingredient/Dressing individual that has substance portions and existing portions."""
+        index = get_salad_index(g)
+        name_index = get_name_index(g)
+        components, portions = [], []
+        for component in sorted(c for c in index.component_kinds if index.component_substances.get(c)):
+            options = existing_portions(name_index, component, index.component_kinds[component])
+            if options:
+                components.append(component)
+                portions.append(options)
+
+        matrix = np.zeros((len(components), len(NUTRIENTS)))
+        allergens = []
+        for i, component in enumerate(components):
+            for name, amount, _ in index.component_substances[component]:
+                if name in NUTRIENT_COLUMNS:
+                    matrix[i, NUTRIENT_COLUMNS[name]] = float(amount)
+            allergens.append({local_name(component)} | {local_name(a) for a in index.component_allergens.get(component, ())})
+
+        kinds = [index.component_kinds[c] for c in components]
+        return cls([local_name(c) for c in components], kinds, matrix, allergens, portions)
+
+    def compose(self, targets, exclude=(), max_items=6, max_dressings=1):
+        """
+        Pick portions so the salad totals satisfy `targets` ({nutrient: (min, max)}, None = open).
+
+        exclude: allergen or component names to leave out (e.g. "Lactose").
+        Returns {"portions": [...], "totals": {nutrient: amount}, "satisfied": bool}.
+        """
+        columns = []
+        lows, highs = [], []
+        for nutrient, (low, high) in targets.items():
+            if nutrient not in NUTRIENT_COLUMNS:
+                raise ValueError(f"Unknown nutrient '{nutrient}', expected one of {NUTRIENTS}")
+            columns.append(NUTRIENT_COLUMNS[nutrient])
+            lows.append(-np.inf if low is None else low)
+            highs.append(np.inf if high is None else high)
+        lows, highs = np.array(lows), np.array(highs)
+        low_scale = np.maximum(np.abs(np.where(np.isfinite(lows), lows, 1.0)), 1e-9)
+        high_scale = np.maximum(np.abs(np.where(np.isfinite(highs), highs, 1.0)), 1e-9)
+
+        def violation(totals):
+            # Relative distance outside [low, high], summed over the targeted nutrients
+            under = np.maximum(lows - totals, 0) / low_scale
+            over = np.maximum(totals - highs, 0) / high_scale
+            return (under + over).sum(axis=-1)
+
+        excluded = set(exclude)
+        allowed = np.array([not (names & excluded) for names in self.allergens], dtype=bool)
+        is_dressing = self.kinds == "dressing"
+        per_gram = self.matrix[:, columns] / 100.0
+        rows = np.arange(len(self.names))
+
+        levels = np.full(len(self.names), -1)  # index of the picked portion, -1 = not in the salad
+        amounts = np.zeros(len(self.names))
+        totals = np.zeros(len(columns))
+        current = violation(totals)
+
+        while current > 0:
+            chosen = levels >= 0
+            next_amounts = self.amounts[rows, levels + 1]
+            feasible = allowed & np.isfinite(next_amounts)
+            increment = np.where(feasible, next_amounts - amounts, 1.0)
+            if chosen.sum() >= max_items:
+                feasible &= chosen
+            if (chosen & is_dressing).sum() >= max_dressings:
+                feasible &= chosen | ~is_dressing
+            if not feasible.any():
+                break
+
+            # Violation removed per gram, so growing a portion competes fairly with adding one
+            scores = violation(totals + increment[:, None] * per_gram)
+            gains = (current - scores) / increment
+            gains[~feasible] = -np.inf
+            best = int(np.argmax(gains))
+            if gains[best] <= 0:
+                break
+            levels[best] += 1
+            amounts[best] += increment[best]
+            totals = totals + increment[best] * per_gram[best]
+            current = scores[best]
+
+        # Local search: the best add / remove / replace move until none lowers the violation
+        components = self.option_components
+        option_totals = self.amounts[components, self.option_levels][:, None] * per_gram[components]
+        option_ok = allowed[components]
+        option_dressing = is_dressing[components]
+        options = np.arange(len(components))
+        while current > 0:
+            picked = np.flatnonzero(levels >= 0)
+            picked_options = self.option_offsets[picked] + levels[picked]
+            totals = option_totals[picked_options].sum(axis=0)
+            in_salad = levels[components] >= 0
+            dressings = is_dressing[picked].sum()
+
+            add_ok = option_ok & ~in_salad & (len(picked) < max_items)
+            add_ok &= ~option_dressing | (dressings < max_dressings)
+            add = np.where(add_ok, violation(totals + option_totals), np.inf)
+
+            remove = violation(totals - option_totals[picked_options])
+
+            # Replace pick i by option j: j's component is new, or it is i's own component at another size
+            without = totals - option_totals[picked_options]
+            replace_ok = option_ok[None, :] & (~in_salad[None, :] | (components[None, :] == picked[:, None]))
+            replace_ok &= options[None, :] != picked_options[:, None]
+            replace_ok &= dressings - is_dressing[picked][:, None] + option_dressing[None, :] <= max_dressings
+            replace = np.where(replace_ok, violation(without[:, None, :] + option_totals[None, :, :]), np.inf)
+
+            moves = [(add.min(initial=np.inf), "add"), (remove.min(initial=np.inf), "remove"),
+                     (replace.min(initial=np.inf), "replace")]
+            score, move = min(moves, key=lambda m: m[0])
+            if not score < current - 1e-12:
+                break
+            if move == "add":
+                j = int(np.argmin(add))
+                levels[components[j]] = self.option_levels[j]
+            elif move == "remove":
+                levels[picked[int(np.argmin(remove))]] = -1
+            else:
+                i, j = np.unravel_index(int(np.argmin(replace)), replace.shape)
+                levels[picked[i]] = -1
+                levels[components[j]] = self.option_levels[j]
+            current = score
+        amounts = np.where(levels >= 0, self.amounts[np.arange(len(self.names)), np.maximum(levels, 0)], 0.0)
+
+        picked = np.flatnonzero(levels >= 0)
+        all_totals = amounts[picked] @ self.matrix[picked] / 100.0
+        return {
+            "portions": [self.portions[i][levels[i]][1] for i in picked],
+            "totals": {nutrient: float(all_totals[j]) for j, nutrient in enumerate(NUTRIENTS)},
+            "satisfied": bool(current == 0),
+        }
@@ -0,0 +1,156 @@
+"""Canonical N-Triples, graph hashing and diffs between ontology versions.
+
+Blank nodes (OWL restrictions, RDF lists, SWRL rules and atoms) get fresh identities on
+every parse, so two parses of the same file never compare equal triple by triple. Every
+blank node is therefore relabelled from its content (its outgoing triples, recursively)
+and from where it hangs (its incoming triples). The graph can then be written as sorted
+N-Triples lines, hashed, and diffed against another version in one merge pass over the
+two sorted line lists.
+
+A diff is a Changeset whose blank nodes carry canonical labels. apply_changeset() maps
+those labels onto the target graph's own blank nodes, so a diff or its inverse can be
+applied to any graph that contains the same structures.
+"""
+import hashlib
+
+from rdflib import BNode
+
+from common.changeset import Changeset, triple_line
+
+LABEL_PREFIX = "c"
+LABEL_LENGTH = 20  # hex digits of the sha1 kept in a canonical blank node label
+
+
+def _digest(parts):
+    return hashlib.sha1("\n".join(parts).encode("utf8")).hexdigest()
+
+
+def _fold(root, edges, side, memo, finish):
+    """
+    Depth-first post-order over blank nodes without recursion (RDF lists nest as deep as they
+    are long). memo[node] = finish(node, edges[node], values), where values[i] is the folded
+    value of the blank node at position `side` of the i-th edge, or None if it is not blank.
+    A node reached again while still open gets "cycle".
+    """
+    if root in memo:
+        return memo[root]
+    stack = [(root, edges.get(root, []), [])]
+    visiting = {root}
+    while stack:
+        node, pairs, values = stack[-1]
+        if len(values) < len(pairs):
+            other = pairs[len(values)][side]
+            if not isinstance(other, BNode):
+                values.append(None)
+            elif other in memo:
+                values.append(memo[other])
+            elif other in visiting:
+                values.append("cycle")
+            else:
+                visiting.add(other)
+                stack.append((other, edges.get(other, []), []))
+            continue
+        stack.pop()
+        visiting.discard(node)
+        memo[node] = finish(node, pairs, values)
+        if stack:
+            stack[-1][2].append(memo[node])
+    return memo[root]
+
+
+def canonical_labels(g):
+    """Map every blank node of `g` to a BNode with a content-derived, parse-independent label."""
+    outgoing, incoming = {}, {}
+    for s, p, o in g:
+        if isinstance(s, BNode):
+            outgoing.setdefault(s, []).append((p, o))
+        if isinstance(o, BNode):
+            incoming.setdefault(o, []).append((s, p))
+    for node in list(incoming):
+        outgoing.setdefault(node, [])
+
+    down = {}
+
+    def content(node, pairs, values):
+        # Hash of the subtree below `node`; cycles collapse to a fixed marker
+        return _digest(sorted(f"{p.n3()} {o.n3() if value is None else value}"
+                              for (p, o), value in zip(pairs, values)))
+
+    labels = {}
+
+    def label(node, pairs, values):
+        # Content plus position: identical subtrees under different parents stay distinct
+        parents = sorted(f"{s.n3() if value is None else value} {p.n3()}" for (s, p), value in zip(pairs, values))
+        return _digest([_fold(node, outgoing, 1, down, content)] + parents)[:LABEL_LENGTH]
+
+    return {node: BNode(LABEL_PREFIX + _fold(node, incoming, 0, labels, label)) for node in outgoing}
+
+
+def canonical_triples(g):
+    """Yield the triples of `g` with blank nodes replaced by their canonical labels."""
+    labels = canonical_labels(g)
+    for s, p, o in g:
+        yield labels.get(s, s), p, labels.get(o, o)
+
+
+def canonical_lines(g):
+    """Sorted, de-duplicated canonical N-Triples lines paired with their triples: [(line, triple)]."""
+    pairs = {triple_line(t): t for t in canonical_triples(g)}
+    return sorted(pairs.items())
+
+
+def graph_hash(g, lines=None):
+    """sha256 of the canonical N-Triples form: equal for equal graphs, whatever the parse order."""
+    digest = hashlib.sha256()
+    for line, _ in lines if lines is not None else canonical_lines(g):
+        digest.update(line.encode("utf8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def diff_lines(old_lines, new_lines):
+    """One merge pass over two sorted [(line, triple)] lists; return the Changeset old -> new."""
+    added, removed = [], []
+    i = j = 0
+    while i < len(old_lines) and j < len(new_lines):
+        old_line, new_line = old_lines[i][0], new_lines[j][0]
+        if old_line == new_line:
+            i += 1
+            j += 1
+        elif old_line < new_line:
+            removed.append(old_lines[i][1])
+            i += 1
+        else:
+            added.append(new_lines[j][1])
+            j += 1
+    removed.extend(triple for _, triple in old_lines[i:])
+    added.extend(triple for _, triple in new_lines[j:])
+    return Changeset(added, removed)
+
+
+def diff_graphs(old, new):
+    """Changeset that turns graph `old` into graph `new`."""
+    return diff_lines(canonical_lines(old), canonical_lines(new))
+
+
+def apply_changeset(g, changeset):
+    """
+    Apply a canonical-label changeset to `g` in place and return `g`.
+
+    Canonical labels are translated to the blank nodes already in `g`; labels `g` does not
+    have become new blank nodes (one per label).
+    """
+    existing = {label: node for node, label in canonical_labels(g).items()}
+    fresh = {}
+
+    def resolve(term):
+        if isinstance(term, BNode):
+            if term in existing:
+                return existing[term]
+            return fresh.setdefault(term, BNode())
+        return term
+
+    def translate(triples):
+        return {(resolve(s), p, resolve(o)) for s, p, o in triples}
+
+    return Changeset(translate(changeset.added), translate(changeset.removed)).apply(g)
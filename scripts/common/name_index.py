@@ -0,0 +1,142 @@
+"""Name-resolution index for linking portions and substance portions by their local names.
+
+Individuals follow fixed naming patterns: "<Component><amount><unit>" for ingredient and
+dressing portions ("Tomato150g") and "<Component><Substance>" for substance portions
+("TomatoVitaminC"). Instead of probing every substance name with endswith, running a
+regex per portion or building candidate URIs and asking the graph about each one, this
+module builds, once per graph, a reversed-string trie over the substance names and dicts
+from base name to portions, so every link is a single lookup.
+"""
+import weakref
+from collections import defaultdict
+from functools import lru_cache
+
+from rdflib.namespace import RDF
+
+from common.ontology import SALAD, graph_version, local_name
+
+# List of all known Substance names
+SUBSTANCE_NAMES = [
+    "Calcium", "Carbohydrate", "Cholesterol", "Fat", "FoodEnergy",
+    "Iron", "Potassium", "Protein", "Sodium", "VitaminA", "VitaminC",
+    "VitaminE", "Lutein", "Zeaxanthin", "Zinc", "Omega-3", "VitaminB9"
+]
+
+# Cache of built indexes, keyed by graph and invalidated by any change to it (graph_version)
+_INDEX_CACHE = weakref.WeakKeyDictionary()
+
+_END = None  # trie key marking the end of a name
+
+
+def normalize_name(name):
+    """Strip zero-width / non-breaking spaces and blanks that creep in from the spreadsheets."""
+    return name.replace('\u200b', '').replace('\xa0', '').replace(' ', '').strip()
+
+
+@lru_cache(maxsize=None)
+def split_portion_name(portion_name):
+    """
+    Split "Tomato150g" into ("Tomato", "150", "g"), scanning from the end of the name.
+
+    Same result as matching r'([0-9]+(?:\\.[0-9]+)?)([a-zA-Z]*)$'; names without a trailing
+    amount come back as (portion_name, None, None).
+    """
+    i = len(portion_name)
+    while i > 0 and portion_name[i - 1].isascii() and portion_name[i - 1].isalpha():
+        i -= 1
+    j = i
+    while j > 0 and (portion_name[j - 1].isdigit() or portion_name[j - 1] == "."):
+        j -= 1
+
+    amount = portion_name[j:i]
+    # Drop leading dots / extra decimal points the pattern would not match
+    while amount and (amount[0] == "." or amount.count(".") > 1):
+        amount = amount[1:]
+        j += 1
+    if not amount or amount.endswith(".") or not amount.isascii():
+        return portion_name, None, None
+    return portion_name[:j], amount, portion_name[i:]
+
+
+class SuffixMatcher:
+    """Reversed-string trie: finds which known name a string ends with in O(len(name))."""
+
+    def __init__(self, names):
+        self.root = {}
+        for name in names:
+            node = self.root
+            for char in reversed(name):
+                node = node.setdefault(char, {})
+            node[_END] = name
+
+    def match(self, text):
+        """Return the longest known name that `text` ends with, or None."""
+        node = self.root
+        found = None
+        for char in reversed(text):
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(_END, found)
+        return found
+
+
+class NameIndex:
+    """Lookup tables from normalized local names to individuals, portions and substance portions."""
+
+    def __init__(self, g, substance_names=SUBSTANCE_NAMES):
+        self.version = graph_version(g)
+        self.substance_names = list(substance_names)
+        self.substances = SuffixMatcher(self.substance_names)
+
+        # Every typed individual by normalized local name
+        self.individuals = {}
+        for s in g.subjects(RDF.type, None):
+            self.individuals.setdefault(normalize_name(local_name(s)), s)
+
+        # Ingredient/Dressing portions, parsed once: portion -> (base, amount, unit)
+        self.ingredient_portions = sorted(set(g.subjects(RDF.type, SALAD.IngredientPortion)))
+        self.dressing_portions = sorted(set(g.subjects(RDF.type, SALAD.DressingPortion)))
+        self.portion_kinds = dict.fromkeys(self.ingredient_portions, "ingredient")
+        self.portion_kinds.update(dict.fromkeys(self.dressing_portions, "dressing"))
+        self.portion_info = {}
+        self.portions_by_base = defaultdict(list)
+        for portion in self.portion_kinds:
+            base, amount, unit = split_portion_name(normalize_name(local_name(portion)))
+            self.portion_info[portion] = (base, amount, unit)
+            self.portions_by_base[base].append(portion)
+
+        # Substance portions grouped by component base name, in substance_names order
+        order = {name: i for i, name in enumerate(self.substance_names)}
+        grouped = defaultdict(list)
+        for portion in set(g.subjects(RDF.type, SALAD.SubstancePortion)):
+            name = local_name(portion)
+            substance = self.substances.match(name)
+            if substance is not None:
+                grouped[name[:-len(substance)]].append((order[substance], substance, portion))
+        self.substance_portions_by_base = {
+            base: [(substance, portion) for _, substance, portion in sorted(entries)]
+            for base, entries in grouped.items()
+        }
+
+    @classmethod
+    def for_graph(cls, g):
+        """Return the cached index for `g`, rebuilding it if the graph has changed."""
+        index = _INDEX_CACHE.get(g)
+        if index is None or index.version != graph_version(g):
+            index = cls(g)
+            _INDEX_CACHE[g] = index
+        return index
+
+    def substance_for(self, name):
+        """Substance name that a substance portion name ends with ("TomatoVitaminC" -> "VitaminC")."""
+        return self.substances.match(name)
+
+    def substance_portions_for(self, base_name):
+        """[(substance, substance portion URI)] named "<base_name><Substance>"."""
+        return self.substance_portions_by_base.get(base_name, [])
+
+
+def get_name_index(g):
+    """Shortcut for NameIndex.for_graph."""
+    return NameIndex.for_graph(g)
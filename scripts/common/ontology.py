@@ -0,0 +1,62 @@
+"""Shared constants and graph helpers for the salad bar ontology scripts."""
+import hashlib
+import weakref
+from pathlib import Path
+
+from rdflib import Graph, Namespace
+from rdflib.store import StoreCreatedEvent, TripleAddedEvent, TripleRemovedEvent
+
+# === CONFIGURATION ===
+ONTOLOGY_FILE = "salad_ontology.rdf"
+
+# Define namespace
+DEFAULT_NS = "http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#"
+SALAD = Namespace(DEFAULT_NS)
+
+# Per-store count of change events, see graph_version
+_STORE_CHANGES = weakref.WeakKeyDictionary()
+
+
+def local_name(uri):
+    """Extract the local name (the part after '#') from a URI."""
+    return str(uri).split("#")[-1]
+
+
+def load_graph(path=ONTOLOGY_FILE):
+    """Parse the ontology file into a fresh rdflib Graph."""
+    g = Graph()
+    g.parse(path, format="xml")
+    return g
+
+
+def graph_version(g):
+    """
+    Version stamp for caches built from `g`: (store change events, triple count).
+
+    Unlike len(g) alone it also changes when an edit keeps the triple count (a rename, a
+    new hasAmount value). rdflib's Memory store reports additions but not removals; a
+    removal with no addition always shrinks the graph, so the pair still changes.
+    """
+    store = g.store
+    changes = _STORE_CHANGES.get(store)
+    if changes is None:
+        changes = _STORE_CHANGES[store] = [0]
+
+        def count(event):
+            changes[0] += 1
+
+        for event_type in (TripleAddedEvent, TripleRemovedEvent, StoreCreatedEvent):
+            store.dispatcher.subscribe(event_type, count)
+    return changes[0], len(g)
+
+
+def file_digest(path):
+    """sha1 of a file's bytes, or "missing"."""
+    path = Path(path)
+    if not path.exists():
+        return "missing"
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,158 @@
+"""Per-phase cProfile / tracemalloc profiling of a command.
+
+Inside profiling(), every span() of common.timing is profiled on its own:
+
+- cpu: one cProfile profiler per span path, enabled only while that span is the innermost
+  open one, so parse, SPARQL evaluation and serialize land in separate files instead of
+  one mixed profile. Written as <dir>/<command>.<phase>.prof (python -m pstats, snakeviz).
+- memory: a tracemalloc snapshot when the span opens and when it closes; the top-N source
+  lines by memory still held at the end go to <dir>/<command>.<phase>.alloc.txt.
+
+A phase that runs several times (a span in a loop) accumulates into the same files.
+Only the thread that started profiling is profiled.
+"""
+import argparse
+import cProfile
+import pstats
+import re
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from common.timing import add_hook, remove_hook, span
+
+# === CONFIGURATION ===
+PROFILE_DIR = "output/profile"
+PROFILE_MODES = ("cpu", "memory")
+TOP_N = 25
+SUMMARY_FUNCTIONS = 3  # hottest functions per phase printed after the run
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+def _file_stem(path):
+    return re.sub(r"[^\w.-]+", "_", path.replace("/", "."))
+
+
+class PhaseProfiler:
+    """timing hook that keeps a cProfile profiler and allocation totals per span path."""
+
+    def __init__(self, modes=PROFILE_MODES, top=TOP_N):
+        self.cpu = "cpu" in modes
+        self.memory = "memory" in modes
+        self.top = top
+        self.thread = threading.get_ident()
+        self.profiles = {}                  # span path -> cProfile.Profile
+        self.allocations = defaultdict(lambda: defaultdict(lambda: [0, 0]))  # path -> line -> [bytes, blocks]
+        self.runs = defaultdict(int)
+        self.active = []                    # open span paths, innermost last
+        self.snapshots = []
+
+    def enter(self, path):
+        if threading.get_ident() != self.thread:
+            return
+        if self.cpu and self.active:
+            self.profiles[self.active[-1]].disable()
+        if self.memory:
+            self.snapshots.append(tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS))
+        self.active.append(path)
+        self.runs[path] += 1
+        if self.cpu:
+            self.profiles.setdefault(path, cProfile.Profile()).enable()
+
+    def exit(self, path):
+        if threading.get_ident() != self.thread:
+            return
+        if self.cpu:
+            self.profiles[path].disable()
+        self.active.pop()
+        if self.memory:
+            after = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            totals = self.allocations[path]
+            for stat in after.compare_to(self.snapshots.pop(), "lineno"):
+                if stat.size_diff > 0:
+                    total = totals[str(stat.traceback)]
+                    total[0] += stat.size_diff
+                    total[1] += stat.count_diff
+        if self.cpu and self.active:
+            self.profiles[self.active[-1]].enable()
+
+    def hottest(self, path, limit=SUMMARY_FUNCTIONS):
+        """[(own seconds, 'file:line(function)')] of the phase's most expensive functions."""
+        stats = pstats.Stats(self.profiles[path]).stats
+        ranked = sorted(stats.items(), key=lambda item: -item[1][2])[:limit]
+        return [(tottime, f"{Path(file).name}:{line}({func})") for (file, line, func), (_, _, tottime, _, _) in ranked]
+
+    def save(self, out_dir):
+        """Write the .prof and .alloc.txt files; return their paths."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for path, profile in self.profiles.items():
+            target = out_dir / f"{_file_stem(path)}.prof"
+            profile.dump_stats(target)
+            written.append(target)
+        for path, totals in self.allocations.items():
+            target = out_dir / f"{_file_stem(path)}.alloc.txt"
+            ranked = sorted(totals.items(), key=lambda item: -item[1][0])[:self.top]
+            with open(target, "w", encoding="utf8") as f:
+                f.write(f"# {path}: top {len(ranked)} lines by memory held at phase end "
+                        f"({self.runs[path]} run(s))\n")
+                f.write(f"{'KiB':>12} {'blocks':>10}  location\n")
+                for location, (size, count) in ranked:
+                    f.write(f"{size / 1024:12.1f} {count:10d}  {location}\n")
+            written.append(target)
+        return written
+
+
+@contextmanager
+def profiling(modes=PROFILE_MODES, out_dir=PROFILE_DIR, top=TOP_N, name=None):
+    """Profile the block (as span `name`) and every span inside it; write the files at the end."""
+    name = name or Path(sys.argv[0]).stem
+    profiler = PhaseProfiler(modes, top)
+    started_tracing = profiler.memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    add_hook(profiler)
+    try:
+        with span(name):
+            yield profiler
+    finally:
+        remove_hook(profiler)
+        if started_tracing:
+            tracemalloc.stop()
+        written = profiler.save(out_dir)
+        print(f"\n📈 Wrote {len(written)} profile files to {out_dir}")
+        if profiler.cpu:
+            for path in profiler.profiles:
+                hot = ", ".join(f"{func} {seconds:.3f}s" for seconds, func in profiler.hottest(path))
+                print(f"- {path}: {hot}")
+
+
+def parse_modes(text):
+    """'cpu', 'memory' or 'cpu,memory' -> tuple of modes."""
+    modes = tuple(mode.strip() for mode in text.split(",") if mode.strip())
+    unknown = set(modes) - set(PROFILE_MODES)
+    if not modes or unknown:
+        raise argparse.ArgumentTypeError(f"expected a comma-separated subset of {PROFILE_MODES}, got '{text}'")
+    return modes
+
+
+def add_profile_arguments(parser):
+    parser.add_argument("--profile", nargs="?", const=PROFILE_MODES, type=parse_modes, metavar="MODES",
+                        help="Profile every phase: cpu (cProfile .prof), memory (tracemalloc) or cpu,memory (default)")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="Where --profile writes its files")
+    parser.add_argument("--profile-top", type=int, default=TOP_N, help="Allocation lines kept per phase")
+
+
+def profile_from_args(args, name=None):
+    """profiling() as configured by add_profile_arguments(), or a no-op context without --profile."""
+    if not args.profile:
+        return nullcontext()
+    return profiling(args.profile, args.profile_dir, args.profile_top, name)
@@ -0,0 +1,128 @@
+"""Streaming RDF writers: triples go straight to the file, one subject at a time, without a Graph.
+
+    with open_writer("output/synthetic_salad_bar.rdf") as writer:
+        writer.write_graph(tbox)
+        writer.describe(SALAD.MySalad, [(RDF.type, SALAD.Salad), (SALAD.hasIngredientPortion, portion)])
+
+The file suffix picks the format: .nt gives N-Triples, anything else RDF/XML (what the
+scripts here parse). Nothing is buffered beyond the current subject, so output size is
+limited by disk, not memory. RDF/XML element names and object IRIs are built once and cached.
+"""
+from contextlib import contextmanager
+from xml.sax.saxutils import escape, quoteattr
+
+from rdflib import BNode, Literal, URIRef
+from rdflib.namespace import OWL, RDF, RDFS, XSD, split_uri
+
+from common.ontology import SALAD
+
+# Prefixes declared in the RDF/XML header; predicates in other namespaces get an inline xmlns
+NAMESPACES = {
+    "rdf": str(RDF),
+    "rdfs": str(RDFS),
+    "owl": str(OWL),
+    "xsd": str(XSD),
+    "swrl": "http://www.w3.org/2003/11/swrl#",
+    "swrla": "http://swrl.stanford.edu/ontologies/3.3/swrla.owl#",
+    "salad": str(SALAD),
+}
+
+
+def _nt_literal(literal):
+    # Literal.n3() may use Turtle's long quotes; N-Triples needs every line break escaped
+    text = str(literal).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+    if literal.language:
+        return f'"{text}"@{literal.language}'
+    if literal.datatype is not None:
+        return f'"{text}"^^<{literal.datatype}>'
+    return f'"{text}"'
+
+
+class NTriplesWriter:
+    """One line per triple."""
+
+    def __init__(self, f):
+        self.f = f
+        self.triples = 0
+
+    def describe(self, subject, pairs):
+        """Write the (predicate, object) pairs of one subject."""
+        s = subject.n3()
+        lines = [f"{s} {p.n3()} {_nt_literal(o) if isinstance(o, Literal) else o.n3()} .\n" for p, o in pairs]
+        self.f.write("".join(lines))
+        self.triples += len(lines)
+
+    def write_graph(self, g, skip=()):
+        """Write every triple of `g`, grouped by subject, except those of the subjects in `skip`."""
+        for subject in dict.fromkeys(g.subjects()):
+            if subject not in skip:
+                self.describe(subject, g.predicate_objects(subject))
+
+    def close(self):
+        pass
+
+
+class RdfXmlWriter(NTriplesWriter):
+    """One rdf:Description element per describe() call."""
+
+    def __init__(self, f, namespaces=NAMESPACES):
+        super().__init__(f)
+        self.prefixes = {uri: prefix for prefix, uri in namespaces.items()}
+        self.elements = {}  # predicate -> (opening tag, closing tag)
+        self.resources = {}  # object IRI -> quoted attribute value; objects repeat (classes, portions)
+        declarations = "".join(f"\n   xmlns:{prefix}={quoteattr(uri)}" for prefix, uri in namespaces.items())
+        f.write(f'<?xml version="1.0" encoding="utf-8"?>\n<rdf:RDF{declarations}>\n')
+
+    def _element(self, predicate):
+        element = self.elements.get(predicate)
+        if element is None:
+            namespace, name = split_uri(predicate)
+            prefix = self.prefixes.get(namespace)
+            if prefix:
+                element = (f"{prefix}:{name}", f"{prefix}:{name}")
+            else:
+                element = (f"{name} xmlns={quoteattr(namespace)}", name)
+            self.elements[predicate] = element
+        return element
+
+    @staticmethod
+    def _node(term):
+        # rdflib blank node ids may start with a digit; nodeID must be an XML name
+        if isinstance(term, BNode):
+            return f'rdf:nodeID="b{term}"'
+        return None
+
+    def describe(self, subject, pairs):
+        node = self._node(subject)
+        lines = [f"  <rdf:Description {node or 'rdf:about=' + quoteattr(str(subject))}>\n"]
+        for p, o in pairs:
+            opening, closing = self._element(p)
+            if isinstance(o, URIRef):
+                resource = self.resources.get(o)
+                if resource is None:
+                    resource = self.resources[o] = quoteattr(str(o))
+                lines.append(f"    <{opening} rdf:resource={resource}/>\n")
+            elif isinstance(o, Literal):
+                attributes = ""
+                if o.datatype is not None:
+                    attributes = f" rdf:datatype={quoteattr(str(o.datatype))}"
+                elif o.language:
+                    attributes = f' xml:lang="{o.language}"'
+                lines.append(f"    <{opening}{attributes}>{escape(str(o))}</{closing}>\n")
+            else:
+                lines.append(f"    <{opening} {self._node(o)}/>\n")
+        lines.append("  </rdf:Description>\n")
+        self.f.write("".join(lines))
+        self.triples += len(lines) - 2
+
+    def close(self):
+        self.f.write("</rdf:RDF>\n")
+
+
+@contextmanager
+def open_writer(path):
+    """Open `path` and yield the writer its suffix asks for; the document is closed on success."""
+    with open(path, "w", encoding="utf8", buffering=1 << 20) as f:
+        writer = NTriplesWriter(f) if str(path).lower().endswith(".nt") else RdfXmlWriter(f)
+        yield writer
+        writer.close()
@@ -0,0 +1,159 @@
+"""Load salad recipes (salad -> portion links) from CSV, JSON or YAML files.
+
+CSV files hold one row per salad-portion with a "salad" and a "portion" column.
+JSON and YAML files hold either a mapping {"Salad": ["Portion", ...]} or a list of
+{"salad": ..., "portion": ...} records. YAML needs PyYAML, which is only imported
+when a .yaml/.yml file is loaded.
+
+Portions are validated against the NameIndex (misspelled component names are resolved
+with the SearchIndex when one is given) and all links are added with one batched graph
+update.
+"""
+import csv
+import json
+from pathlib import Path
+
+from common.name_index import normalize_name, split_portion_name
+from common.ontology import SALAD, local_name
+from common.search_index import subclass_closure
+from common.sheet_stream import add_batched
+
+RECIPE_FORMATS = (".csv", ".json", ".yaml", ".yml")
+
+# Misspelled portion names are resolved among the individuals of these classes
+COMPONENT_CLASSES = (SALAD.Ingredient, SALAD.Dressing)
+
+PORTION_PROPERTIES = {
+    "ingredient": SALAD.hasIngredientPortion,
+    "dressing": SALAD.hasDressingPortion,
+}
+
+
+def _records(data, path):
+    """Turn a parsed JSON/YAML document into (salad, portion) pairs."""
+    if isinstance(data, dict):
+        for salad, portions in data.items():
+            for portion in portions or []:
+                yield salad, portion
+    elif isinstance(data, list):
+        for record in data:
+            yield record["salad"], record["portion"]
+    else:
+        raise ValueError(f"{path}: expected a mapping of salad -> portions or a list of records")
+
+
+def iter_recipe_rows(path):
+    """Yield (salad, portion) name pairs from one recipe file."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix not in RECIPE_FORMATS:
+        raise ValueError(f"Unsupported recipe file '{path}', expected one of {RECIPE_FORMATS}")
+
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf8") as f:
+            for row in csv.DictReader(f):
+                yield row["salad"], row["portion"]
+        return
+
+    with open(path, encoding="utf8") as f:
+        if suffix == ".json":
+            data = json.load(f)
+        else:
+            import yaml  # optional dependency, only needed for YAML recipe files
+            data = yaml.safe_load(f)
+    yield from _records(data, path)
+
+
+def load_recipes(paths):
+    """Merge recipe files into {salad: [portion, ...]}, keeping file order and dropping duplicates."""
+    recipes = {}
+    for path in paths:
+        for salad, portion in iter_recipe_rows(path):
+            salad, portion = normalize_name(str(salad)), normalize_name(str(portion))
+            if not salad or not portion:
+                continue
+            portions = recipes.setdefault(salad, [])
+            if portion not in portions:
+                portions.append(portion)
+    return recipes
+
+
+def portion_kind(index, portion):
+    """
+    "ingredient" or "dressing" for an existing portion, None if it is unknown.
+
+    The portion's rdf:type decides; other typed individuals fall back to the unit suffix
+    (ml -> dressing, g -> ingredient), as the hardcoded salad_structure did.
+    """
+    uri = index.individuals.get(portion)
+    if uri is None:
+        return None
+    kind = index.portion_kinds.get(uri)
+    if kind is None:
+        if portion.endswith("ml"):
+            kind = "dressing"
+        elif portion.endswith("g"):
+            kind = "ingredient"
+    return kind
+
+
+def resolve_portion(index, search, portion, components):
+    """
+    Local name of the existing portion a misspelled `portion` most likely means, or None.
+
+    Only the component part is matched fuzzily ("Tomatoe150g" -> Tomato); the amount and
+    unit must match an existing portion exactly, so "DijonMustard5g" never becomes
+    "DijonMustard5ml".
+    """
+    base, amount, unit = split_portion_name(normalize_name(portion))
+    if amount is None:
+        return None
+    component = search.resolve(base, types=components)
+    if component is None:
+        return None
+    for candidate in index.portions_by_base.get(normalize_name(local_name(component)), []):
+        _, candidate_amount, candidate_unit = index.portion_info[candidate]
+        if float(candidate_amount) == float(amount) and candidate_unit.lower() == unit.lower():
+            return normalize_name(local_name(candidate))
+    return None
+
+
+def validate_recipes(recipes, index, search=None, components=None):
+    """
+    Split recipes into links and problems.
+
+    Returns (links, skipped, resolved): links is [(salad_uri, property, portion_uri)] for
+    every valid portion, skipped is {salad: [missing or unknown-unit portions]}. With a
+    SearchIndex, unknown portions are first resolved fuzzily among the portions of
+    `components` (Ingredient/Dressing individuals); resolved is {written name: portion}.
+    """
+    links = []
+    skipped = {}
+    resolved = {}
+    for salad, portions in recipes.items():
+        salad_uri = SALAD[salad]
+        for portion in portions:
+            kind = portion_kind(index, portion)
+            if kind is None and search is not None:
+                match = resolve_portion(index, search, portion, components)
+                if match is not None:
+                    resolved[portion] = match
+                    portion = match
+                    kind = portion_kind(index, portion)
+            if kind is None:
+                skipped.setdefault(salad, []).append(portion)
+                continue
+            links.append((salad_uri, PORTION_PROPERTIES[kind], index.individuals[portion]))
+    return links, skipped, resolved
+
+
+def add_recipes(g, recipes, index, dry_run=False, search=None):
+    """
+    Validate `recipes` and add every link in one batched update.
+    Returns (links added, skipped, fuzzily resolved names).
+    """
+    components = subclass_closure(g, COMPONENT_CLASSES) if search is not None else None
+    links, skipped, resolved = validate_recipes(recipes, index, search, components)
+    if not dry_run:
+        add_batched(g, links)
+    return len(links), skipped, resolved
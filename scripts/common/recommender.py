@@ -0,0 +1,149 @@
+"""Salad recommendations from precomputed nutrient vectors, purpose memberships and allergen masks.
+
+Everything that depends on the graph is computed once in SaladRecommender.from_graph;
+a request is then a handful of NumPy comparisons over at most one row per salad.
+Nutrient amounts use the same units as the SaladSubstance totals: mg, and cal for FoodEnergy.
+"""
+import numpy as np
+from rdflib.namespace import RDF
+
+from common.ontology import SALAD, local_name
+from common.salad_index import get_salad_index
+
+# Nutrients making up each salad's vector, in column order
+NUTRIENTS = [
+    "Calcium", "Carbohydrate", "Cholesterol", "Fat", "FoodEnergy",
+    "Iron", "Lutein", "Omega-3", "Potassium", "Protein", "Sodium",
+    "VitaminA", "VitaminB9", "VitaminC", "Zeaxanthin", "Zinc",
+]
+NUTRIENT_COLUMNS = {name: i for i, name in enumerate(NUTRIENTS)}
+
+# Purpose conditions, mirroring the <Purpose>Salad SWRL rules (amounts converted to mg / cal).
+# WeightLoss has no rule in the ontology, so it combines LowFoodEnergySalad and LowFatSalad.
+PURPOSE_RULES = {
+    "WeightLoss": [("FoodEnergy", "<", 400), ("Fat", "<", 16000)],
+    "MuscleBuilding": [("Protein", ">", 26000), ("Iron", ">", 4), ("Zinc", ">", 5), ("Potassium", ">", 1133)],
+    "EyeCare": [("Lutein", ">", 3), ("Zeaxanthin", ">", 0.6), ("VitaminA", ">", 1)],
+    "GoodSkin": [("VitaminC", ">", 33), ("VitaminA", ">", 1), ("Omega-3", ">", 1000)],
+    "EnergyBoost": [("FoodEnergy", ">", 600), ("Carbohydrate", ">", 100000), ("VitaminB9", ">", 0.2)],
+    "DigestiveHealth": [("Carbohydrate", ">", 40000), ("Fat", "<", 16000), ("VitaminC", ">", 33)],
+}
+PURPOSES = list(PURPOSE_RULES)
+
+
+class SaladRecommender:
+    """Answer "which salads should this person eat, best first" without touching the graph."""
+
+    def __init__(self, salad_names, nutrients, purpose_members, allergen_mask, allergen_columns, known_allergens=None):
+        self.salad_names = list(salad_names)
+        self.nutrients = nutrients                # (salads, NUTRIENTS) float
+        self.purpose_members = purpose_members    # (salads, PURPOSES) bool
+        self.allergen_mask = allergen_mask        # (salads, allergens) bool
+        self.allergen_columns = allergen_columns  # allergen or component local name -> column
+        # Every name an allergy may use, including allergens and components in no salad
+        self.known_allergens = set(allergen_columns) | set(known_allergens or ())
+
+        # Per-purpose margin scores: how far past its thresholds each salad is
+        self.purpose_scores = np.zeros(purpose_members.shape)
+        for j, purpose in enumerate(PURPOSES):
+            margins = []
+            for nutrient, op, threshold in PURPOSE_RULES[purpose]:
+                values = nutrients[:, NUTRIENT_COLUMNS[nutrient]]
+                if op == ">":
+                    margins.append(values / threshold)
+                else:
+                    margins.append(threshold / np.maximum(values, 1e-9))
+            self.purpose_scores[:, j] = np.mean(margins, axis=0)
+
+    @classmethod
+    def from_graph(cls, g):
+        """Precompute all per-salad vectors from the salad index of `g`."""
+        index = get_salad_index(g)
+        salads = index.salads
+        positions = {salad: i for i, salad in enumerate(salads)}
+
+        nutrients = np.zeros((len(salads), len(NUTRIENTS)))
+        for i, salad in enumerate(salads):
+            for (name, _), total in index.nutrient_totals(salad, NUTRIENT_COLUMNS).items():
+                nutrients[i, NUTRIENT_COLUMNS[name]] += float(total)
+
+        purpose_members = np.ones((len(salads), len(PURPOSES)), dtype=bool)
+        for j, purpose in enumerate(PURPOSES):
+            for nutrient, op, threshold in PURPOSE_RULES[purpose]:
+                values = nutrients[:, NUTRIENT_COLUMNS[nutrient]]
+                purpose_members[:, j] &= values > threshold if op == ">" else values < threshold
+            # Salads asserted (or inferred by a reasoner) as <Purpose>Salad also count
+            for salad in g.subjects(RDF.type, SALAD[f"{purpose}Salad"]):
+                if salad in positions:
+                    purpose_members[positions[salad], j] = True
+
+        salad_allergens = [{local_name(a) for a in index.salad_allergens(s)} for s in salads]
+        allergen_columns = {name: i for i, name in enumerate(sorted(set().union(*salad_allergens)))}
+        allergen_mask = np.zeros((len(salads), len(allergen_columns)), dtype=bool)
+        for i, names in enumerate(salad_allergens):
+            for name in names:
+                allergen_mask[i, allergen_columns[name]] = True
+
+        known_allergens = {local_name(c) for c in index.component_kinds}
+        known_allergens.update(local_name(a) for a in g.subjects(RDF.type, SALAD.Allergen))
+        for allergens in index.component_allergens.values():
+            known_allergens.update(local_name(a) for a in allergens)
+
+        return cls([local_name(s) for s in salads], nutrients, purpose_members, allergen_mask, allergen_columns,
+                   known_allergens)
+
+    def recommend(self, allergies=(), purpose=None, bounds=None, rank_by=None, ascending=False, limit=None):
+        """
+        Return [(salad name, score)] best first.
+
+        allergies: allergen or ingredient/dressing local names to avoid (e.g. "Lactose", "Mozzarella");
+            a name the ontology does not know raises ValueError rather than filtering nothing.
+        purpose: one of PURPOSES; only member salads are kept and they are ranked by threshold margin.
+        bounds: {nutrient: (min, max)} with None for an open side.
+        rank_by: nutrient to rank by instead of the purpose margin.
+        """
+        keep = np.ones(len(self.salad_names), dtype=bool)
+
+        unknown = sorted(set(allergies) - self.known_allergens)
+        if unknown:
+            raise ValueError(f"Unknown allergies {unknown}, expected allergens or ingredient/dressing names "
+                             f"from {sorted(self.known_allergens)}")
+        columns = [self.allergen_columns[a] for a in allergies if a in self.allergen_columns]
+        if columns:
+            keep &= ~self.allergen_mask[:, columns].any(axis=1)
+
+        scores = np.zeros(len(self.salad_names))
+        if purpose is not None:
+            if purpose not in PURPOSE_RULES:
+                raise ValueError(f"Unknown purpose '{purpose}', expected one of {PURPOSES}")
+            column = PURPOSES.index(purpose)
+            keep &= self.purpose_members[:, column]
+            scores = self.purpose_scores[:, column]
+
+        for nutrient, (low, high) in (bounds or {}).items():
+            if nutrient not in NUTRIENT_COLUMNS:
+                raise ValueError(f"Unknown nutrient '{nutrient}', expected one of {NUTRIENTS}")
+            values = self.nutrients[:, NUTRIENT_COLUMNS[nutrient]]
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+
+        if rank_by is not None:
+            if rank_by not in NUTRIENT_COLUMNS:
+                raise ValueError(f"Unknown nutrient '{rank_by}', expected one of {NUTRIENTS}")
+            scores = self.nutrients[:, NUTRIENT_COLUMNS[rank_by]]
+
+        candidates = np.flatnonzero(keep)
+        order = candidates[np.argsort(scores[candidates] if ascending else -scores[candidates], kind="stable")]
+        if limit is not None:
+            order = order[:limit]
+        return [(self.salad_names[i], float(scores[i])) for i in order]
+
+
+def person_profile(g, person_name):
+    """Read a Person's hasAllergicTo and hasSpecificPurpose local names from the graph."""
+    person = SALAD[person_name]
+    allergies = sorted(local_name(o) for o in g.objects(person, SALAD.hasAllergicTo))
+    purposes = sorted(local_name(o) for o in g.objects(person, SALAD.hasSpecificPurpose))
+    return allergies, purposes
@@ -0,0 +1,191 @@
+"""Precomputed adjacency index for the salad -> portion -> component -> substance chain.
+
+rdflib's SPARQL evaluator is slow on the alternative property paths and
+STRAFTER/STRENDS filters used by the nutrition, similar-substance and allergen
+queries. This module walks each predicate of the fixed 4-hop chain once and keeps
+plain dicts, so those features become dictionary lookups instead of SPARQL.
+
+Amounts are kept as Decimal, parsed from the literals' lexical forms, so nutrient totals
+are exact like the SPARQL SUM over xsd:decimal was ("947.56", not "947.5600000000001").
+"""
+import weakref
+from collections import defaultdict
+from decimal import Decimal
+
+from rdflib.namespace import RDF, RDFS
+
+from common.ontology import SALAD, graph_version, local_name
+
+# Cache of built indexes, keyed by graph and invalidated by any change to it (graph_version)
+_INDEX_CACHE = weakref.WeakKeyDictionary()
+
+
+def _adjacency(g, predicate):
+    """Map every subject of `predicate` to the list of its objects."""
+    adjacency = defaultdict(list)
+    for s, o in g.subject_objects(predicate):
+        adjacency[s].append(o)
+    return adjacency
+
+
+def _to_decimal(value):
+    try:
+        return Decimal(str(value))
+    except ArithmeticError:
+        return None
+
+
+def portion_scale(portion, amount, unit):
+    """Scaling factor for per-100g/ml substance amounts, same rules as the old calc_query."""
+    unit = str(unit).lower()
+    portion = str(portion)
+    if unit == "grams" or (portion.endswith("IngredientPortion") and unit == "g"):
+        return amount / 100
+    if unit == "millilitres" or (portion.endswith("DressingPortion") and unit == "ml"):
+        return amount / 100
+    return Decimal(1)
+
+
+class SaladIndex:
+    """Dict-based view of salads, their portions, components, substances and allergens."""
+
+    def __init__(self, g):
+        self.version = graph_version(g)
+        self.salads = sorted(set(g.subjects(RDF.type, SALAD.Salad)))
+
+        # Hop 1: salad -> portions, tagged with the kind of component they point to
+        self.salad_portions = defaultdict(list)
+        for salad, portion in g.subject_objects(SALAD.hasIngredientPortion):
+            self.salad_portions[salad].append((portion, "ingredient"))
+        for salad, portion in g.subject_objects(SALAD.hasDressingPortion):
+            self.salad_portions[salad].append((portion, "dressing"))
+
+        # Hop 2: portion -> amount, unit and component
+        amounts = _adjacency(g, SALAD.hasAmount)
+        units = _adjacency(g, SALAD.hasUnit)
+        components = _adjacency(g, SALAD.hasIngredient)
+        for portion, dressings in _adjacency(g, SALAD.hasDressing).items():
+            components[portion].extend(dressings)
+
+        self.portion_components = {}
+        self.portion_scales = {}
+        for portions in self.salad_portions.values():
+            for portion, _ in portions:
+                if portion in self.portion_components:
+                    continue
+                self.portion_components[portion] = components.get(portion, [])
+                portion_amounts = [a for a in map(_to_decimal, amounts.get(portion, [])) if a is not None]
+                self.portion_scales[portion] = [
+                    portion_scale(portion, amount, unit)
+                    for amount in portion_amounts
+                    for unit in units.get(portion, [])
+                ]
+
+        # Hops 3 and 4: component -> substance portions -> (substance, amount, unit)
+        substances = _adjacency(g, SALAD.hasSubstance)
+        self.component_substances = defaultdict(list)
+        for component, substance_portion in g.subject_objects(SALAD.hasSubstancePortion):
+            for substance in substances.get(substance_portion, []):
+                for amount in amounts.get(substance_portion, []):
+                    amount = _to_decimal(amount)
+                    if amount is None:
+                        continue
+                    for unit in units.get(substance_portion, []):
+                        self.component_substances[component].append((local_name(substance), amount, str(unit)))
+
+        # Every Ingredient / Dressing individual, found through the rdfs:subClassOf closure
+        subclasses = defaultdict(list)
+        for sub, sup in g.subject_objects(RDFS.subClassOf):
+            subclasses[sup].append(sub)
+        self.component_kinds = {}
+        for root, kind in ((SALAD.Ingredient, "ingredient"), (SALAD.Dressing, "dressing")):
+            stack, seen = [root], set()
+            while stack:
+                cls = stack.pop()
+                if cls in seen:
+                    continue
+                seen.add(cls)
+                stack.extend(subclasses.get(cls, []))
+                for individual in g.subjects(RDF.type, cls):
+                    self.component_kinds.setdefault(individual, kind)
+
+        self.component_allergens = defaultdict(set)
+        for component, allergen in g.subject_objects(SALAD.containAllergen):
+            self.component_allergens[component].add(allergen)
+
+    @classmethod
+    def for_graph(cls, g):
+        """Return the cached index for `g`, rebuilding it if the graph has changed."""
+        index = _INDEX_CACHE.get(g)
+        if index is None or index.version != graph_version(g):
+            index = cls(g)
+            _INDEX_CACHE[g] = index
+        return index
+
+    def salad_components(self, salad, kind=None):
+        """Components reached from `salad`, optionally only "ingredient" or "dressing"."""
+        seen = {}
+        for portion, portion_kind in self.salad_portions.get(salad, []):
+            if kind is not None and portion_kind != kind:
+                continue
+            for component in self.portion_components.get(portion, []):
+                seen[component] = None
+        return list(seen)
+
+    def substance_names(self, component):
+        """Sorted, de-duplicated substance names of a component."""
+        return sorted({name for name, _, _ in self.component_substances.get(component, [])})
+
+    def nutrient_totals(self, salad, substance_names=None):
+        """Exact (Decimal) sums of scaled substance amounts for a salad, grouped by (substance name, unit)."""
+        totals = defaultdict(Decimal)
+        for portion, _ in self.salad_portions.get(salad, []):
+            scales = self.portion_scales.get(portion, [])
+            for component in self.portion_components.get(portion, []):
+                for name, amount, unit in self.component_substances.get(component, []):
+                    if substance_names is not None and name not in substance_names:
+                        continue
+                    for scale in scales:
+                        totals[(name, unit)] += amount * scale
+        return dict(totals)
+
+    def salad_allergens(self, salad):
+        """Allergens and components a person could be allergic to in this salad."""
+        allergens = set()
+        for component in self.salad_components(salad):
+            allergens.add(component)
+            allergens.update(self.component_allergens.get(component, ()))
+        return allergens
+
+
+def get_salad_index(g):
+    """Shortcut for SaladIndex.for_graph."""
+    return SaladIndex.for_graph(g)
+
+
+def similar_substance_pairs(index, kind):
+    """
+    Yield (componentX, substancesX, componentY, substancesY) for components of the given
+    kind used in any salad, with the same answers as the original SPARQL query.
+
+    That query joined each component's sorted substances with "," (GROUP_CONCAT), kept
+    what follows the first "," (STRAFTER) and paired X with Y when Y's string contains
+    X's (CONTAINS). So the alphabetically first substance is ignored, the rest is compared
+    as text rather than as a set, and a component with a single substance pairs with
+    every other component.
+    """
+    components = {}
+    for salad in index.salads:
+        for component in index.salad_components(salad, kind):
+            components[component] = None
+
+    # Components without any substance portion never matched the SPARQL join either
+    substances = {}
+    for component in components:
+        names = index.substance_names(component)
+        if names:
+            substances[component] = ",".join(names).partition(",")[2]
+    for x, substances_x in substances.items():
+        for y, substances_y in substances.items():
+            if x != y and substances_x in substances_y:
+                yield local_name(x), substances_x, local_name(y), substances_y
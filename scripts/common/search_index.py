@@ -0,0 +1,238 @@
+"""Trigram fuzzy search over rdfs:label values and local names.
+
+Every named resource of the ontology (individuals, classes, properties) is indexed under
+its local name and labels. Each name becomes a few normalized keys: the whole name
+without spaces ("greeksalad"), plus each word of it ("greek", "salad"), with camelCase
+local names split into words. An inverted index maps each character trigram to the keys
+containing it. A query is normalized the same way and scored against the keys that
+share a trigram with it (Jaccard similarity of the trigram sets, words slightly
+down-weighted). So "mozarella" finds Mozzarella and "vinaigrette" finds
+BalsamicVinaigrette without touching the graph.
+
+The index is cached per graph like NameIndex, and can be saved next to the ontology
+file and reloaded while the file's sha1 is unchanged.
+
+resolve() (automatic resolution during ingestion) only accepts typo-sized matches on
+whole names, so "Sugar" never becomes PowderedSugar through the word key "sugar".
+"""
+import json
+import re
+import unicodedata
+import weakref
+from collections import defaultdict
+from pathlib import Path
+
+from rdflib import URIRef
+from rdflib.namespace import RDF, RDFS
+
+from common.ontology import DEFAULT_NS, file_digest, graph_version, local_name
+
+# Cache of built indexes, keyed by graph and invalidated by any change to it (graph_version)
+_INDEX_CACHE = weakref.WeakKeyDictionary()
+
+INDEX_VERSION = 2
+MIN_SCORE = 0.35    # candidates below this similarity are dropped
+WORD_WEIGHT = 0.9   # a single-word hit ranks below an equally good whole-name hit
+MIN_WORD_LENGTH = 3
+
+# Automatic resolution of misspelled names (ingestion) is stricter than interactive search
+RESOLVE_MIN_SCORE = 0.5
+RESOLVE_MARGIN = 0.05  # the best match must beat the runner-up by this much
+RESOLVE_MAX_LENGTH_CHANGE = 2  # a resolved name has as many words and at most this many more/fewer letters
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|(?<=[A-Za-z])(?=[0-9])")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_text(text):
+    """Lower-case ASCII words: accents, zero-width / non-breaking spaces and punctuation removed."""
+    text = _CAMEL.sub(" ", str(text).replace("\u200b", "").replace("\xa0", " "))
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_WORD.sub(" ", text).split()
+
+
+def trigrams(key):
+    """Character trigrams of `key`, padded so short words and word starts still count."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def name_keys(text):
+    """[(key, weight, whole name?)] indexed for one name: the whole name, then its words."""
+    words = normalize_text(text)
+    if not words:
+        return []
+    keys = [("".join(words), 1.0, True)]
+    if len(words) > 1:
+        keys.extend((word, WORD_WEIGHT, False) for word in dict.fromkeys(words) if len(word) >= MIN_WORD_LENGTH)
+    return keys
+
+
+class SearchIndex:
+    """Inverted trigram index over local names and labels of the named resources of a graph."""
+
+    def __init__(self, entries, version=None):
+        # entries: [(uri, name, kind, [type uris])]; kind is "local" or "label"
+        self.version = version
+        self.entries = entries
+        self.keys = []                  # [(entry id, key, weight, trigram count, whole name?)]
+        self.exact = defaultdict(list)  # key -> key ids
+        self.postings = defaultdict(list)
+        for entry_id, (_, name, _, _) in enumerate(entries):
+            for key, weight, whole in name_keys(name):
+                key_id = len(self.keys)
+                grams = trigrams(key)
+                self.keys.append((entry_id, key, weight, len(grams), whole))
+                self.exact[key].append(key_id)
+                for gram in grams:
+                    self.postings[gram].append(key_id)
+
+    @classmethod
+    def from_graph(cls, g, namespace=DEFAULT_NS):
+        """Index every URI subject in `namespace` under its local name and rdfs:label values."""
+        types = defaultdict(list)
+        for s, t in g.subject_objects(RDF.type):
+            if isinstance(s, URIRef) and str(s).startswith(namespace):
+                types[s].append(str(t))
+        labels = defaultdict(list)
+        for s, label in g.subject_objects(RDFS.label):
+            if isinstance(s, URIRef) and str(s).startswith(namespace):
+                labels[s].append(str(label))
+
+        entries = []
+        for uri in sorted(set(types) | set(labels)):
+            entries.append((str(uri), local_name(uri), "local", types.get(uri, [])))
+            for label in labels.get(uri, []):
+                entries.append((str(uri), label, "label", types.get(uri, [])))
+        return cls(entries, version=graph_version(g))
+
+    @classmethod
+    def for_graph(cls, g):
+        """Return the cached index for `g`, rebuilding it if the graph has changed."""
+        index = _INDEX_CACHE.get(g)
+        if index is None or index.version != graph_version(g):
+            index = cls.from_graph(g)
+            _INDEX_CACHE[g] = index
+        return index
+
+    def search(self, query, limit=10, types=None, min_score=MIN_SCORE, whole_names=False):
+        """
+        Ranked [(uri, score, matched name)] for `query`, best first, one hit per URI.
+        `types` (URIs or strings) keeps only resources with one of those rdf:types;
+        `whole_names` ignores the single-word keys.
+        """
+        words = normalize_text(query)
+        if not words:
+            return []
+        key = "".join(words)
+        allowed = {str(t) for t in types} if types is not None else None
+
+        # Exact key hits answer most queries without scoring; fall back to trigrams when
+        # none of them passes the type filter
+        exact = {key_id: self.keys[key_id][2] for key_id in self.exact.get(key, ())}
+        ranked = self._rank(exact, allowed, min_score, whole_names)
+        if not ranked:
+            grams = trigrams(key)
+            common = defaultdict(int)
+            for gram in grams:
+                for key_id in self.postings.get(gram, ()):
+                    common[key_id] += 1
+            scores = {}
+            for key_id, shared in common.items():
+                _, _, weight, size, _ = self.keys[key_id]
+                scores[key_id] = weight * shared / (len(grams) + size - shared)
+            ranked = self._rank(scores, allowed, min_score, whole_names)
+        return [(URIRef(uri), score, name) for uri, (score, name) in ranked[:limit]]
+
+    def _rank(self, scores, allowed, min_score, whole_names=False):
+        """[(uri, (score, name))] from key scores, best first, filtered by score, type and key kind."""
+        best = {}
+        for key_id, score in scores.items():
+            if score < min_score or (whole_names and not self.keys[key_id][4]):
+                continue
+            uri, name, _, entry_types = self.entries[self.keys[key_id][0]]
+            if allowed is not None and allowed.isdisjoint(entry_types):
+                continue
+            if uri not in best or score > best[uri][0]:
+                best[uri] = (score, name)
+        return sorted(best.items(), key=lambda item: (-item[1][0], item[0]))
+
+    def best(self, query, types=None, min_score=MIN_SCORE):
+        """The single best (uri, score, name) for `query`, or None."""
+        matches = self.search(query, limit=1, types=types, min_score=min_score)
+        return matches[0] if matches else None
+
+    def resolve(self, name, types=None, min_score=RESOLVE_MIN_SCORE, margin=RESOLVE_MARGIN):
+        """
+        URI that `name` most likely means, or None if no match is good enough or clear enough.
+        Only whole names that look like a typo of `name` count: the same number of words and
+        at most RESOLVE_MAX_LENGTH_CHANGE letters more or fewer ("Tomatoe" -> Tomato, but not
+        "Sugar" -> PowderedSugar or "Potatoes" -> RedPotato).
+        """
+        words = normalize_text(name)
+        matches = [
+            match for match in self.search(name, limit=None, types=types, min_score=min_score, whole_names=True)
+            if _typo_sized(words, normalize_text(match[2]))
+        ]
+        if not matches:
+            return None
+        if len(matches) > 1 and matches[0][1] - matches[1][1] < margin:
+            return None
+        return matches[0][0]
+
+    # === Persistence ===
+
+    def save(self, path, source=None):
+        """Write the index; `source` is the sha1 of the ontology file it was built from."""
+        with open(path, "w", encoding="utf8") as f:
+            json.dump({"version": INDEX_VERSION, "source": source, "entries": self.entries}, f)
+
+    @classmethod
+    def load(cls, path, source=None):
+        """Load a saved index; returns None if it is missing or was built from another `source` file."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with open(path, encoding="utf8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION or data.get("source") != source:
+            return None
+        return cls([tuple(entry) for entry in data["entries"]])
+
+
+def _typo_sized(query_words, name_words):
+    """Same word count and a length difference of at most RESOLVE_MAX_LENGTH_CHANGE letters."""
+    length_change = abs(len("".join(query_words)) - len("".join(name_words)))
+    return len(query_words) == len(name_words) and length_change <= RESOLVE_MAX_LENGTH_CHANGE
+
+
+def subclass_closure(g, classes):
+    """`classes` and all their subclasses, as the `types` filter for search() / resolve()."""
+    return {sub for cls in classes for sub in g.transitive_subjects(RDFS.subClassOf, cls)}
+
+
+def index_path(ontology_file):
+    """Where the search index of an ontology file is kept: next to it, as <name>.search.json."""
+    path = Path(ontology_file)
+    return path.with_name(path.stem + ".search.json")
+
+
+def get_search_index(g, ontology_file=None):
+    """
+    Cached index for `g`. With `ontology_file` (the file `g` was just parsed from), a saved
+    index next to it is reused when it was built from the same file content (sha1), and
+    written when it was not.
+    """
+    index = _INDEX_CACHE.get(g)
+    if index is not None and index.version == graph_version(g):
+        return index
+    if ontology_file is not None:
+        source = file_digest(ontology_file)
+        index = SearchIndex.load(index_path(ontology_file), source)
+        if index is None:
+            index = SearchIndex.from_graph(g)
+            index.save(index_path(ontology_file), source)
+        index.version = graph_version(g)
+        _INDEX_CACHE[g] = index
+        return index
+    return SearchIndex.for_graph(g)
@@ -0,0 +1,60 @@
+"""Streaming spreadsheet ingestion: openpyxl read-only rows or a CSV fast path, batched into the graph.
+
+Rows are read lazily (openpyxl read_only mode never builds the full cell tree) and the
+triples they produce go into the graph through Graph.addN in fixed-size batches, so large
+workbooks load in bounded memory.
+"""
+import csv
+from itertools import islice
+
+import openpyxl
+
+BATCH_SIZE = 10000
+
+
+def iter_sheet_rows(path, sheet=None, min_row=1):
+    """
+    Yield each row of a sheet as a tuple of cell values, starting at `min_row` (1-based).
+
+    `sheet` may be a sheet name, a 0-based sheet index or None for the first sheet;
+    it is ignored for .csv files, which hold a single sheet.
+    """
+    if str(path).lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf8") as f:
+            yield from (tuple(row) for row in islice(csv.reader(f), min_row - 1, None))
+        return
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        if sheet is None:
+            ws = wb.worksheets[0]
+        elif isinstance(sheet, int):
+            ws = wb.worksheets[sheet]
+        else:
+            ws = wb[sheet]
+        yield from ws.iter_rows(min_row=min_row, values_only=True)
+    finally:
+        wb.close()
+
+
+def iter_sheet_records(path, sheet=None):
+    """Yield each data row as a dict keyed by the header row."""
+    rows = iter_sheet_rows(path, sheet)
+    header = next(rows, None)
+    if header is None:
+        return
+    header = [str(name).strip() if name is not None else "" for name in header]
+    for row in rows:
+        yield dict(zip(header, row))
+
+
+def add_batched(g, triples, batch_size=BATCH_SIZE):
+    """Add an iterable of triples to `g` with Graph.addN, `batch_size` at a time; return the count."""
+    count = 0
+    triples = iter(triples)
+    while True:
+        batch = [(s, p, o, g) for s, p, o in islice(triples, batch_size)]
+        if not batch:
+            return count
+        g.addN(batch)
+        count += len(batch)
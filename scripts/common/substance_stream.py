@@ -0,0 +1,182 @@
+"""Streaming parser for the substance portion dump (data/substance_portion.txt) straight to RDF.
+
+The file is a sequence of blocks:
+
+    BaconCalcium
+        Amount: 10
+        Unit: mg/100g
+
+Lines are read one at a time and every complete block is turned into its SubstancePortion
+triples immediately, so memory stays flat however large the dump is. Amounts are
+normalized on the way: g and μg per 100 g become mg/100g, and VitaminA in IU/100g becomes
+mg/100g (1 IU = 0.0003 mg, as in convert_unit.py). cal/100g is kept.
+"""
+import csv
+from decimal import Decimal, InvalidOperation
+
+from rdflib import Literal
+from rdflib.namespace import OWL, RDF, XSD
+
+from common.name_index import SUBSTANCE_NAMES, SuffixMatcher, normalize_name
+from common.ontology import SALAD, local_name
+
+SUBSTANCE_FILE = "data/substance_portion.txt"
+
+TARGET_UNIT = "mg/100g"
+
+# Multiply the amount by this factor to get mg/100g (keys are lower-cased units)
+UNIT_FACTORS = {
+    "mg/100g": Decimal("1"),
+    "g/100g": Decimal("1000"),
+    "μg/100g": Decimal("0.001"),   # Greek mu
+    "µg/100g": Decimal("0.001"),   # micro sign
+    "ug/100g": Decimal("0.001"),
+    "mcg/100g": Decimal("0.001"),
+}
+
+# IU is substance specific, only VitaminA is reported in IU
+IU_FACTORS = {
+    "VitaminA": Decimal("0.0003"),
+}
+
+CSV_COLUMNS = ["Individual", "Class", "Amount", "Unit"]
+
+# A SubstancePortion has one of each; a second value would be summed into the salad totals
+SINGLE_VALUED = (SALAD.hasSubstance, SALAD.hasAmount, SALAD.hasUnit)
+
+
+def iter_substance_blocks(path=SUBSTANCE_FILE):
+    """Yield (individual, amount, unit) strings for every complete block, reading line by line."""
+    individual = amount = None
+    with open(path, encoding="utf8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("Amount:"):
+                amount = line[len("Amount:"):].strip()
+            elif line.startswith("Unit:"):
+                unit = line[len("Unit:"):].strip()
+                # Once we have both amount and unit, emit the block
+                if individual and amount:
+                    yield individual, amount, unit
+                amount = None
+            else:
+                individual = normalize_name(line)
+                amount = None
+
+
+def normalize_amount(amount, unit, substance=None):
+    """
+    Convert `amount` (str or number) in `unit` to mg/100g where possible.
+
+    Returns (Decimal amount, unit); units with no known conversion (cal/100g, or IU for
+    substances other than VitaminA) are returned unchanged.
+    """
+    amount = Decimal(str(amount))
+    key = unit.strip().lower()
+    if key in UNIT_FACTORS:
+        return amount * UNIT_FACTORS[key], TARGET_UNIT
+    if key == "iu/100g" and substance in IU_FACTORS:
+        return amount * IU_FACTORS[substance], TARGET_UNIT
+    return amount, unit.strip()
+
+
+def amount_literal(amount):
+    """
+    xsd:decimal literal with the lexical form already used in the ontology ("146.0", "0.0039").
+
+    Equal decimals with different lexical forms ("146" vs "146.0") are different RDF terms,
+    so matching the existing form keeps reloads from duplicating hasAmount values.
+    """
+    text = repr(float(amount))
+    if "e" in text:
+        text = f"{Decimal(text):f}"
+    return Literal(text, datatype=XSD.decimal)
+
+
+def substance_portion_triples(blocks, stats=None, csv_writer=None, substance_names=SUBSTANCE_NAMES):
+    """
+    Turn (individual, amount, unit) blocks into SubstancePortion triples.
+
+    stats (dict) gets "portions" and "skipped" counts; csv_writer, if given, receives one
+    normalized row per portion in CSV_COLUMNS order.
+    """
+    stats = {} if stats is None else stats
+    stats.setdefault("portions", 0)
+    stats.setdefault("skipped", [])
+    matcher = SuffixMatcher(substance_names)
+
+    for individual, amount, unit in blocks:
+        substance = matcher.match(individual)
+        try:
+            amount, unit = normalize_amount(amount, unit, substance)
+        except InvalidOperation:
+            substance = None
+        if substance is None:
+            stats["skipped"].append(individual)
+            continue
+
+        portion = SALAD[individual]
+        yield (portion, RDF.type, OWL.NamedIndividual)
+        yield (portion, RDF.type, SALAD.SubstancePortion)
+        yield (portion, SALAD.hasSubstance, SALAD[substance])
+        literal = amount_literal(amount)
+        yield (portion, SALAD.hasAmount, literal)
+        yield (portion, SALAD.hasUnit, Literal(unit))
+        stats["portions"] += 1
+
+        if csv_writer is not None:
+            csv_writer.writerow([individual, "SubstancePortion", str(literal), unit])
+
+
+def _same_value(a, b):
+    """Equal terms, or literals with equal values ("146" and "146.0" as xsd:decimal)."""
+    if a == b:
+        return True
+    try:
+        return isinstance(a, Literal) and isinstance(b, Literal) and a.eq(b)
+    except TypeError:
+        return False
+
+
+def replace_existing_values(g, triples, conflicts=None, predicates=SINGLE_VALUED):
+    """
+    Keep the single-valued `predicates` single-valued while (re)loading the dump.
+
+    A value `g` already has is skipped, so re-running is a no-op; a different value
+    replaces the old one(s), so a corrected amount in the dump reaches the ontology. A
+    second, different value for the same subject later in the stream is dropped (the
+    first wins). Both cases are appended to `conflicts` as
+    (subject, predicate, [old values], new value, "replaced" | "ignored").
+    """
+    conflicts = [] if conflicts is None else conflicts
+    seen = {}
+    for s, p, o in triples:
+        if p in predicates:
+            if (s, p) in seen:
+                if not _same_value(seen[(s, p)], o):
+                    conflicts.append((s, p, [seen[(s, p)]], o, "ignored"))
+                continue
+            seen[(s, p)] = o
+            old = list(g.objects(s, p))
+            if len(old) == 1 and _same_value(old[0], o):
+                continue
+            if old:
+                g.remove((s, p, None))
+                conflicts.append((s, p, old, o, "replaced"))
+        yield s, p, o
+
+
+def describe_conflict(conflict):
+    """One line for a replace_existing_values conflict: "TomatoVitaminA hasAmount: 0.833 -> 0.9 (replaced)"."""
+    s, p, old, new, action = conflict
+    return f"{local_name(s)} {local_name(p)}: {', '.join(str(v) for v in old)} -> {new} ({action})"
+
+
+def open_csv_writer(path):
+    """Open `path` for a streamed CSV copy of the parsed portions; return (file, writer)."""
+    f = open(path, "w", newline="", encoding="utf8")
+    writer = csv.writer(f)
+    writer.writerow(CSV_COLUMNS)
+    return f, writer
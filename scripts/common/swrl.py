@@ -0,0 +1,195 @@
+"""Read SWRL rules (swrl:Imp) straight from an rdflib graph.
+
+Rules are stored as RDF: each swrl:Imp has a swrl:body and swrl:head AtomList whose
+items are ClassAtom, IndividualPropertyAtom, DatavaluedPropertyAtom or BuiltinAtom
+nodes. This module renders them as the human-readable atom strings owlready2 prints
+("Salad(?s)", "hasNutrient(?s, ?n)", "greaterThan(?a, 500)"), so the Excel Rules sheet
+no longer needs a second parse of the ontology with owlready2, and builds them back from
+those strings (add_rule) when an ontology is reconstructed from Excel.
+"""
+from decimal import Decimal
+
+from rdflib import BNode, Graph, Literal, Namespace, RDF, RDFS, URIRef
+from rdflib.collection import Collection
+from rdflib.namespace import OWL
+
+from common.ontology import local_name
+
+SWRL = Namespace("http://www.w3.org/2003/11/swrl#")
+SWRLB = Namespace("http://www.w3.org/2003/11/swrlb#")
+
+# Atom type -> predicates holding its (predicate, arguments)
+ATOM_PREDICATES = {
+    SWRL.ClassAtom: (SWRL.classPredicate, [SWRL.argument1]),
+    SWRL.IndividualPropertyAtom: (SWRL.propertyPredicate, [SWRL.argument1, SWRL.argument2]),
+    SWRL.DatavaluedPropertyAtom: (SWRL.propertyPredicate, [SWRL.argument1, SWRL.argument2]),
+    SWRL.DataRangeAtom: (SWRL.dataRange, [SWRL.argument1]),
+    SWRL.SameIndividualAtom: (None, [SWRL.argument1, SWRL.argument2]),
+    SWRL.DifferentIndividualsAtom: (None, [SWRL.argument1, SWRL.argument2]),
+}
+NAMED_ATOMS = {
+    SWRL.SameIndividualAtom: "SameAs",
+    SWRL.DifferentIndividualsAtom: "DifferentFrom",
+}
+
+
+def format_argument(g, term, prefix=None):
+    """
+    Render one atom argument: "?x" for swrl:Variable, the literal value for data, and
+    "<prefix>.<name>" for individuals (owlready2 writes "salad_ontology.DigestiveHealth").
+    """
+    if isinstance(term, Literal):
+        value = term.toPython()
+        if isinstance(value, bool) or isinstance(value, int):
+            return str(value)
+        if isinstance(value, (float, Decimal)):
+            return repr(float(value))
+        return f'"{term}"'
+    if (term, RDF.type, SWRL.Variable) in g:
+        return "?" + local_name(term)
+    return f"{prefix}.{local_name(term)}" if prefix else local_name(term)
+
+
+def format_atom(g, atom, prefix=None):
+    """Render one atom node as "predicate(arg1, arg2, ...)"."""
+    atom_type = next((t for t in g.objects(atom, RDF.type) if t in ATOM_PREDICATES or t == SWRL.BuiltinAtom), None)
+    if atom_type == SWRL.BuiltinAtom:
+        name = local_name(g.value(atom, SWRL.builtin))
+        arguments = list(Collection(g, g.value(atom, SWRL.arguments)))
+    else:
+        predicate, argument_predicates = ATOM_PREDICATES.get(atom_type, (None, []))
+        name = local_name(g.value(atom, predicate)) if predicate else NAMED_ATOMS.get(atom_type, "?")
+        arguments = [g.value(atom, p) for p in argument_predicates if g.value(atom, p) is not None]
+    return f"{name}({', '.join(format_argument(g, a, prefix) for a in arguments)})"
+
+
+def rule_atoms(g, atom_list, prefix=None):
+    """Render every atom of a swrl:body / swrl:head list."""
+    if atom_list is None:
+        return []
+    return [format_atom(g, atom, prefix) for atom in Collection(g, atom_list)]
+
+
+def iter_rules(g, prefix=None):
+    """Yield (rule node, label or None, [body atoms], [head atoms]) for every swrl:Imp."""
+    for rule in g.subjects(RDF.type, SWRL.Imp):
+        label = g.value(rule, RDFS.label)
+        yield (
+            rule,
+            str(label) if label is not None else None,
+            rule_atoms(g, g.value(rule, SWRL.body), prefix),
+            rule_atoms(g, g.value(rule, SWRL.head), prefix),
+        )
+
+
+# === Building rules from text ===
+
+# swrlb built-ins recognised when turning "name(args)" atoms back into triples
+SWRLB_BUILTINS = {
+    "equal", "notEqual", "lessThan", "lessThanOrEqual", "greaterThan", "greaterThanOrEqual",
+    "add", "subtract", "multiply", "divide", "integerDivide", "mod", "pow",
+    "unaryPlus", "unaryMinus", "abs", "ceiling", "floor", "round",
+    "stringEqualIgnoreCase", "stringConcat", "substring", "stringLength", "contains",
+    "startsWith", "endsWith", "upperCase", "lowerCase", "matches",
+}
+
+
+def split_atoms(text):
+    """Split "A(?x); p(?x, ?y)" into atom strings, ignoring blanks."""
+    return [atom.strip() for atom in (text or "").split(";") if atom.strip()]
+
+
+def parse_atom(text):
+    """Parse "name(arg1, arg2)" into (name, [args]); raise ValueError if it is not an atom."""
+    name, paren, rest = text.partition("(")
+    if not paren or not rest.endswith(")") or not name.strip():
+        raise ValueError(f"Not a SWRL atom: '{text}'")
+    arguments = [a.strip() for a in rest[:-1].split(",") if a.strip()]
+    return name.strip(), arguments
+
+
+def _argument_term(g, ns, text):
+    """Turn one rendered argument back into an RDF term (variables are declared swrl:Variable)."""
+    if text.startswith("?"):
+        # Variables outside the ontology namespace are rendered with their full IRI
+        name = text[1:]
+        variable = URIRef(name) if "://" in name else ns[name]
+        g.add((variable, RDF.type, SWRL.Variable))
+        return variable
+    if text.startswith('"') and text.endswith('"'):
+        return Literal(text[1:-1])
+    try:
+        return Literal(int(text))
+    except ValueError:
+        pass
+    try:
+        return Literal(Decimal(text))
+    except ArithmeticError:
+        pass
+    # "<ontology>.<Individual>" from owlready2, or a bare name
+    return ns[text.rsplit(".", 1)[-1]]
+
+
+def _atom_triples(g, ns, text, declarations=None):
+    """
+    Add one atom node for `text` to `g` and return it. Whether a name is a declared
+    class/property is looked up in `declarations` (default `g`).
+    """
+    if declarations is None:
+        declarations = g
+    name, arguments = parse_atom(text)
+    terms = [_argument_term(g, ns, a) for a in arguments]
+    atom = BNode()
+    if name in SWRLB_BUILTINS and (ns[name], RDF.type, None) not in declarations:
+        g.add((atom, RDF.type, SWRL.BuiltinAtom))
+        g.add((atom, SWRL.builtin, SWRLB[name]))
+        head = BNode()
+        Collection(g, head, terms)
+        g.add((atom, SWRL.arguments, head))
+    elif len(terms) == 1:
+        g.add((atom, RDF.type, SWRL.ClassAtom))
+        g.add((atom, SWRL.classPredicate, ns[name]))
+        g.add((atom, SWRL.argument1, terms[0]))
+    elif len(terms) == 2:
+        is_data = (ns[name], RDF.type, OWL.DatatypeProperty) in declarations or isinstance(terms[1], Literal)
+        g.add((atom, RDF.type, SWRL.DatavaluedPropertyAtom if is_data else SWRL.IndividualPropertyAtom))
+        g.add((atom, SWRL.propertyPredicate, ns[name]))
+        g.add((atom, SWRL.argument1, terms[0]))
+        g.add((atom, SWRL.argument2, terms[1]))
+    else:
+        raise ValueError(f"Unsupported SWRL atom: '{text}'")
+    return atom
+
+
+def _atom_list(g, atoms):
+    """Store atom nodes as an RDF list whose cells are typed swrl:AtomList, as Protégé writes them."""
+    head = BNode()
+    Collection(g, head, atoms)
+    cell = head
+    while cell != RDF.nil:
+        g.add((cell, RDF.type, SWRL.AtomList))
+        cell = g.value(cell, RDF.rest)
+    return head
+
+
+def add_rule(g, ns, antecedent, consequent, label=None):
+    """
+    Add a swrl:Imp built from rendered atom strings ("A(?x); p(?x, ?y)") directly to `g`.
+
+    Returns the rule node. Raises ValueError (leaving `g` untouched) if any atom cannot be parsed.
+    """
+    # Build into an empty scratch graph (declarations are looked up in g), so a bad atom adds nothing
+    scratch = Graph()
+    body = [_atom_triples(scratch, ns, atom, g) for atom in split_atoms(antecedent)]
+    head = [_atom_triples(scratch, ns, atom, g) for atom in split_atoms(consequent)]
+    if not body or not head:
+        raise ValueError("A SWRL rule needs at least one body atom and one head atom")
+
+    rule = BNode()
+    scratch.add((rule, RDF.type, SWRL.Imp))
+    scratch.add((rule, SWRL.body, _atom_list(scratch, body)))
+    scratch.add((rule, SWRL.head, _atom_list(scratch, head)))
+    if label:
+        scratch.add((rule, RDFS.label, Literal(label)))
+    g.addN((s, p, o, g) for s, p, o in scratch)
+    return rule
@@ -0,0 +1,79 @@
+"""Streaming HTML / CSV / JSONL table writer for competency-question output.
+
+Rows are written as soon as they are produced, so memory stays flat no matter how
+many rows a query yields. limit/offset select one page of the stream.
+"""
+import csv
+import html
+import json
+from pathlib import Path
+
+FORMATS = ("html", "csv", "jsonl")
+
+
+class StreamingTableWriter:
+    """Write rows one at a time to `path`, in a format taken from `fmt` or the file suffix."""
+
+    def __init__(self, path, field_names, fmt=None, limit=None, offset=0):
+        self.path = Path(path)
+        self.field_names = list(field_names)
+        self.fmt = fmt or self.path.suffix.lstrip(".").lower()
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unsupported format '{self.fmt}', expected one of {FORMATS}")
+        self.limit = limit
+        self.offset = offset
+        self.seen = 0      # rows offered, including skipped ones
+        self.written = 0   # rows actually written
+        self._file = None
+        self._csv = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf8", newline="" if self.fmt == "csv" else None)
+        if self.fmt == "html":
+            self._file.write("<table>\n    <thead>\n        <tr>\n")
+            for name in self.field_names:
+                self._file.write(f"            <th>{html.escape(name)}</th>\n")
+            self._file.write("        </tr>\n    </thead>\n    <tbody>\n")
+        elif self.fmt == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.field_names)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.fmt == "html":
+            self._file.write("    </tbody>\n</table>")
+        self._file.close()
+        return False
+
+    @property
+    def full(self):
+        """True once `limit` rows have been written."""
+        return self.limit is not None and self.written >= self.limit
+
+    def write_row(self, row):
+        """Write one row unless it falls before `offset` or past `limit`; return True if written."""
+        self.seen += 1
+        if self.seen <= self.offset or self.full:
+            return False
+        row = ["" if value is None else str(value) for value in row]
+        if self.fmt == "html":
+            self._file.write("        <tr>\n")
+            for value in row:
+                self._file.write(f"            <td>{html.escape(value)}</td>\n")
+            self._file.write("        </tr>\n")
+        elif self.fmt == "csv":
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(dict(zip(self.field_names, row)), ensure_ascii=False) + "\n")
+        self.written += 1
+        return True
+
+    def write_rows(self, rows, on_row=None):
+        """Stream an iterable of rows, stopping early once the page is full."""
+        for row in rows:
+            if self.full:
+                break
+            if self.write_row(row) and on_row is not None:
+                on_row(row)
+        return self.written
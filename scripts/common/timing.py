@@ -0,0 +1,198 @@
+"""Structured timing spans for the phases of the ontology scripts.
+
+    with span("parse", graph=g):
+        g.parse(ONTOLOGY_FILE, format="xml")
+
+    @timed()
+    def run(g, dry_run=False): ...
+
+Every finished span records wall and CPU time, the triple count of its graph before and
+after, and peak memory, and is written as one JSON line to the sink set with configure()
+or the SALAD_TIMING environment variable (a file path, appended to, or "-" for stderr).
+Nested spans get a "/"-joined path ("pipeline/assign_substance"). Without a sink a span
+costs a few clock reads and nothing is written.
+
+Peak memory is the traced Python heap peak inside the span when tracemalloc is running
+(configure(memory=True) or SALAD_TIMING_MEMORY=1), otherwise the process's maximum RSS so far.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from rdflib import Graph
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+# === CONFIGURATION ===
+TIMING_ENV = "SALAD_TIMING"
+MEMORY_ENV = "SALAD_TIMING_MEMORY"
+
+_lock = threading.Lock()
+_local = threading.local()  # per-thread stack of open spans
+_sink = None
+_configured = False
+_listeners = []
+_hooks = []  # objects with enter(path) / exit(path), e.g. the per-phase profilers
+
+
+def configure(path=None, memory=False):
+    """
+    Send span records to `path` ("-" for stderr; None reads SALAD_TIMING) and optionally
+    start tracemalloc for per-span peak memory.
+    """
+    global _sink, _configured
+    path = path if path is not None else os.environ.get(TIMING_ENV)
+    with _lock:
+        if _sink not in (None, sys.stderr):
+            _sink.close()
+        if not path:
+            _sink = None
+        elif path == "-":
+            _sink = sys.stderr
+        else:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            _sink = open(path, "a", encoding="utf8", buffering=1)
+        _configured = True
+    if (memory or os.environ.get(MEMORY_ENV) == "1") and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def enabled():
+    """True when finished spans go anywhere (a sink or a capture())."""
+    if not _configured:
+        configure()
+    return _sink is not None or bool(_listeners)
+
+
+@contextmanager
+def capture():
+    """Collect the records of the spans finished inside the block into the yielded list."""
+    records = []
+    _listeners.append(records.append)
+    try:
+        yield records
+    finally:
+        _listeners.remove(records.append)
+
+
+def add_hook(hook):
+    """Call hook.enter(path) / hook.exit(path) around every span (profilers use this)."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+
+def _max_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # bytes on macOS, KiB elsewhere
+
+
+def _emit(record):
+    line = json.dumps(record, default=str)
+    with _lock:
+        if _sink is not None:
+            _sink.write(line + "\n")
+        for listener in _listeners:
+            listener(record)
+
+
+class Span:
+    """An open span; set() adds fields (counts, sizes) to its record."""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.child_peak = 0
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+
+@contextmanager
+def span(name, graph=None, **fields):
+    """Time the block as phase `name`; `graph` adds triple counts, `fields` extra JSON fields."""
+    if not _configured:
+        configure()
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    current = Span(name, fields)
+    parent = stack[-1] if stack else None
+    stack.append(current)
+    path = "/".join(s.name for s in stack)
+    for hook in _hooks:
+        hook.enter(path)
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        # reset_peak() discards the parent's peak so far; hand it over before resetting
+        if parent is not None:
+            parent.child_peak = max(parent.child_peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    triples_before = len(graph) if graph is not None else None
+    started = time.time()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        if tracing:
+            peak = max(tracemalloc.get_traced_memory()[1], current.child_peak)
+            if parent is not None:
+                parent.child_peak = max(parent.child_peak, peak)
+        for hook in reversed(_hooks):
+            hook.exit(path)
+        stack.pop()
+        if enabled():
+            record = {
+                "span": path,
+                "name": name,
+                "script": Path(sys.argv[0]).stem,
+                "pid": os.getpid(),
+                "start": round(started, 3),
+                "wall_s": round(wall, 6),
+                "cpu_s": round(cpu, 6),
+            }
+            if graph is not None:
+                triples_after = len(graph)
+                record.update(triples_before=triples_before, triples_after=triples_after,
+                              triples_delta=triples_after - triples_before)
+            if tracing:
+                record["peak_kb"] = peak // 1024
+            else:
+                record["max_rss_kb"] = _max_rss_kb()
+            if error:
+                record["error"] = error
+            record.update(current.fields)
+            _emit(record)
+
+
+def timed(name=None):
+    """Decorator: run the function inside span(name or its name), with its first Graph argument."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            graph = next((a for a in (*args, *kwargs.values()) if isinstance(a, Graph)), None)
+            with span(name or func.__name__, graph=graph):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,408 @@
+"""Declarative shape rules compiled into indexed checks and run in one pass over the graph.
+
+Each shape is a plain dict naming a kind, its target classes and the property it
+constrains. compile_shapes() turns them into check objects and works out the only
+predicates the checks need. validate() walks the graph once, bucketing rdf:type,
+rdfs:subClassOf and those predicates per subject, then feeds every targeted subject
+to its checks. The old check_* scripts each parsed the ontology and ran their own
+SPARQL or per-subject subclass walk; they are now views over this report.
+
+revalidate() updates a previous report from a changeset (see changeset.py), re-checking
+only the subjects and single_value groups the change touches.
+
+Shape kinds:
+    required        every instance has at least one value for each `property`
+    expected_value  the value matches `expected[key value]` (e.g. unit per substance)
+    single_value    all instances (per `key` value, if given) share a single value
+    range           the value is numeric and within [`min`, `max`]
+"""
+import json
+from collections import defaultdict
+
+from rdflib import Literal
+from rdflib.namespace import RDF, RDFS
+
+from common.ontology import SALAD, local_name
+
+# Expected hasUnit of SubstancePortion per substance
+EXPECTED_UNITS = {
+    "Calcium": "mg/100g",
+    "Carbohydrate": "mg/100g",
+    "Cholesterol": "mg/100g",
+    "Fat": "mg/100g",
+    "FoodEnergy": "cal/100g",
+    "Iron": "mg/100g",
+    "Lutein": "mg/100g",
+    "Omega-3": "mg/100g",
+    "Potassium": "mg/100g",
+    "Protein": "mg/100g",
+    "Sodium": "mg/100g",
+    "VitaminA": "mg/100g",
+    "VitaminB9": "mg/100g",
+    "VitaminC": "mg/100g",
+    "VitaminE": "mg/100g",
+    "Zeaxanthin": "mg/100g",
+    "Zinc": "mg/100g",
+}
+
+# === SHAPES ===
+SHAPES = [
+    {"id": "substance-portion-required", "kind": "required",
+     "target": ["Ingredient", "Dressing"], "subclasses": True, "property": "hasSubstancePortion"},
+    {"id": "substance-portion-fields", "kind": "required",
+     "target": ["SubstancePortion"], "property": ["hasSubstance", "hasAmount", "hasUnit"]},
+    {"id": "portion-fields", "kind": "required",
+     "target": ["IngredientPortion", "DressingPortion"], "property": ["hasAmount", "hasUnit"]},
+    {"id": "substance-unit", "kind": "expected_value",
+     "target": ["SubstancePortion"], "property": "hasUnit", "key": "hasSubstance", "expected": EXPECTED_UNITS},
+    {"id": "substance-unit-consistent", "kind": "single_value",
+     "target": ["SubstancePortion"], "property": "hasUnit", "key": "hasSubstance"},
+    {"id": "ingredient-portion-unit", "kind": "single_value",
+     "target": ["IngredientPortion"], "property": "hasUnit"},
+    {"id": "dressing-portion-unit", "kind": "single_value",
+     "target": ["DressingPortion"], "property": "hasUnit"},
+    {"id": "portion-amount-range", "kind": "range",
+     "target": ["IngredientPortion", "DressingPortion"], "property": "hasAmount", "min": 0, "max": 1000},
+    {"id": "substance-amount-range", "kind": "range",
+     "target": ["SubstancePortion"], "property": "hasAmount", "min": 0},
+]
+
+
+def _as_list(value):
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _violation_order(violation):
+    return violation["focus"], violation["property"] or "", violation["message"]
+
+
+def _group_name(key):
+    """Report name of a single_value group ("*" when the shape has no key)."""
+    return local_name(key) if key is not None else "*"
+
+
+def _value_name(term):
+    """Local name for URIs, the lexical form for literals."""
+    return str(term) if isinstance(term, Literal) else local_name(term)
+
+
+class Check:
+    """Base compiled check: `visit` each targeted subject, then `finish` for grouped checks."""
+
+    def __init__(self, shape):
+        self.id = shape["id"]
+        self.kind = shape["kind"]
+        self.targets = [SALAD[name] for name in _as_list(shape["target"])]
+        self.subclasses = shape.get("subclasses", False)
+        self.properties = [SALAD[name] for name in _as_list(shape["property"])]
+        self.key = SALAD[shape["key"]] if shape.get("key") else None
+        self.checked = 0
+        self.violations = []
+
+    @property
+    def predicates(self):
+        return set(self.properties) | ({self.key} if self.key else set())
+
+    def violation(self, focus, message, prop=None, value=None, **extra):
+        self.violations.append({
+            "focus": local_name(focus),
+            "property": local_name(prop) if prop is not None else None,
+            "value": _value_name(value) if value is not None else None,
+            "message": message,
+            **extra,
+        })
+
+    def visit(self, subject, values):
+        self.checked += 1
+
+    def finish(self):
+        pass
+
+    def report(self):
+        return {"id": self.id, "kind": self.kind, "checked": self.checked,
+                "violations": sorted(self.violations, key=_violation_order)}
+
+
+class RequiredCheck(Check):
+    def visit(self, subject, values):
+        super().visit(subject, values)
+        for prop in self.properties:
+            if not values.get(prop):
+                self.violation(subject, f"missing {local_name(prop)}", prop)
+
+
+class ExpectedValueCheck(Check):
+    def __init__(self, shape):
+        super().__init__(shape)
+        self.expected = shape["expected"]
+
+    def visit(self, subject, values):
+        super().visit(subject, values)
+        prop = self.properties[0]
+        for key in values.get(self.key, []):
+            expected = self.expected.get(local_name(key))
+            if expected is None:
+                self.violation(subject, f"no expected {local_name(prop)} defined for {local_name(key)}", self.key, key)
+                continue
+            for value in values.get(prop, []):
+                if str(value) != expected:
+                    self.violation(subject, f"expected '{expected}' for {local_name(key)}, found '{value}'", prop, value)
+
+
+class SingleValueCheck(Check):
+    def __init__(self, shape):
+        super().__init__(shape)
+        self.groups = defaultdict(lambda: defaultdict(list))  # key -> value -> subjects
+
+    def visit(self, subject, values):
+        super().visit(subject, values)
+        keys = values.get(self.key, []) if self.key else [None]
+        for key in keys:
+            for value in values.get(self.properties[0], []):
+                self.groups[key][str(value)].append(subject)
+
+    def finish(self):
+        prop = self.properties[0]
+        for key, by_value in self.groups.items():
+            if len(by_value) < 2:
+                continue
+            # The most common value is taken as the intended one; the rest are reported
+            majority = max(by_value, key=lambda v: (len(by_value[v]), v))
+            scope = f" for {local_name(key)}" if key is not None else ""
+            for value, subjects in by_value.items():
+                if value == majority:
+                    continue
+                for subject in subjects:
+                    self.violation(subject, f"{local_name(prop)} '{value}' differs from '{majority}'{scope}",
+                                   prop, value, group=_group_name(key))
+
+    def report(self):
+        report = super().report()
+        report["values"] = {
+            _group_name(key): {value: len(s) for value, s in sorted(by_value.items())}
+            for key, by_value in sorted(self.groups.items(), key=lambda item: str(item[0]))
+        }
+        return report
+
+
+class RangeCheck(Check):
+    def __init__(self, shape):
+        super().__init__(shape)
+        self.min = shape.get("min")
+        self.max = shape.get("max")
+
+    def visit(self, subject, values):
+        super().visit(subject, values)
+        prop = self.properties[0]
+        for value in values.get(prop, []):
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                self.violation(subject, f"{local_name(prop)} '{value}' is not a number", prop, value)
+                continue
+            if (self.min is not None and number < self.min) or (self.max is not None and number > self.max):
+                self.violation(subject, f"{local_name(prop)} {number:g} outside [{self.min}, {self.max}]", prop, value)
+
+
+CHECK_KINDS = {
+    "required": RequiredCheck,
+    "expected_value": ExpectedValueCheck,
+    "single_value": SingleValueCheck,
+    "range": RangeCheck,
+}
+
+
+def compile_shapes(shapes=SHAPES, ids=None):
+    """Turn shape dicts (optionally only those in `ids`) into Check objects."""
+    selected = [s for s in shapes if ids is None or s["id"] in ids]
+    unknown = set(ids or ()) - {s["id"] for s in shapes}
+    if unknown:
+        raise ValueError(f"Unknown shape ids: {', '.join(sorted(unknown))}")
+    checks = []
+    for shape in selected:
+        if shape["kind"] not in CHECK_KINDS:
+            raise ValueError(f"Shape '{shape['id']}': unknown kind '{shape['kind']}'")
+        checks.append(CHECK_KINDS[shape["kind"]](shape))
+    return checks
+
+
+def _descendants(children, roots):
+    """`roots` plus all their transitive subclasses; `children(cls)` yields direct subclasses."""
+    closure = set()
+    pending = list(roots)
+    while pending:
+        cls = pending.pop()
+        if cls not in closure:
+            closure.add(cls)
+            pending.extend(children(cls))
+    return closure
+
+
+def _checks_by_class(checks, children):
+    """Index: class -> checks targeting it (through subclasses where the shape asks for it)."""
+    index = defaultdict(list)
+    for check in checks:
+        check.classes = _descendants(children, check.targets) if check.subclasses else set(check.targets)
+        for cls in check.classes:
+            index[cls].append(check)
+    return index
+
+
+def _visit(subject, subject_types, values, checks_by_class, skip=()):
+    seen = set()
+    for cls in subject_types:
+        for check in checks_by_class.get(cls, ()):
+            if id(check) not in seen and check not in skip:
+                seen.add(id(check))
+                check.visit(subject, values)
+
+
+def _summarize(triples, reports):
+    return {
+        "triples": triples,
+        "shapes": reports,
+        "summary": {
+            "shapes": len(reports),
+            "checked": sum(r["checked"] for r in reports),
+            "violations": sum(len(r["violations"]) for r in reports),
+            "failed": [r["id"] for r in reports if r["violations"]],
+        },
+    }
+
+
+def validate(g, checks):
+    """Run compiled `checks` over `g` in a single pass; return the machine-readable report."""
+    predicates = set().union(*(c.predicates for c in checks)) if checks else set()
+
+    # The one pass: types, the class hierarchy and the constrained predicates per subject
+    types = defaultdict(set)
+    subclasses = defaultdict(set)
+    values = defaultdict(lambda: defaultdict(list))
+    triples = 0
+    for s, p, o in g:
+        triples += 1
+        if p == RDF.type:
+            types[s].add(o)
+        elif p == RDFS.subClassOf:
+            subclasses[o].add(s)
+        if p in predicates:
+            values[s][p].append(o)
+
+    checks_by_class = _checks_by_class(checks, lambda cls: subclasses.get(cls, ()))
+    empty = {}
+    for subject, subject_types in types.items():
+        _visit(subject, subject_types, values.get(subject, empty), checks_by_class)
+    for check in checks:
+        check.finish()
+    return _summarize(triples, [check.report() for check in checks])
+
+
+# === INCREMENTAL ===
+
+def _subject_values(g, subject, predicates):
+    return {p: list(g.objects(subject, p)) for p in predicates}
+
+
+def _affected_groups(g, check, changed, removed):
+    """single_value groups a change can alter: the old and new key values of touched subjects."""
+    relevant = check.predicates | {RDF.type}
+    touched = {s for s, p, o in changed if p in relevant}
+    if not touched:
+        return set()
+    if check.key is None:
+        return {None}
+    groups = {o for s, p, o in removed if p == check.key}
+    for subject in touched:
+        groups.update(g.objects(subject, check.key))
+    return groups
+
+
+def _group_members(g, check, key):
+    """Targeted subjects currently in a single_value group, found through indexed lookups."""
+    if key is None:
+        candidates = {s for cls in check.classes for s in g.subjects(RDF.type, cls)}
+    else:
+        candidates = set(g.subjects(check.key, key))
+    return [s for s in candidates if not check.classes.isdisjoint(g.objects(s, RDF.type))]
+
+
+def revalidate(g, changeset, previous, checks):
+    """
+    Update `previous` (a validate() report for the graph before `changeset`) for `g`, the
+    graph after it, re-checking only the subjects the changeset touches.
+
+    Per-subject checks revisit just those subjects; single_value checks recount just the
+    groups (e.g. the substance) whose membership or values changed. Violations of
+    untouched subjects are carried over. A change to the class hierarchy, or shapes that
+    the previous report does not cover, fall back to a full validate().
+    """
+    changed = changeset.added | changeset.removed
+    previous_shapes = {r["id"]: r for r in previous.get("shapes", [])}
+    if any(p == RDFS.subClassOf for _, p, _ in changed) or any(c.id not in previous_shapes for c in checks):
+        return validate(g, checks)
+
+    checks_by_class = _checks_by_class(checks, lambda cls: g.subjects(RDFS.subClassOf, cls))
+    predicates = set().union(*(c.predicates for c in checks)) if checks else set()
+    focus = {s for s, _, _ in changed}
+    grouped = [c for c in checks if isinstance(c, SingleValueCheck)]
+
+    for subject in focus:
+        _visit(subject, set(g.objects(subject, RDF.type)), _subject_values(g, subject, predicates),
+               checks_by_class, skip=grouped)
+
+    affected = {}
+    for check in grouped:
+        affected[check.id] = _affected_groups(g, check, changed, changeset.removed)
+        members = set()
+        for key in affected[check.id]:
+            members.update(_group_members(g, check, key))
+        for subject in members:
+            check.visit(subject, _subject_values(g, subject, check.predicates))
+        # A member with several keys (two hasSubstance values) also lands in groups that
+        # were not revisited in full; those keep their previous counts and violations
+        for key in set(check.groups) - affected[check.id]:
+            del check.groups[key]
+        check.finish()
+
+    focus_names = {local_name(s) for s in focus}
+    reports = []
+    for check in checks:
+        old, new = previous_shapes[check.id], check.report()
+        if check in grouped:
+            groups = {_group_name(key) for key in affected[check.id]}
+            kept = [v for v in old["violations"] if v.get("group") not in groups]
+            values = {k: v for k, v in old.get("values", {}).items() if k not in groups}
+            values.update(new["values"])
+            new["values"] = dict(sorted(values.items()))
+        else:
+            kept = [v for v in old["violations"] if v["focus"] not in focus_names]
+        new["violations"] = sorted(kept + new["violations"], key=_violation_order)
+        new["checked"] = len({s for cls in check.classes for s in g.subjects(RDF.type, cls)})
+        reports.append(new)
+
+    report = _summarize(len(g), reports)
+    report["incremental"] = {"subjects": len(focus), "changed triples": len(changed)}
+    return report
+
+
+def load_shapes(path):
+    """Read a JSON list of shape dicts."""
+    with open(path, encoding="utf8") as f:
+        return json.load(f)
+
+
+def print_report(report, limit=None):
+    """Human-readable summary of a validate() report."""
+    for shape in report["shapes"]:
+        violations = shape["violations"]
+        mark = "⚠️" if violations else "✅"
+        print(f"{mark} {shape['id']} ({shape['kind']}): {shape['checked']} checked, {len(violations)} violations")
+        for key, counts in shape.get("values", {}).items():
+            print(f"    {key}: " + ", ".join(f"'{value}' x{count}" for value, count in counts.items()))
+        for violation in violations[:limit]:
+            print(f"    - {violation['focus']}: {violation['message']}")
+        if limit is not None and len(violations) > limit:
+            print(f"    ... {len(violations) - limit} more")
+    summary = report["summary"]
+    print(f"\n🎯 {summary['violations']} violations across {summary['shapes']} shapes "
+          f"({summary['checked']} subjects checked, {report['triples']} triples)")
@@ -0,0 +1,84 @@
+import argparse
+import sys
+from pathlib import Path
+from prettytable import PrettyTable
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.ontology import load_graph
+from common.recommender import NUTRIENTS, PURPOSES, SaladRecommender, person_profile
+from common.timing import span
+
+
+ontology = "salad_ontology.rdf"
+
+
+def parse_bound(text):
+    """Parse 'Nutrient=value' into (nutrient, float value)."""
+    nutrient, _, value = text.partition("=")
+    if nutrient not in NUTRIENTS or not value:
+        raise argparse.ArgumentTypeError(f"expected Nutrient=value with Nutrient in {NUTRIENTS}, got '{text}'")
+    return nutrient, float(value)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Which salads should this person eat, best first.")
+    parser.add_argument("--ontology", default=ontology)
+    parser.add_argument("--person", help="Person individual whose hasAllergicTo/hasSpecificPurpose are used")
+    parser.add_argument("--allergy", action="append", default=[], help="Allergen or ingredient/dressing to avoid (repeatable)")
+    parser.add_argument("--purpose", choices=PURPOSES)
+    parser.add_argument("--min", action="append", type=parse_bound, default=[], metavar="NUTRIENT=VALUE",
+                        help="Lower bound in mg (cal for FoodEnergy), repeatable")
+    parser.add_argument("--max", action="append", type=parse_bound, default=[], metavar="NUTRIENT=VALUE",
+                        help="Upper bound in mg (cal for FoodEnergy), repeatable")
+    parser.add_argument("--rank-by", choices=NUTRIENTS, help="Rank by this nutrient instead of the purpose margin")
+    parser.add_argument("--ascending", action="store_true", help="Lowest --rank-by value first")
+    parser.add_argument("--limit", type=int)
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+
+    with span("parse") as phase:
+        graph = load_graph(args.ontology)
+        phase.set(triples_after=len(graph))
+    with span("index", graph=graph):
+        recommender = SaladRecommender.from_graph(graph)
+
+    allergies = list(args.allergy)
+    purposes = [args.purpose] if args.purpose else []
+    if args.person:
+        person_allergies, person_purposes = person_profile(graph, args.person)
+        allergies += person_allergies
+        purposes = purposes or person_purposes
+        print(f"{args.person}: allergic to {person_allergies}, purposes {person_purposes}")
+
+    bounds = {}
+    for nutrient, value in args.min:
+        bounds[nutrient] = (value, bounds.get(nutrient, (None, None))[1])
+    for nutrient, value in args.max:
+        bounds[nutrient] = (bounds.get(nutrient, (None, None))[0], value)
+
+    for purpose in purposes or [None]:
+        with span("recommend", purpose=purpose) as phase:
+            try:
+                results = recommender.recommend(
+                    allergies=allergies,
+                    purpose=purpose,
+                    bounds=bounds,
+                    rank_by=args.rank_by,
+                    ascending=args.ascending,
+                    limit=args.limit,
+                )
+            except ValueError as e:
+                raise SystemExit(f"Error: {e}")
+            phase.set(results=len(results))
+
+        table = PrettyTable()
+        table.field_names = ["rank", "salad", "score"]
+        table.align = "l"
+        for rank, (salad, score) in enumerate(results, start=1):
+            table.add_row([rank, salad, round(score, 3)])
+
+        print(f"\nPurpose: {purpose or 'any'} - {len(results)} salads")
+        print(table.get_string())
@@ -1,15 +1,20 @@
-import os
+import argparse
+import sys
 import rdflib.graph as g
 from pathlib import Path
-from prettytable import PrettyTable
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.salad_index import get_salad_index, similar_substance_pairs
+from common.table_writer import FORMATS, StreamingTableWriter
+from common.timing import span
 
 
 name = Path(__file__).stem
 ontology = "salad_ontology.rdf"
-outfile = f"output/{name}.html"
 
 graph = g.Graph()
-graph.parse(ontology, format='xml')
+with span("parse", graph=graph):
+    graph.parse(ontology, format='xml')
 
 def rename_uri(uri):
     try:
@@ -21,67 +26,34 @@ def rename_uri(uri):
 
 
 def similar_substance():
-    return """
-    PREFIX owl: <http://www.w3.org/2002/07/owl#>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX s: <http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#>
-  
-    SELECT DISTINCT ?ingredientX ?substancesX ?ingredientY ?substancesY
-    WHERE {
-        {
-            SELECT ?saladX ?ingredientX (GROUP_CONCAT(DISTINCT ?substanceX; SEPARATOR=",") AS ?substancesX)
-            WHERE {
-                ?saladX rdf:type s:Salad .
-                ?saladX s:hasIngredientPortion ?ingredientPortionX .
-                ?ingredientPortionX s:hasIngredient ?ingredientX .
-                ?ingredientX s:hasSubstancePortion ?substancePortionX .
-                ?substancePortionX s:hasSubstance ?substanceX .
-            }
-            GROUP BY ?saladX ?ingredientX
-        }
-
-        {
-            SELECT ?saladY ?ingredientY (GROUP_CONCAT(DISTINCT ?substanceY; SEPARATOR=",") AS ?substancesY)
-            WHERE {
-                ?saladY rdf:type s:Salad .
-                ?saladY s:hasIngredientPortion ?ingredientPortionY .
-                ?ingredientPortionY s:hasIngredient ?ingredientY .
-                ?ingredientY s:hasSubstancePortion ?substancePortionY .
-                ?substancePortionY s:hasSubstance ?substanceY .
-            }
-            GROUP BY ?saladY ?ingredientY
-        }
-        BIND(STRAFTER(STR(?substancesX), ",") AS ?substancesX)
-        BIND(STRAFTER(STR(?substancesY), ",") AS ?substancesY)
+    """Ingredient pairs with similar substances (same answers as the original SPARQL), from the salad index."""
+    return similar_substance_pairs(get_salad_index(graph), "ingredient")
 
-        FILTER (?ingredientX != ?ingredientY && CONTAINS(?substancesY, ?substancesX))
-    }
-    """
 if __name__ == "__main__":
-    table = PrettyTable()
-    table.field_names = [
+    parser = argparse.ArgumentParser(description=f"Stream {name} results to HTML, CSV or JSONL.")
+    parser.add_argument("--format", choices=FORMATS, default="html")
+    parser.add_argument("--output", help="Defaults to output/{name}.<format>")
+    parser.add_argument("--limit", type=int, help="Write at most this many rows")
+    parser.add_argument("--offset", type=int, default=0, help="Skip this many rows first")
+    parser.add_argument("--quiet", action="store_true", help="Do not echo rows to stdout")
+    args = parser.parse_args()
+
+    outfile = args.output or f"output/{name}.{args.format}"
+    field_names = [
         "ingredientX",
         "substancesX",
         "ingredientY",
         "substancesY"
-
     ]
-    table.align = "l"
-    
-    query_str = similar_substance()
-    result = graph.query(query_str)
-    print(f"Found {len(result)} results.")
 
-    for row in result:
-        table.add_row([
-            rename_uri(row.ingredientX),
-            rename_uri(row.substancesX),
-            rename_uri(row.ingredientY),
-            rename_uri(row.substancesY)
-        ])
-    
-    print(table.get_string())
-    
-    with open(outfile, "w+") as s:
-        s.write(table.get_html_string())
\ No newline at end of file
+    def echo(row):
+        if not args.quiet:
+            print(" | ".join(row))
+
+    with span("query_write", graph=graph) as phase, \
+            StreamingTableWriter(outfile, field_names, args.format, args.limit, args.offset) as writer:
+        rows = ([rename_uri(value) for value in row] for row in similar_substance())
+        writer.write_rows(rows, on_row=echo)
+        phase.set(rows=writer.written, format=args.format)
+
+    print(f"Wrote {writer.written} results to {outfile}.")
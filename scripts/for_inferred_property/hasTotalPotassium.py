@@ -2,6 +2,13 @@ import rdflib
 from rdflib import Graph, Literal, URIRef, Namespace
 from rdflib.namespace import RDF, XSD
 import shutil
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.salad_index import get_salad_index
+from common.substance_stream import amount_literal
+from common.timing import span, timed
 
 # Define namespaces
 S = Namespace("http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#")
@@ -36,9 +43,9 @@ substance_uri_map = {
     "Zinc": S.Zinc
 }
 
-def calculate_total_nutrition_for_salad(g, salad_name):
+def calculate_total_nutrition_for_salad(g, salad_name, index=None):
     """
-    Calculate total nutrition for a given salad using SPARQL queries and add hasSubstance links.
+    Calculate total nutrition for a given salad from the salad index and add hasSubstance links.
     """
     salad_uri = S[salad_name]
     nutrient_total_name = f"{salad_name}Nutrition"
@@ -58,61 +65,12 @@ def calculate_total_nutrition_for_salad(g, salad_name):
     existing_substances = [str(row.substance).split("#")[-1] for row in g.query(check_query)]
     print(f"Existing SaladSubstance instances for {salad_name} at start: {existing_substances}")
 
-    # Create a comma-separated list of all nutrient names for the SPARQL filter
-    nutrient_names_list = ", ".join([f'"{name}"' for name in nutrient_property_map.keys()])
-
-    # Comprehensive SPARQL query to calculate nutrition totals in one go
-    calc_query = """
-    PREFIX s: <http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-    
-    SELECT ?substanceName (SUM(?scaledAmount) as ?totalAmount) ?substanceUnit
-    WHERE {
-      # Get all ingredient and dressing portions for this salad
-      <http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#%s> 
-          s:hasIngredientPortion|s:hasDressingPortion ?portion .
-      
-      ?portion s:hasAmount ?portionAmount ;
-               s:hasUnit ?portionUnit ;
-               (s:hasIngredient|s:hasDressing) ?component .
-      
-      # Get substance portions from the components
-      ?component s:hasSubstancePortion ?substancePortion .
-      ?substancePortion s:hasSubstance ?substance ;
-                        s:hasAmount ?substanceAmount ;
-                        s:hasUnit ?substanceUnit .
-      
-      # Extract substance name from URI
-      BIND(STRAFTER(STR(?substance), "#") AS ?substanceName)
-      
-      # Calculate scaling factor based on portion units
-      BIND(
-        IF(LCASE(?portionUnit) = "grams" || (STRENDS(STR(?portion), "IngredientPortion") && LCASE(?portionUnit) = "g"),
-           ?portionAmount / 100.0,
-           IF(LCASE(?portionUnit) = "millilitres" || (STRENDS(STR(?portion), "DressingPortion") && LCASE(?portionUnit) = "ml"),
-              ?portionAmount / 100.0,
-              1.0)
-        ) AS ?scalingFactor
-      )
-      
-      # Apply scaling to substance amount
-      BIND(?substanceAmount * ?scalingFactor AS ?scaledAmount)
-      
-      # Filter to only include substances we're interested in
-      FILTER(?substanceName IN (%s))
-    }
-    GROUP BY ?substanceName ?substanceUnit
-    """ % (salad_name, nutrient_names_list)
-    
-    nutrient_results = g.query(calc_query)
+    # Sum the salad -> portion -> component -> substance chain from the precomputed index
+    if index is None:
+        index = get_salad_index(g)
     nutrient_totals = {}
     
-    for row in nutrient_results:
-        substance_name = str(row.substanceName)
-        total_amount = float(row.totalAmount)
-        substance_unit = str(row.substanceUnit)
-        
+    for (substance_name, substance_unit), total_amount in index.nutrient_totals(salad_uri, nutrient_property_map).items():
         if substance_name in expected_units:
             expected_unit = expected_units[substance_name]
             if substance_unit != expected_unit:
@@ -203,7 +161,7 @@ def calculate_total_nutrition_for_salad(g, salad_name):
         }
         """ % (
             substance_instance_name, 
-            total_amount, 
+            amount_literal(total_amount), 
             display_unit,
             substance_name,  # Link to the substance (e.g., s:Calcium)
             nutrient_total_name,
@@ -212,18 +170,23 @@ def calculate_total_nutrition_for_salad(g, salad_name):
         ) if substance_name in nutrient_property_map and substance_name in substance_uri_map else ""
         
         if create_substance:
+            # A rerun replaces the previous total instead of adding a second hasAmount next to it
+            g.remove((S[substance_instance_name], S.hasAmount, None))
+            g.remove((S[substance_instance_name], S.hasUnit, None))
             g.update(create_substance)
             print(f"Created SaladSubstance instance: {substance_instance_name} with hasSubstance link to s:{substance_name}")
 
+@timed()
 def process_all_salads():
     """
     Retrieve all Salad instances using SPARQL and calculate their total nutrition.
     """
     g = Graph()
-    try:
-        g.parse("salad_ontology.rdf", format="xml")
-    except FileNotFoundError:
-        print("Error: salad_ontology.rdf not found. Starting with an empty graph.")
+    with span("parse", graph=g):
+        try:
+            g.parse("salad_ontology.rdf", format="xml")
+        except FileNotFoundError:
+            print("Error: salad_ontology.rdf not found. Starting with an empty graph.")
     
     # SPARQL query to get all salads
     query_salads = """
@@ -237,17 +200,25 @@ def process_all_salads():
     }
     """
     
-    results = g.query(query_salads)
-    salad_names = [str(row.saladName) for row in results]
+    with span("query_salads", graph=g) as phase:
+        results = g.query(query_salads)
+        salad_names = [str(row.saladName) for row in results]
+        phase.set(salads=len(salad_names))
     
     print(f"Found {len(salad_names)} salads: {salad_names}")
     
-    for salad_name in salad_names:
-        print(f"\nProcessing salad: {salad_name}")
-        calculate_total_nutrition_for_salad(g, salad_name)
+    # Build the traversal index once; the updates below never touch the indexed chain
+    with span("index", graph=g):
+        index = get_salad_index(g)
+    
+    with span("update", graph=g, salads=len(salad_names)):
+        for salad_name in salad_names:
+            print(f"\nProcessing salad: {salad_name}")
+            calculate_total_nutrition_for_salad(g, salad_name, index)
     
     # Save the updated ontology
-    g.serialize(destination="salad_ontology.rdf", format="xml")
+    with span("serialize", graph=g):
+        g.serialize(destination="salad_ontology.rdf", format="xml")
     print("\nAll salads processed. Updated ontology saved as 'salad_ontology.rdf'.")
 
 if __name__ == "__main__":
@@ -0,0 +1,46 @@
+"""
+Fuzzy search over the labels and local names of the ontology.
+
+The trigram index is saved next to the ontology (salad_ontology.search.json) and reused
+until the ontology file changes, so repeated searches skip the index build.
+
+    python search_ontology.py mozarella vinaigrette [--type Ingredient] [--limit 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent / "scripts"))
+from common.ontology import ONTOLOGY_FILE, SALAD, load_graph, local_name
+from common.search_index import MIN_SCORE, get_search_index, subclass_closure
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy search over rdfs:label values and local names.")
+    parser.add_argument("queries", nargs="+")
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE)
+    parser.add_argument("--type", nargs="+", metavar="CLASS", help="Only instances of these classes (or subclasses)")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--min-score", type=float, default=MIN_SCORE)
+    args = parser.parse_args()
+
+    g = load_graph(args.ontology)
+    start = time.perf_counter()
+    index = get_search_index(g, args.ontology)
+    print(f"✅ Index ready: {len(index.entries)} names in {time.perf_counter() - start:.2f}s")
+    types = subclass_closure(g, [SALAD[name] for name in args.type]) if args.type else None
+
+    for query in args.queries:
+        start = time.perf_counter()
+        matches = index.search(query, limit=args.limit, types=types, min_score=args.min_score)
+        elapsed = (time.perf_counter() - start) * 1e6
+        print(f"\n🎯 {query} ({elapsed:.0f} µs)")
+        if not matches:
+            print("  ⚠️ no match")
+        for uri, score, name in matches:
+            print(f"  {score:.2f}  {local_name(uri)}" + (f"  ({name})" if name != local_name(uri) else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The scripts import each other as `common.*`, with scripts/ on sys.path; the
+# for_inferred_property scripts are imported by module name, as infer.py does
+SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+sys.path.append(str(SCRIPTS))
+sys.path.append(str(SCRIPTS / "for_inferred_property"))
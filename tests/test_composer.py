@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import numpy as np
+
+from common.composer import SaladComposer
+from common.ontology import load_graph
+from common.recommender import NUTRIENT_COLUMNS, NUTRIENTS
+
+ONTOLOGY = Path(__file__).resolve().parents[1] / "salad_ontology.rdf"
+
+
+def composer(components):
+    """SaladComposer over {name: (per-100g nutrients, [(amount, portion name)])} ingredients."""
+    matrix = np.zeros((len(components), len(NUTRIENTS)))
+    for i, (nutrients, _) in enumerate(components.values()):
+        for nutrient, amount in nutrients.items():
+            matrix[i, NUTRIENT_COLUMNS[nutrient]] = amount
+    return SaladComposer(list(components), ["ingredient"] * len(components), matrix,
+                         [{name} for name in components], [portions for _, portions in components.values()])
+
+
+def test_swaps_out_a_greedy_first_pick():
+    # Protein powder has the best protein per gram, so the greedy takes it first; with one
+    # item allowed only replacing it with the tuna portion meets the protein target
+    salad = composer({
+        "ProteinPowder": ({"Protein": 80000, "FoodEnergy": 400}, [(20, "ProteinPowder20g")]),
+        "Tuna": ({"Protein": 29000, "FoodEnergy": 130}, [(150, "Tuna150g")]),
+    })
+    result = salad.compose({"Protein": (30000, None), "FoodEnergy": (None, 500)}, max_items=1)
+    assert result["satisfied"]
+    assert result["portions"] == ["Tuna150g"]
+
+
+def test_high_protein_low_energy_salad_from_ontology():
+    # Tuna150g alone gives about 43500 mg protein at 195 cal
+    result = SaladComposer.from_graph(load_graph(ONTOLOGY)).compose(
+        {"Protein": (30000, None), "FoodEnergy": (None, 500)}, exclude=["Lactose"])
+    assert result["satisfied"]
+    assert result["totals"]["Protein"] >= 30000
+    assert result["totals"]["FoodEnergy"] <= 500
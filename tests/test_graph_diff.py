@@ -0,0 +1,44 @@
+from rdflib import BNode, Graph, URIRef
+from rdflib.collection import Collection
+from rdflib.namespace import OWL, RDF
+
+from common.graph_diff import apply_changeset, canonical_labels, diff_graphs, graph_hash
+
+MEMBERS = 1000  # well past Python's default recursion limit
+
+
+def all_different(count):
+    """An owl:AllDifferent with an owl:distinctMembers list of `count` individuals."""
+    g = Graph()
+    head = BNode()
+    Collection(g, head, [URIRef(f"urn:salad:i{i}") for i in range(count)])
+    node = BNode()
+    g.add((node, RDF.type, OWL.AllDifferent))
+    g.add((node, OWL.distinctMembers, head))
+    return g
+
+
+def reparse(g):
+    copy = Graph()
+    copy.parse(data=g.serialize(format="nt"), format="nt")
+    return copy
+
+
+def test_long_list_gets_distinct_labels():
+    g = all_different(MEMBERS)
+    labels = canonical_labels(g)
+    assert len(labels) == MEMBERS + 1
+    assert len(set(labels.values())) == MEMBERS + 1
+
+
+def test_long_list_hash_survives_reparse():
+    g = all_different(MEMBERS)
+    assert graph_hash(g) == graph_hash(reparse(g))
+    assert not diff_graphs(g, reparse(g)).added
+
+
+def test_long_list_diff_applies():
+    old, new = all_different(MEMBERS), all_different(MEMBERS + 1)
+    changeset = diff_graphs(old, new)
+    assert changeset.added and changeset.removed
+    assert graph_hash(apply_changeset(reparse(old), changeset)) == graph_hash(new)
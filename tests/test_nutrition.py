@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+from rdflib import Graph, Literal
+from rdflib.namespace import RDF, XSD
+
+from calculatedSaladNutrition import calculate_all_salads
+from common.ontology import SALAD
+
+
+def salad_graph():
+    """GreekSalad: 100 g Tomato (0.1 mg Calcium/100g) and 100 g Cucumber (0.2 mg Calcium/100g)."""
+    g = Graph()
+    g.add((SALAD.GreekSalad, RDF.type, SALAD.Salad))
+    for component, calcium in (("Tomato", "0.1"), ("Cucumber", "0.2")):
+        portion = SALAD[f"{component}100g"]
+        substance_portion = SALAD[f"{component}Calcium"]
+        g.add((SALAD.GreekSalad, SALAD.hasIngredientPortion, portion))
+        g.add((portion, SALAD.hasIngredient, SALAD[component]))
+        g.add((portion, SALAD.hasAmount, Literal("100.0", datatype=XSD.decimal)))
+        g.add((portion, SALAD.hasUnit, Literal("grams")))
+        g.add((SALAD[component], SALAD.hasSubstancePortion, substance_portion))
+        g.add((substance_portion, SALAD.hasSubstance, SALAD.Calcium))
+        g.add((substance_portion, SALAD.hasAmount, Literal(calcium, datatype=XSD.decimal)))
+        g.add((substance_portion, SALAD.hasUnit, Literal("mg/100g")))
+    return g
+
+
+def test_total_is_exact_decimal():
+    g = salad_graph()
+    calculate_all_salads(g)
+    # A float sum would give 0.30000000000000004
+    assert list(g.objects(SALAD.GreekSaladCalcium, SALAD.hasAmount)) == [Literal("0.3", datatype=XSD.decimal)]
+    assert Decimal(str(g.value(SALAD.GreekSaladCalcium, SALAD.hasAmount))) == Decimal("0.3")
+
+
+def test_rerun_is_idempotent():
+    g = salad_graph()
+    calculate_all_salads(g)
+    once = set(g)
+    calculate_all_salads(g)
+    assert set(g) == once
+
+    # A changed input replaces the total instead of adding a second hasAmount
+    g.set((SALAD.Tomato100g, SALAD.hasAmount, Literal("200.0", datatype=XSD.decimal)))
+    calculate_all_salads(g)
+    assert list(g.objects(SALAD.GreekSaladCalcium, SALAD.hasAmount)) == [Literal("0.4", datatype=XSD.decimal)]
@@ -0,0 +1,39 @@
+import pytest
+from rdflib import Graph, Literal
+from rdflib.namespace import RDF, RDFS
+
+from common.ontology import SALAD
+from common.recommender import SaladRecommender
+
+
+def salad_graph():
+    """CapreseSalad holds Mozzarella (contains Lactose); Walnut is an ingredient in no salad."""
+    g = Graph()
+    g.add((SALAD.Cheese, RDFS.subClassOf, SALAD.Ingredient))
+    g.add((SALAD.Nut, RDFS.subClassOf, SALAD.Ingredient))
+    g.add((SALAD.Mozzarella, RDF.type, SALAD.Cheese))
+    g.add((SALAD.Walnut, RDF.type, SALAD.Nut))
+    g.add((SALAD.Lactose, RDF.type, SALAD.Allergen))
+    g.add((SALAD.Mozzarella, SALAD.containAllergen, SALAD.Lactose))
+    for salad, component in (("CapreseSalad", "Mozzarella"), ("GreenSalad", None)):
+        g.add((SALAD[salad], RDF.type, SALAD.Salad))
+        portion = SALAD[f"{salad}Portion"]
+        g.add((SALAD[salad], SALAD.hasIngredientPortion, portion))
+        g.add((portion, SALAD.hasAmount, Literal("100.0")))
+        g.add((portion, SALAD.hasUnit, Literal("grams")))
+        if component:
+            g.add((portion, SALAD.hasIngredient, SALAD[component]))
+    return g
+
+
+def test_allergy_filters_salads():
+    recommender = SaladRecommender.from_graph(salad_graph())
+    assert [name for name, _ in recommender.recommend(allergies=["Lactose"])] == ["GreenSalad"]
+    # Known, but in no salad: nothing to filter
+    assert len(recommender.recommend(allergies=["Walnut"])) == 2
+
+
+def test_unknown_allergy_raises():
+    recommender = SaladRecommender.from_graph(salad_graph())
+    with pytest.raises(ValueError, match="Lactos"):
+        recommender.recommend(allergies=["Lactos"])
@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+from rdflib import Graph, Literal
+from rdflib.namespace import RDF
+
+from common.ontology import SALAD, graph_version
+from common.salad_index import get_salad_index
+
+
+def salad_graph():
+    """One salad with a 100 g Tomato portion; Tomato has 10 mg Calcium per 100 g."""
+    g = Graph()
+    g.add((SALAD.GreekSalad, RDF.type, SALAD.Salad))
+    g.add((SALAD.GreekSalad, SALAD.hasIngredientPortion, SALAD.Tomato100g))
+    g.add((SALAD.Tomato100g, SALAD.hasIngredient, SALAD.Tomato))
+    g.add((SALAD.Tomato100g, SALAD.hasAmount, Literal(Decimal("100"))))
+    g.add((SALAD.Tomato100g, SALAD.hasUnit, Literal("grams")))
+    g.add((SALAD.Tomato, SALAD.hasSubstancePortion, SALAD.TomatoCalcium))
+    g.add((SALAD.TomatoCalcium, SALAD.hasSubstance, SALAD.Calcium))
+    g.add((SALAD.TomatoCalcium, SALAD.hasAmount, Literal(Decimal("10"))))
+    g.add((SALAD.TomatoCalcium, SALAD.hasUnit, Literal("mg")))
+    return g
+
+
+def test_graph_version_changes_on_same_size_edit():
+    g = salad_graph()
+    before = graph_version(g)
+    g.set((SALAD.Tomato100g, SALAD.hasAmount, Literal(Decimal("200"))))
+    assert len(g) == before[1]
+    assert graph_version(g) != before
+
+
+def test_index_sees_changed_value():
+    g = salad_graph()
+    assert get_salad_index(g).nutrient_totals(SALAD.GreekSalad) == {("Calcium", "mg"): 10.0}
+    g.set((SALAD.Tomato100g, SALAD.hasAmount, Literal(Decimal("200"))))
+    assert get_salad_index(g).nutrient_totals(SALAD.GreekSalad) == {("Calcium", "mg"): 20.0}
+
+
+def test_index_sees_rename():
+    g = salad_graph()
+    assert get_salad_index(g).salads == [SALAD.GreekSalad]
+    g.remove((SALAD.GreekSalad, None, None))
+    g.add((SALAD.CobbSalad, RDF.type, SALAD.Salad))
+    g.add((SALAD.CobbSalad, SALAD.hasIngredientPortion, SALAD.Tomato100g))
+    assert get_salad_index(g).salads == [SALAD.CobbSalad]
+
+
+def test_index_reused_while_unchanged():
+    g = salad_graph()
+    assert get_salad_index(g) is get_salad_index(g)
@@ -0,0 +1,51 @@
+from rdflib import Graph
+from rdflib.namespace import OWL, RDF
+
+from common.ontology import SALAD
+from common.search_index import SearchIndex, get_search_index, index_path
+
+INGREDIENTS = ["PowderedSugar", "HeavyWhippingCream", "RedPotato", "DijonMustard", "Tomato", "Cucumber"]
+
+
+def ingredient_graph(names=INGREDIENTS):
+    g = Graph()
+    for name in names:
+        g.add((SALAD[name], RDF.type, OWL.NamedIndividual))
+        g.add((SALAD[name], RDF.type, SALAD.Ingredient))
+    return g
+
+
+def test_resolve_ignores_single_word_hits():
+    index = SearchIndex.from_graph(ingredient_graph())
+    for name in ["Sugar", "Cream", "Potatoes", "Mustard"]:
+        assert index.resolve(name, types=[SALAD.Ingredient]) is None, name
+
+
+def test_resolve_accepts_typos():
+    index = SearchIndex.from_graph(ingredient_graph())
+    assert index.resolve("Tomatoe", types=[SALAD.Ingredient]) == SALAD.Tomato
+    assert index.resolve("Cucumbr", types=[SALAD.Ingredient]) == SALAD.Cucumber
+    assert index.resolve("Red Potatoe", types=[SALAD.Ingredient]) == SALAD.RedPotato
+
+
+def test_saved_index_rebuilt_after_rename(tmp_path):
+    path = tmp_path / "salad_ontology.rdf"
+    ingredient_graph().serialize(path, format="xml")
+    get_search_index(ingredient_graph(), path)
+    assert index_path(path).exists()
+
+    # Same triple count, different names: the saved index must not be reused
+    renamed = ingredient_graph([name.replace("Tomato", "Tomatillo") for name in INGREDIENTS])
+    renamed.serialize(path, format="xml")
+    index = get_search_index(renamed, path)
+    assert index.resolve("Tomatillo", types=[SALAD.Ingredient]) == SALAD.Tomatillo
+    assert index.resolve("Tomato", types=[SALAD.Ingredient]) is None
+
+
+def test_cached_index_rebuilt_after_rename():
+    g = ingredient_graph()
+    assert get_search_index(g).resolve("Tomatoe", types=[SALAD.Ingredient]) == SALAD.Tomato
+    g.remove((SALAD.Tomato, None, None))
+    g.add((SALAD.Tomatillo, RDF.type, OWL.NamedIndividual))
+    g.add((SALAD.Tomatillo, RDF.type, SALAD.Ingredient))
+    assert get_search_index(g).resolve("Tomatillo", types=[SALAD.Ingredient]) == SALAD.Tomatillo
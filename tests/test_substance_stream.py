@@ -0,0 +1,40 @@
+from rdflib import Graph, Literal
+from rdflib.namespace import XSD
+
+from common.ontology import SALAD
+from common.substance_stream import replace_existing_values
+
+
+def load(g, triples):
+    conflicts = []
+    for triple in replace_existing_values(g, triples, conflicts):
+        g.add(triple)
+    return conflicts
+
+
+def test_corrected_value_replaces_old_one():
+    g = Graph()
+    g.add((SALAD.TomatoVitaminA, SALAD.hasAmount, Literal("0.833", datatype=XSD.decimal)))
+    conflicts = load(g, [(SALAD.TomatoVitaminA, SALAD.hasAmount, Literal("0.9", datatype=XSD.decimal))])
+
+    assert list(g.objects(SALAD.TomatoVitaminA, SALAD.hasAmount)) == [Literal("0.9", datatype=XSD.decimal)]
+    assert [(action, [str(v) for v in old]) for _, _, old, _, action in conflicts] == [("replaced", ["0.833"])]
+
+
+def test_same_value_is_not_a_conflict():
+    g = Graph()
+    g.add((SALAD.TomatoVitaminA, SALAD.hasAmount, Literal("146", datatype=XSD.decimal)))
+    assert load(g, [(SALAD.TomatoVitaminA, SALAD.hasAmount, Literal("146.0", datatype=XSD.decimal))]) == []
+    assert len(g) == 1
+
+
+def test_later_duplicate_in_stream_is_reported():
+    g = Graph()
+    triples = [
+        (SALAD.RedPotatoVitaminB9, SALAD.hasAmount, Literal("0.031", datatype=XSD.decimal)),
+        (SALAD.RedPotatoVitaminB9, SALAD.hasAmount, Literal("0.018", datatype=XSD.decimal)),
+    ]
+    conflicts = load(g, triples)
+
+    assert list(g.objects(SALAD.RedPotatoVitaminB9, SALAD.hasAmount)) == [Literal("0.031", datatype=XSD.decimal)]
+    assert [action for *_, action in conflicts] == ["ignored"]
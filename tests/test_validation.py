@@ -0,0 +1,50 @@
+from rdflib import Graph, Literal
+from rdflib.namespace import RDF
+
+from common.changeset import Changeset
+from common.ontology import SALAD
+from common.validation import SHAPES, compile_shapes, revalidate, validate
+
+SHAPE_IDS = ["substance-unit", "substance-unit-consistent"]
+
+
+def substance_graph():
+    """SubstancePortions for Calcium and Iron; TomatoMix carries both substances."""
+    g = Graph()
+    portions = [
+        ("TomatoCalcium", ["Calcium"], "mg/100g"),
+        ("CarrotCalcium", ["Calcium"], "mg/100g"),
+        ("TomatoIron", ["Iron"], "mg/100g"),
+        ("CarrotIron", ["Iron"], "mg/100g"),
+        ("CeleryIron", ["Iron"], "g/100g"),
+        ("TomatoMix", ["Calcium", "Iron"], "mg/100g"),
+    ]
+    for name, substances, unit in portions:
+        g.add((SALAD[name], RDF.type, SALAD.SubstancePortion))
+        for substance in substances:
+            g.add((SALAD[name], SALAD.hasSubstance, SALAD[substance]))
+        g.add((SALAD[name], SALAD.hasUnit, Literal(unit)))
+    return g
+
+
+def shape_reports(report):
+    return {shape["id"]: shape for shape in report["shapes"]}
+
+
+def test_revalidate_keeps_groups_of_multi_substance_subjects():
+    g = substance_graph()
+    previous = validate(g, compile_shapes(SHAPES, SHAPE_IDS))
+
+    # Only the Calcium group changes, but TomatoMix is also a member of the Iron group
+    changeset = Changeset(
+        added=[(SALAD.CarrotCalcium, SALAD.hasUnit, Literal("g/100g"))],
+        removed=[(SALAD.CarrotCalcium, SALAD.hasUnit, Literal("mg/100g"))],
+    )
+    changeset.apply(g)
+
+    incremental = revalidate(g, changeset, previous, compile_shapes(SHAPES, SHAPE_IDS))
+    full = validate(g, compile_shapes(SHAPES, SHAPE_IDS))
+    assert shape_reports(incremental)["substance-unit-consistent"]["values"]["Iron"] == {"g/100g": 1, "mg/100g": 3}
+    for shape_id in SHAPE_IDS:
+        for field in ("violations", "values"):
+            assert shape_reports(incremental)[shape_id].get(field) == shape_reports(full)[shape_id].get(field)
@@ -1,342 +1,401 @@
-from rdflib import Graph, Namespace, OWL, RDF, RDFS
-from rdflib.term import BNode, Literal
+"""
+Write a focused text summary of the ontology for an LLM prompt: the class hierarchy with
+restrictions, the property tree, and a walk from one salad instance through its portions.
+
+Everything the walk asks about repeatedly (n3 rendering, labels, types, superclass
+closures) is computed at most once per term, and lines are streamed to the output as they
+are produced.
+
+With --snapshots, the salad exploration is the seeded, cached snapshot from
+salad_snapshots.py, so repeated runs are reproducible and skip the walk.
+
+Usage:
+    python told_llm.py [--ontology salad_ontology.rdf] [--output ontology_summary_focused.txt]
+                       [--seed N] [--max-depth 10] [--snapshots output/salad_snapshots.json]
+"""
+import argparse
 import random
+import sys
+from pathlib import Path
+
+from rdflib import Graph, OWL, RDF, RDFS
+from rdflib.term import BNode, Literal
+
+sys.path.append(str(Path(__file__).resolve().parent / "scripts"))
+from common.ontology import ONTOLOGY_FILE, SALAD
+
+OUTPUT_FILE = "ontology_summary_focused.txt"
+MAX_DEPTH = 10
+MAX_SUBSTANCE_PORTIONS = 4  # substance portions shown per Ingredient/Dressing
+
+RESTRICTION_TYPES = [
+    (OWL.allValuesFrom, "allValuesFrom"),
+    (OWL.someValuesFrom, "someValuesFrom"),
+    (OWL.hasValue, "hasValue"),
+    (OWL.minCardinality, "minCardinality"),
+    (OWL.maxCardinality, "maxCardinality"),
+    (OWL.cardinality, "cardinality"),
+]
+
+PROPERTY_CHARACTERISTICS = [
+    (OWL.FunctionalProperty, "Functional"),
+    (OWL.TransitiveProperty, "Transitive"),
+    (OWL.SymmetricProperty, "Symmetric"),
+    (OWL.AsymmetricProperty, "Asymmetric"),
+    (OWL.ReflexiveProperty, "Reflexive"),
+    (OWL.IrreflexiveProperty, "Irreflexive"),
+]
+
+
+class OntologySummary:
+    """Line generator for the ontology summary, with per-graph lookups built once."""
+
+    def __init__(self, g, rng=None):
+        self.g = g
+        self.rng = rng or random.Random()
+        self._n3 = {}
+        self._ancestors = {}
+
+        # Labels and types per node, filled on first use: the summary touches a few hundred
+        # nodes, so this costs the same on a graph 100x larger
+        self._labels = {}
+        self._types = {}
+        # When set, every node whose labels, types or links are read is added here
+        self.touched = None
 
-# Load the ontology
-g = Graph()
-g.parse("salad_ontology.rdf", format="xml")
-
-# Define namespaces
-sbo = Namespace("http://www.semanticweb.org/god/ontologies/2025/3/salad-bar-ontology#")
-g.bind("s", sbo)
-
-with open("ontology_summary_focused.txt", "w", encoding="utf8") as output_file:
-    def print_n3(item):
-        return item.n3(g.namespace_manager)
-    
-    # Build subclass and superclass maps
-    classes = set(g.subjects(RDF.type, OWL.Class))
-    subclass_map = {}
-    superclass_map = {}
-    for sub, sup in g.subject_objects(RDFS.subClassOf):
-        if isinstance(sub, BNode) or isinstance(sup, BNode):
-            continue
-        subclass_map.setdefault(sup, []).append(sub)
-        superclass_map.setdefault(sub, []).append(sup)
-    
-    # Find root classes (those that are not a subclass of any class)
-    roots = [cls for cls in classes if cls not in superclass_map]
-    if OWL.Thing not in roots:
-        roots.append(OWL.Thing)
-    
-    # Function to check if a class is a subclass of another (including itself)
-    def is_subclass(cls, target_class):
-        if cls == target_class:
-            return True
-        visited = set()
-        to_check = [cls]
-        while to_check:
-            current = to_check.pop()
-            if current in visited:
+        # Named class hierarchy
+        self.classes = set(g.subjects(RDF.type, OWL.Class))
+        self.subclass_map = {}
+        self.superclass_map = {}
+        for sub, sup in g.subject_objects(RDFS.subClassOf):
+            if isinstance(sub, BNode) or isinstance(sup, BNode):
                 continue
-            visited.add(current)
-            for sup in superclass_map.get(current, []):
-                if sup == target_class:
-                    return True
-                to_check.append(sup)
-        return False
-    
-    # Write class hierarchy recursively with restrictions
-    def write_class_tree(class_uri, indent=0, visited=None):
+            self.subclass_map.setdefault(sup, []).append(sub)
+            self.superclass_map.setdefault(sub, []).append(sup)
+
+        # Components whose substance portions are sampled rather than listed in full
+        self.component_roots = {SALAD.Ingredient, SALAD.Dressing}
+
+    def n3(self, term):
+        """Prefixed n3 form of `term`, rendered once per term."""
+        rendered = self._n3.get(term)
+        if rendered is None:
+            rendered = self._n3[term] = term.n3(self.g.namespace_manager)
+        return rendered
+
+    def sorted_terms(self, terms):
+        return sorted(terms, key=self.n3)
+
+    def ancestors(self, cls):
+        """`cls` and all its named superclasses (memoized closure)."""
+        closure = self._ancestors.get(cls)
+        if closure is None:
+            closure = {cls}
+            for sup in self.superclass_map.get(cls, []):
+                if sup not in closure:
+                    # Provisional entry guards against subClassOf cycles
+                    self._ancestors[cls] = closure
+                    closure |= self.ancestors(sup)
+            self._ancestors[cls] = closure
+        return closure
+
+    def labels(self, term):
+        if self.touched is not None:
+            self.touched.add(term)
+        labels = self._labels.get(term)
+        if labels is None:
+            labels = self._labels[term] = list(self.g.objects(term, RDFS.label))
+        return labels
+
+    def types(self, term):
+        if self.touched is not None:
+            self.touched.add(term)
+        types = self._types.get(term)
+        if types is None:
+            types = self._types[term] = list(self.g.objects(term, RDF.type))
+        return types
+
+    def first_label(self, term):
+        labels = self.labels(term)
+        return labels[0] if labels else None
+
+    def type_list(self, term):
+        return ", ".join(self.n3(t) for t in self.types(term) if not isinstance(t, BNode))
+
+    # === CLASS HIERARCHY ===
+
+    def roots(self):
+        """Classes that are not a subclass of any named class, plus owl:Thing."""
+        roots = [cls for cls in self.classes if cls not in self.superclass_map]
+        if OWL.Thing not in roots:
+            roots.append(OWL.Thing)
+        return roots
+
+    def class_hierarchy(self):
+        yield "=== CLASS HIERARCHY ===\n\n"
+        visited_classes = set()
+        for root in self.sorted_terms(self.roots()):
+            yield from self.class_tree(root, visited=visited_classes)
+
+    def class_tree(self, class_uri, indent=0, visited=None):
         if visited is None:
             visited = set()
         if class_uri in visited:
             return
         visited.add(class_uri)
-        
-        output_file.write("  " * indent + f"- {print_n3(class_uri)}\n")
-        
-        # Get class label if available
-        for label in g.objects(class_uri, RDFS.label):
-            output_file.write("  " * (indent + 1) + f"Label: {label}\n")
-        
+        g = self.g
+
+        yield "  " * indent + f"- {self.n3(class_uri)}\n"
+        for label in self.labels(class_uri):
+            yield "  " * (indent + 1) + f"Label: {label}\n"
+
         # Class restrictions
-        for s, p, restriction in g.triples((class_uri, RDFS.subClassOf, None)):
-            if isinstance(restriction, BNode):
-                types = list(g.objects(restriction, RDF.type))
-                if OWL.Restriction in types:
-                    on_property = next(g.objects(restriction, OWL.onProperty), None)
-                    
-                    # Check for all possible restriction types
-                    restriction_types = [
-                        (OWL.allValuesFrom, "allValuesFrom"),
-                        (OWL.someValuesFrom, "someValuesFrom"),
-                        (OWL.hasValue, "hasValue"),
-                        (OWL.minCardinality, "minCardinality"),
-                        (OWL.maxCardinality, "maxCardinality"),
-                        (OWL.cardinality, "cardinality")
-                    ]
-                    
-                    for restriction_type, type_name in restriction_types:
-                        restriction_value = next(g.objects(restriction, restriction_type), None)
-                        if on_property and restriction_value is not None:
-                            output_file.write("  " * (indent + 1) + 
-                                            f"Restriction: {print_n3(on_property)} {type_name} {print_n3(restriction_value)}\n")
-        
+        for restriction in g.objects(class_uri, RDFS.subClassOf):
+            if not isinstance(restriction, BNode) or OWL.Restriction not in self.types(restriction):
+                continue
+            on_property = g.value(restriction, OWL.onProperty)
+            for restriction_type, type_name in RESTRICTION_TYPES:
+                restriction_value = g.value(restriction, restriction_type)
+                if on_property and restriction_value is not None:
+                    yield ("  " * (indent + 1) +
+                           f"Restriction: {self.n3(on_property)} {type_name} {self.n3(restriction_value)}\n")
+
         # Class properties (via domain)
         for prop in g.subjects(RDFS.domain, class_uri):
-            prop_range = next(g.objects(prop, RDFS.range), None)
-            range_str = f" → {print_n3(prop_range)}" if prop_range else ""
-            output_file.write("  " * (indent + 1) + f"Property: {print_n3(prop)}{range_str}\n")
- 
-        # Recurse into subclasses
-        for sub in sorted(subclass_map.get(class_uri, []), key=lambda x: print_n3(x)):
-            write_class_tree(sub, indent + 1, visited)
-    
-    # Find a salad instance for detailed exploration
-    def find_salad_instance():
-        # Explicitly look for instances of sbo:Salad
-        salad_class = sbo.Salad
-        instances = list(g.subjects(RDF.type, salad_class))
+            prop_range = g.value(prop, RDFS.range)
+            range_str = f" → {self.n3(prop_range)}" if prop_range else ""
+            yield "  " * (indent + 1) + f"Property: {self.n3(prop)}{range_str}\n"
+
+        for sub in self.sorted_terms(self.subclass_map.get(class_uri, [])):
+            yield from self.class_tree(sub, indent + 1, visited)
+
+    # === PROPERTIES ===
+
+    def property_lines(self, prop, indent=0, visited=None):
+        if visited is None:
+            visited = set()
+        if prop in visited:
+            return
+        visited.add(prop)
+        g = self.g
+
+        indent_str = "  " * indent
+        yield f"{indent_str}Property: {self.n3(prop)}\n"
+        for label in self.labels(prop):
+            yield f"{indent_str}  Label: {label}\n"
+
+        domains = list(g.objects(prop, RDFS.domain))
+        if domains:
+            yield f"{indent_str}  Domain: {', '.join(self.n3(d) for d in domains)}\n"
+        ranges = list(g.objects(prop, RDFS.range))
+        if ranges:
+            yield f"{indent_str}  Range: {', '.join(self.n3(r) for r in ranges)}\n"
+
+        prop_types = self.types(prop)
+        characteristics = [name for cls, name in PROPERTY_CHARACTERISTICS if cls in prop_types]
+        if characteristics:
+            yield f"{indent_str}  Characteristics: {', '.join(characteristics)}\n"
+
+        for inv in g.objects(prop, OWL.inverseOf):
+            yield f"{indent_str}  Inverse Of: {self.n3(inv)}\n"
+        yield "\n"
+
+        for subprop in self.sorted_terms(g.subjects(RDFS.subPropertyOf, prop)):
+            yield f"{indent_str}  Subproperty:\n"
+            yield from self.property_lines(subprop, indent + 2, visited)
+
+    def top_level_properties(self, prop_type):
+        g = self.g
+        return self.sorted_terms(p for p in g.subjects(RDF.type, prop_type) if g.value(p, RDFS.subPropertyOf) is None)
+
+    def properties(self):
+        yield from self.object_properties()
+        yield "\n"
+        yield from self.data_properties()
+
+    def object_properties(self):
+        yield "=== OBJECT PROPERTIES ===\n\n"
+        for prop in self.top_level_properties(OWL.ObjectProperty):
+            yield from self.property_lines(prop)
+
+    def data_properties(self):
+        g = self.g
+        yield "=== DATA PROPERTIES ===\n\n"
+        for prop in self.top_level_properties(OWL.DatatypeProperty):
+            yield f"Property: {self.n3(prop)}\n"
+            for label in self.labels(prop):
+                yield f"  Label: {label}\n"
+            domains = list(g.objects(prop, RDFS.domain))
+            if domains:
+                yield f"  Domain: {', '.join(self.n3(d) for d in domains)}\n"
+            ranges = list(g.objects(prop, RDFS.range))
+            if ranges:
+                yield f"  Range: {', '.join(self.n3(r) for r in ranges)}\n"
+            if OWL.FunctionalProperty in self.types(prop):
+                yield "  Characteristic: Functional\n"
+            for subprop in self.sorted_terms(g.subjects(RDFS.subPropertyOf, prop)):
+                yield "  Subproperty:\n"
+                yield from self.property_lines(subprop, indent=2)
+            yield "\n"
+
+    # === SALAD EXPLORATION ===
+
+    def find_salad_instance(self, notes):
+        """Pick the instance to explore; explanatory lines are appended to `notes`."""
+        g, rng = self.g, self.rng
+
+        instances = list(g.subjects(RDF.type, SALAD.Salad))
         if instances:
-            output_file.write(f"Found salad instance of class {print_n3(salad_class)}\n")
-            return random.choice(instances)
-        
-        # If no direct instances of sbo:Salad, look for subclasses of sbo:Salad
-        salad_subclasses = list(g.subjects(RDFS.subClassOf, salad_class))
-        for subclass in salad_subclasses:
+            notes.append(f"Found salad instance of class {self.n3(SALAD.Salad)}\n")
+            return rng.choice(instances)
+
+        # No direct instances of Salad: look for instances of its subclasses
+        for subclass in g.subjects(RDFS.subClassOf, SALAD.Salad):
             if isinstance(subclass, BNode):
                 continue
             instances = list(g.subjects(RDF.type, subclass))
             if instances:
-                output_file.write(f"Found salad subclass instance of {print_n3(subclass)}\n")
-                return random.choice(instances)
-        
-        # If no salad instances found, search for any instance with "Salad" in its URI
+                notes.append(f"Found salad subclass instance of {self.n3(subclass)}\n")
+                return rng.choice(instances)
+
+        # Any instance with "Salad" in its URI
         for subject in g.subjects(RDF.type, OWL.NamedIndividual):
             if "Salad" in str(subject):
-                output_file.write(f"Found instance with 'Salad' in name: {print_n3(subject)}\n")
+                notes.append(f"Found instance with 'Salad' in name: {self.n3(subject)}\n")
                 return subject
-        
-        # If no salad instances found at all, explicitly tell the user
-        output_file.write("No salad instances found in the ontology. Using an alternative instance.\n")
-        
-        # Try classes that might be salad components
-        potential_component_classes = []
-        for cls in classes:
-            class_str = str(cls).lower()
-            if any(term in class_str for term in ["vegetable", "ingredient", "topping", "dressing"]):
-                potential_component_classes.append(cls)
-        
-        # Try to find instances of potential component classes
-        for component_cls in potential_component_classes:
-            instances = list(g.subjects(RDF.type, component_cls))
-            if instances:
-                return random.choice(instances)
-        
-        # Last resort: return any random instance
+
+        notes.append("No salad instances found in the ontology. Using an alternative instance.\n")
+
+        # Classes that might be salad components
+        for cls in self.classes:
+            if any(term in str(cls).lower() for term in ["vegetable", "ingredient", "topping", "dressing"]):
+                instances = list(g.subjects(RDF.type, cls))
+                if instances:
+                    return rng.choice(instances)
+
+        # Last resort: any instance
         all_instances = list(g.subjects(RDF.type, OWL.NamedIndividual))
         if all_instances:
-            return random.choice(all_instances)
-                
+            return rng.choice(all_instances)
         return None
-    
-    # Recursively explore an instance and its related instances
-    def explore_instance(instance, depth=0, max_depth=3, visited=None):
+
+    def explore_instance(self, instance, depth=0, max_depth=3, visited=None):
+        """Lines describing `instance` and, recursively, the instances it links to."""
         if visited is None:
             visited = set()
-            
         if depth > max_depth or instance in visited:
             return
-            
         visited.add(instance)
-        
-        # Get instance types
-        types = list(g.objects(instance, RDF.type))
-        type_str = ", ".join([print_n3(t) for t in types if not isinstance(t, BNode)])
-        output_file.write("  " * depth + f"{print_n3(instance)} (Types: {type_str})\n")
-        
-        # Get instance label if available
-        for label in g.objects(instance, RDFS.label):
-            output_file.write("  " * (depth + 1) + f"Label: {label}\n")
-        
-        # Check if instance is Ingredient or Dressing (including subclasses)
-        is_ingredient_or_dressing = any(is_subclass(t, sbo.Ingredient) or is_subclass(t, sbo.Dressing) for t in types if not isinstance(t, BNode))
-        
-        # Collect substance portions and other properties
+
+        types = self.types(instance)
+        yield "  " * depth + f"{self.n3(instance)} (Types: {self.type_list(instance)})\n"
+        for label in self.labels(instance):
+            yield "  " * (depth + 1) + f"Label: {label}\n"
+
+        is_component = any(
+            not self.component_roots.isdisjoint(self.ancestors(t)) for t in types if not isinstance(t, BNode)
+        )
+
         substance_portions = []
         other_properties = []
-        
-        for p, o in g.predicate_objects(instance):
-            # Skip type, already displayed above
+        for p, o in self.g.predicate_objects(instance):
             if p == RDF.type:
                 continue
-                
-            # Check if this is a substance portion link
-            if p == sbo.hasSubstancePortion and not isinstance(o, Literal):
+            if p == SALAD.hasSubstancePortion and not isinstance(o, Literal):
                 substance_portions.append((p, o))
             else:
                 other_properties.append((p, o))
-        
-        # Process substance portions for Ingredient or Dressing (randomized, max 4)
-        if is_ingredient_or_dressing and substance_portions:
-            random.shuffle(substance_portions)
-            substance_portions = substance_portions[:4]
-        
-        # Combine properties for processing (substance portions first, then others)
-        properties = substance_portions + sorted(other_properties, key=lambda x: print_n3(x[0]))
-        
+
+        # Substance portions of an Ingredient/Dressing: a random sample
+        if is_component and substance_portions:
+            self.rng.shuffle(substance_portions)
+            substance_portions = substance_portions[:MAX_SUBSTANCE_PORTIONS]
+
+        properties = substance_portions + sorted(other_properties, key=lambda x: self.n3(x[0]))
         for p, o in properties:
-            # Get property label if available
-            prop_label = next(g.objects(p, RDFS.label), None)
-            prop_display = f"{print_n3(p)}" + (f" ({prop_label})" if prop_label else "")
-            
+            prop_label = self.first_label(p)
+            prop_display = self.n3(p) + (f" ({prop_label})" if prop_label else "")
+
             if isinstance(o, Literal):
-                output_file.write("  " * (depth + 1) + f"{prop_display}: {o}\n")
+                yield "  " * (depth + 1) + f"{prop_display}: {o}\n"
+                continue
+
+            obj_label = self.first_label(o)
+            obj_display = self.n3(o) + (f" ({obj_label})" if obj_label else "")
+            obj_type_str = self.type_list(o)
+            if obj_type_str:
+                obj_display += f" [Types: {obj_type_str}]"
+            yield "  " * (depth + 1) + f"{prop_display}: {obj_display}\n"
+
+            yield from self.explore_instance(o, depth + 2, max_depth, visited)
+
+    # === MAIN ===
+
+    def header(self):
+        yield f"The ontology contains {len(self.g)} triples.\n\n"
+
+    def lines(self, max_depth=MAX_DEPTH, explore=None):
+        """
+        Every line of the summary, in order. `explore(salad)` may supply the exploration
+        lines (e.g. from a snapshot cache) instead of walking the graph here.
+        """
+        yield from self.header()
+        yield from self.class_hierarchy()
+        yield "\n\n"
+        yield from self.properties()
+
+        yield "\n\n=== DETAILED SALAD EXPLORATION ===\n\n"
+        notes = []
+        salad_instance = self.find_salad_instance(notes)
+        yield from notes
+        if salad_instance:
+            yield f"Starting exploration from: {self.n3(salad_instance)}\n\n"
+            if explore is not None:
+                yield from explore(salad_instance)
             else:
-                # Get object label if available
-                obj_label = next(g.objects(o, RDFS.label), None)
-                obj_display = f"{print_n3(o)}" + (f" ({obj_label})" if obj_label else "")
-                
-                # Get object types
-                obj_types = list(g.objects(o, RDF.type))
-                obj_type_str = ", ".join([print_n3(t) for t in obj_types if not isinstance(t, BNode)])
-                if obj_type_str:
-                    obj_display += f" [Types: {obj_type_str}]"
-                
-                output_file.write("  " * (depth + 1) + f"{prop_display}: {obj_display}\n")
-                
-                # Recursively explore this object
-                explore_instance(o, depth + 2, max_depth, visited)
-    
-    def print_property(prop, indent=0, visited=None):
-        if visited is None:
-            visited = set()
-        
-        if prop in visited:
-            return
-        
-        visited.add(prop)
-        
-        indent_str = "  " * indent
-        output_file.write(f"{indent_str}Property: {print_n3(prop)}\n")
-        
-        # Get label if available
-        for label in g.objects(prop, RDFS.label):
-            output_file.write(f"{indent_str}  Label: {label}\n")
-        
-        # Get domains
-        domains = list(g.objects(prop, RDFS.domain))
-        if domains:
-            domain_str = ", ".join([print_n3(d) for d in domains])
-            output_file.write(f"{indent_str}  Domain: {domain_str}\n")
-        
-        # Get ranges
-        ranges = list(g.objects(prop, RDFS.range))
-        if ranges:
-            range_str = ", ".join([print_n3(r) for r in ranges])
-            output_file.write(f"{indent_str}  Range: {range_str}\n")
-        
-        # Get property characteristics (for object properties)
-        characteristics = []
-        if (prop, RDF.type, OWL.FunctionalProperty) in g:
-            characteristics.append("Functional")
-        if (prop, RDF.type, OWL.TransitiveProperty) in g:
-            characteristics.append("Transitive")
-        if (prop, RDF.type, OWL.SymmetricProperty) in g:
-            characteristics.append("Symmetric")
-        if (prop, RDF.type, OWL.AsymmetricProperty) in g:
-            characteristics.append("Asymmetric")
-        if (prop, RDF.type, OWL.ReflexiveProperty) in g:
-            characteristics.append("Reflexive")
-        if (prop, RDF.type, OWL.IrreflexiveProperty) in g:
-            characteristics.append("Irreflexive")
-        
-        if characteristics:
-            output_file.write(f"{indent_str}  Characteristics: {', '.join(characteristics)}\n")
-        
-        # Get inverse properties (for object properties)
-        for inv in g.objects(prop, OWL.inverseOf):
-            output_file.write(f"{indent_str}  Inverse Of: {print_n3(inv)}\n")
-        
-        output_file.write("\n")
-        
-        # Get subproperties
-        subproperties = list(g.subjects(RDFS.subPropertyOf, prop))
-        subproperties.sort(key=lambda x: print_n3(x))
-        for subprop in subproperties:
-            output_file.write(f"{indent_str}  Subproperty:\n")
-            print_property(subprop, indent + 2, visited)
-
-    def list_properties():
-        output_file.write("=== OBJECT PROPERTIES ===\n\n")
-        
-        # Get all object properties that are not subproperties
-        object_properties = list(g.subjects(RDF.type, OWL.ObjectProperty))
-        top_level_props = [p for p in object_properties if not list(g.objects(p, RDFS.subPropertyOf))]
-        top_level_props.sort(key=lambda x: print_n3(x))
-        
-        for prop in top_level_props:
-            print_property(prop)
-        
-        output_file.write("\n=== DATA PROPERTIES ===\n\n")
-        
-        # Get all data properties that are not subproperties
-        data_properties = list(g.subjects(RDF.type, OWL.DatatypeProperty))
-        top_level_data_props = [p for p in data_properties if not list(g.objects(p, RDFS.subPropertyOf))]
-        top_level_data_props.sort(key=lambda x: print_n3(x))
-        
-        for prop in top_level_data_props:
-            output_file.write(f"Property: {print_n3(prop)}\n")
-            
-            # Get label if available
-            for label in g.objects(prop, RDFS.label):
-                output_file.write(f"  Label: {label}\n")
-            
-            # Get domains
-            domains = list(g.objects(prop, RDFS.domain))
-            if domains:
-                domain_str = ", ".join([print_n3(d) for d in domains])
-                output_file.write(f"  Domain: {domain_str}\n")
-            
-            # Get ranges
-            ranges = list(g.objects(prop, RDFS.range))
-            if ranges:
-                range_str = ", ".join([print_n3(r) for r in ranges])
-                output_file.write(f"  Range: {range_str}\n")
-            
-            # Check if functional
-            if (prop, RDF.type, OWL.FunctionalProperty) in g:
-                output_file.write(f"  Characteristic: Functional\n")
-            
-            # Get subproperties
-            subproperties = list(g.subjects(RDFS.subPropertyOf, prop))
-            subproperties.sort(key=lambda x: print_n3(x))
-            for subprop in subproperties:
-                output_file.write(f"  Subproperty:\n")
-                print_property(subprop, indent=2)
-            
-            output_file.write("\n")
-        
-    # === MAIN EXECUTION ===
-    output_file.write(f"The ontology contains {len(g)} triples.\n\n")
-    
-    # Part 1: Output Class Hierarchy with restrictions
-    output_file.write("=== CLASS HIERARCHY ===\n\n")
-    visited_classes = set()
-    for root in sorted(roots, key=lambda x: print_n3(x)):
-        write_class_tree(root, visited=visited_classes)
-    
-    # Part 2: List all properties with domains and ranges
-    output_file.write("\n\n")
-    list_properties()
-    
-    # Part 3: Detailed exploration of a salad instance
-    output_file.write("\n\n=== DETAILED SALAD EXPLORATION ===\n\n")
-    
-    salad_instance = find_salad_instance()
-    if salad_instance:
-        output_file.write(f"Starting exploration from: {print_n3(salad_instance)}\n\n")
-        explore_instance(salad_instance, depth=0, max_depth=10)
+                yield from self.explore_instance(salad_instance, depth=0, max_depth=max_depth)
+        else:
+            yield "No suitable salad instance found in the ontology.\n"
+
+
+def write_summary(g, output, rng=None, max_depth=MAX_DEPTH):
+    """Stream the summary of `g` to the open text file `output`."""
+    for line in OntologySummary(g, rng).lines(max_depth):
+        output.write(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a focused ontology summary for an LLM prompt.")
+    parser.add_argument("--ontology", default=ONTOLOGY_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE, help="Summary file ('-' for stdout)")
+    parser.add_argument("--seed", type=int, help="Seed for the salad / substance portion sampling")
+    parser.add_argument("--max-depth", type=int, default=MAX_DEPTH)
+    parser.add_argument("--snapshots", metavar="CACHE",
+                        help="Take the salad exploration from this snapshot cache (see salad_snapshots.py)")
+    args = parser.parse_args()
+
+    g = Graph()
+    g.parse(args.ontology, format="xml")
+    g.bind("s", SALAD)
+    rng = random.Random(args.seed)
+
+    explore = cache = None
+    if args.snapshots:
+        from salad_snapshots import DEFAULT_SEED, SnapshotCache, snapshot_salads
+
+        cache = SnapshotCache(args.snapshots)
+        seed = DEFAULT_SEED if args.seed is None else args.seed
+
+        def explore(salad):
+            for _, text, _ in snapshot_salads(g, [salad], cache, seed, args.max_depth):
+                yield text
+
+    summary = OntologySummary(g, rng)
+    if args.output == "-":
+        sys.stdout.writelines(summary.lines(args.max_depth, explore))
     else:
-        output_file.write("No suitable salad instance found in the ontology.\n")
\ No newline at end of file
+        with open(args.output, "w", encoding="utf8") as output_file:
+            output_file.writelines(summary.lines(args.max_depth, explore))
+        print(f"✅ Summary written to {args.output}")
+    if cache is not None:
+        cache.save()